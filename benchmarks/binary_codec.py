@@ -0,0 +1,74 @@
+"""
+Size and conversion of a numeric-heavy response (5000 samples with
+a vector of 32 floats each) into pydantic models, as JSON and as
+MessagePack negotiated with `binary_codec="msgpack"`.
+
+Both responses go through `Response.as_type` with the same return type,
+the format is picked by the Content-Type of the response.
+
+Usage: python benchmarks/binary_codec.py
+"""
+import json
+import timeit
+from typing import List
+
+import httpx
+import msgpack
+import pydantic
+
+from declarativex.codecs import get_binary_codec
+from declarativex.models import Response
+
+
+class Sample(pydantic.BaseModel):
+    id: int
+    timestamp: float
+    values: List[float]
+
+
+DATA = [
+    {
+        "id": index,
+        "timestamp": 1700000000 + index / 10,
+        "values": [index * 0.001 + offset / 3 for offset in range(32)],
+    }
+    for index in range(5000)
+]
+REQUEST = httpx.Request("GET", "https://example.com/samples")
+RESPONSES = {
+    "json": httpx.Response(
+        200,
+        content=json.dumps(DATA).encode(),
+        headers={"Content-Type": "application/json"},
+        request=REQUEST,
+    ),
+    "msgpack": httpx.Response(
+        200,
+        content=msgpack.packb(DATA),
+        headers={"Content-Type": "application/msgpack"},
+        request=REQUEST,
+    ),
+}
+CODEC = get_binary_codec("msgpack")
+
+
+def convert(name: str) -> List[Sample]:
+    return Response(
+        response=RESPONSES[name], binary_codec=CODEC
+    ).as_type(List[Sample])
+
+
+def main() -> None:
+    assert convert("json") == convert("msgpack")
+    for name, response in RESPONSES.items():
+        seconds = min(
+            timeit.repeat(lambda: convert(name), number=10, repeat=5)
+        )
+        print(
+            f"{name:8} {len(response.content) / 1024:8.1f} KiB"
+            f"   {seconds / 10 * 1000:8.2f} ms per response"
+        )
+
+
+if __name__ == "__main__":
+    main()
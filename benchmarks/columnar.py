@@ -0,0 +1,83 @@
+"""
+Conversion of a response with 200000 flat records to NumPy arrays.
+
+"models" converts the response to `List[Record]` and builds the arrays
+from the attributes of the models, "columns" converts it to
+`Columns[Record]`, that builds the arrays from the records decoded
+as lightweight structs (if msgspec is installed, otherwise from the
+decoded JSON). The time and the peak of the allocated memory are
+measured.
+
+Usage: python benchmarks/columnar.py
+"""
+import json
+import time
+import tracemalloc
+from typing import List
+
+import httpx
+import numpy
+import pydantic
+
+from declarativex import Columns
+from declarativex.models import Response
+
+
+class Record(pydantic.BaseModel):
+    id: int
+    price: float
+    quantity: int
+    active: bool
+
+
+RESPONSE = httpx.Response(
+    200,
+    content=json.dumps(
+        [
+            {
+                "id": index,
+                "price": index / 100,
+                "quantity": index % 50,
+                "active": index % 3 == 0,
+            }
+            for index in range(200000)
+        ]
+    ).encode(),
+    request=httpx.Request("GET", "https://example.com/records"),
+)
+
+
+def models() -> dict:
+    records = Response(response=RESPONSE).as_type(List[Record])
+    return {
+        name: numpy.array([getattr(record, name) for record in records])
+        for name in Record.model_fields
+    }
+
+
+def columns() -> dict:
+    return Response(response=RESPONSE).as_type(Columns[Record])
+
+
+def main() -> None:
+    expected = models()
+    for name, array in columns().items():
+        assert (array == expected[name]).all()
+    for name, func in (("models", models), ("columns", columns)):
+        times = []
+        for _ in range(5):
+            started = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - started)
+        tracemalloc.start()
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name:8} {min(times) * 1000:8.1f} ms"
+            f"   peak memory {peak / 1024 / 1024:8.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Decoding of a large list response (10000 users with nested addresses)
+into pydantic models.
+
+"json.loads + parse_obj_as" is how responses were decoded before: the
+body is decoded to str, parsed into Python objects and only then
+validated, inside warnings.catch_warnings().
+"Response.as_type" validates the raw bytes with the cached TypeAdapter
+(pydantic v2).
+
+Usage: python benchmarks/decode.py
+"""
+import json
+import timeit
+import warnings
+from typing import List, Optional
+
+import httpx
+import pydantic
+
+from declarativex.models import Response
+
+
+class Address(pydantic.BaseModel):
+    street: str
+    city: str
+    zipcode: str
+
+
+class User(pydantic.BaseModel):
+    id: int
+    name: str
+    email: str
+    active: bool
+    score: float
+    address: Address
+    tags: List[str]
+    manager_id: Optional[int] = None
+
+
+USERS = [
+    {
+        "id": index,
+        "name": f"User {index}",
+        "email": f"user{index}@example.com",
+        "active": index % 2 == 0,
+        "score": index / 3,
+        "address": {
+            "street": f"{index} Main St",
+            "city": "Kyiv",
+            "zipcode": "01001",
+        },
+        "tags": ["alpha", "beta", "gamma"],
+        "manager_id": index // 10 or None,
+    }
+    for index in range(10000)
+]
+RESPONSE = httpx.Response(
+    200,
+    content=json.dumps(USERS).encode(),
+    headers={"Content-Type": "application/json"},
+    request=httpx.Request("GET", "https://example.com/users"),
+)
+
+
+def before() -> List[User]:
+    raw_response = json.loads(RESPONSE.text)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", category=DeprecationWarning)
+        return pydantic.parse_obj_as(List[User], raw_response)
+
+
+def after() -> List[User]:
+    return Response(response=RESPONSE).as_type(List[User])
+
+
+def main() -> None:
+    assert before() == after()
+    for name, func in (
+        ("json.loads + parse_obj_as", before),
+        ("Response.as_type", after),
+    ):
+        best = min(timeit.repeat(func, number=5, repeat=5)) / 5
+        print(f"{name:30} {best * 1000:8.2f} ms per response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Import time of declarativex and of a generated client class with 1000
+endpoints, measured with `python -X importtime` in a fresh interpreter.
+
+"declarativex" is the cumulative import time of the package itself,
+"client module" is the import of the generated module, i.e. declaring
+the endpoints (declarativex is already imported at that point).
+Pass --max-ms to fail if the client module import takes longer.
+
+Usage: python benchmarks/import_time.py [--endpoints 1000] [--max-ms 500]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+
+METHODS = ("GET", "POST", "PUT", "PATCH", "DELETE")
+
+
+def generate_client(endpoints: int) -> str:
+    lines = [
+        "from typing import Annotated",
+        "",
+        "from declarativex import BaseClient, Header, Query, http, retry",
+        "",
+        "",
+        "@retry(max_retries=2)",
+        "class GeneratedClient(BaseClient):",
+        '    base_url = "https://example.com"',
+    ]
+    for index in range(endpoints):
+        method = METHODS[index % len(METHODS)]
+        lines += [
+            "",
+            f'    @http("{method}", "/resources/{index}/{{item_id}}")',
+            f"    def endpoint_{index}(",
+            "        self,",
+            "        item_id: int,",
+            "        page: Annotated[int, Query] = 1,",
+            '        trace: Annotated[str, Header(name="X-Trace")] = "",',
+            "    ) -> dict:",
+            "        ...",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def import_times(module: str, path: str) -> dict:
+    """Run the import in a fresh interpreter, return cumulative times."""
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        filter(None, [path, env.get("PYTHONPATH")])
+    )
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        try:
+            times[name.strip()] = int(cumulative) / 1000
+        except ValueError:
+            # The header line
+            continue
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--endpoints", type=int, default=1000)
+    parser.add_argument("--max-ms", type=float, default=None)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as path:
+        with open(
+            os.path.join(path, "generated_client.py"), "w", encoding="utf-8"
+        ) as file:
+            file.write(generate_client(args.endpoints))
+        runs = [
+            import_times("generated_client", path)
+            for _ in range(args.repeat)
+        ]
+
+    package = min(run["declarativex"] for run in runs)
+    client = min(run["generated_client"] - run["declarativex"] for run in runs)
+    print(f"declarativex:  {package:8.1f} ms")
+    print(f"client module: {client:8.1f} ms ({args.endpoints} endpoints)")
+    if args.max_ms is not None and client > args.max_ms:
+        print(f"client module import is slower than {args.max_ms} ms")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Encoding of a large JSON request body and decoding of a large list
+response (10000 users) with the JSON codecs.
+
+"encode" builds the httpx request from a RawRequest with the body,
+"decode" converts the response to List[dict] with Response.as_type.
+The codecs that are not installed are skipped.
+
+Usage: python benchmarks/json_codec.py
+"""
+import json
+import timeit
+from typing import List
+
+import httpx
+
+from declarativex.codecs import JSON_CODECS, get_json_codec
+from declarativex.models import RawRequest, Response
+
+USERS = [
+    {
+        "id": index,
+        "name": f"User {index}",
+        "email": f"user{index}@example.com",
+        "active": index % 2 == 0,
+        "score": index / 3,
+        "address": {"street": f"{index} Main St", "city": "Kyiv"},
+        "tags": ["alpha", "beta", "gamma"],
+    }
+    for index in range(10000)
+]
+RESPONSE = httpx.Response(
+    200,
+    content=json.dumps(USERS).encode(),
+    headers={"Content-Type": "application/json"},
+    request=httpx.Request("GET", "https://example.com/users"),
+)
+
+
+def main() -> None:
+    for name, codec_class in JSON_CODECS.items():
+        if codec_class.module is not None:
+            try:
+                __import__(codec_class.module)
+            except ImportError:
+                print(f"{name:10} not installed")
+                continue
+        codec = get_json_codec(name)
+        request = RawRequest(
+            method="POST",
+            url_template="https://example.com/users",
+            json={"users": USERS},
+            _body_codec=codec,
+        )
+        response = Response(response=RESPONSE, json_codec=codec)
+        assert response.as_type(List[dict]) == USERS
+        encode = min(
+            timeit.repeat(request.to_httpx_request, number=5, repeat=5)
+        )
+        decode = min(
+            timeit.repeat(
+                lambda: response.as_type(List[dict]), number=5, repeat=5
+            )
+        )
+        print(
+            f"{name:10} encode {encode / 5 * 1000:8.2f} ms"
+            f"   decode {decode / 5 * 1000:8.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
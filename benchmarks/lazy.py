@@ -0,0 +1,110 @@
+"""
+Reading three fields of a wide response (an order with 5000 line items
+and 50 other fields) with eager and lazy response models.
+
+"eager" validates the whole document into the pydantic models,
+"lazy" decodes the JSON and validates only the fields that are read
+(`http(..., lazy=True)`), "lazy + orjson" decodes the JSON with orjson
+(`json_codec="orjson"`). The peak memory is measured with tracemalloc.
+
+Usage: python benchmarks/lazy.py
+"""
+import json
+import timeit
+import tracemalloc
+from typing import Dict, List
+
+import httpx
+import pydantic
+
+from declarativex.codecs import get_json_codec
+from declarativex.models import Response
+
+
+class LineItem(pydantic.BaseModel):
+    sku: str
+    name: str
+    quantity: int
+    price: float
+    attributes: Dict[str, str]
+
+
+class Customer(pydantic.BaseModel):
+    id: int
+    name: str
+    email: str
+
+
+class Order(pydantic.BaseModel):
+    id: int
+    status: str
+    customer: Customer
+    items: List[LineItem]
+    notes: Dict[str, str]
+
+
+ORDER = {
+    "id": 1,
+    "status": "shipped",
+    "customer": {"id": 7, "name": "John", "email": "john@example.com"},
+    "items": [
+        {
+            "sku": f"SKU-{index}",
+            "name": f"Item {index}",
+            "quantity": index % 5 + 1,
+            "price": index / 7,
+            "attributes": {"color": "red", "size": "M"},
+        }
+        for index in range(5000)
+    ],
+    "notes": {f"note_{index}": "text" * 10 for index in range(50)},
+}
+RESPONSE = httpx.Response(
+    200,
+    content=json.dumps(ORDER).encode(),
+    headers={"Content-Type": "application/json"},
+    request=httpx.Request("GET", "https://example.com/orders/1"),
+)
+
+
+def eager():
+    order = Response(response=RESPONSE).as_type(Order)
+    return order.id, order.status, order.customer.email
+
+
+def lazy():
+    order = Response(response=RESPONSE, lazy=True).as_type(Order)
+    return order.id, order.status, order.customer.email
+
+
+def lazy_orjson():
+    order = Response(
+        response=RESPONSE, lazy=True, json_codec=get_json_codec("orjson")
+    ).as_type(Order)
+    return order.id, order.status, order.customer.email
+
+
+def peak_memory(func) -> float:
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1024 / 1024
+
+
+def main() -> None:
+    assert eager() == lazy()
+    for name, func in (
+        ("eager", eager),
+        ("lazy", lazy),
+        ("lazy + orjson", lazy_orjson),
+    ):
+        best = min(timeit.repeat(func, number=5, repeat=5)) / 5
+        print(
+            f"{name:14} {best * 1000:8.2f} ms per response"
+            f"   peak {peak_memory(func):6.1f} MiB"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Per-call overhead of the middleware chain with six pass-through
+middlewares.
+
+"per-call chain" is how the chain was built before: the middlewares are
+checked and wrapped into closures on every call.
+"prebuilt chain" is the chain built once by the executor.
+
+Usage: python benchmarks/middleware_chain.py
+"""
+import asyncio
+import timeit
+
+from declarativex import Middleware
+from declarativex.executors import SyncExecutor
+from declarativex.models import ClientConfiguration, EndpointConfiguration
+from declarativex.models import RawRequest
+
+
+class PassThrough(Middleware):
+    def __call__(self, *, request, call_next):
+        return call_next(request)
+
+
+class Executor(SyncExecutor):
+    def _execute(self, request: RawRequest):
+        return request
+
+
+def get_users() -> dict:
+    ...
+
+
+MIDDLEWARES = [PassThrough() for _ in range(6)]
+EXECUTOR = Executor(
+    EndpointConfiguration(
+        client_configuration=ClientConfiguration(
+            base_url="https://example.com/", middlewares=MIDDLEWARES
+        ),
+        method="GET",
+        path="/api/users",
+    )
+)
+EXECUTOR.func = get_users
+REQUEST = RawRequest(method="GET", url_template="https://example.com/")
+NUMBER = 100_000
+
+
+def per_call_chain():
+    is_async = asyncio.iscoroutinefunction(get_users)
+    for middleware in MIDDLEWARES:
+        assert getattr(middleware, "_async") is is_async
+    execute_func = EXECUTOR._execute
+    for mw in reversed(MIDDLEWARES):
+
+        def wrap(middleware, prev_func):
+            def _wrapped(request):
+                return middleware(request=request, call_next=prev_func)
+
+            return _wrapped
+
+        execute_func = wrap(mw, execute_func)
+    execute_func(REQUEST)
+
+
+def prebuilt_chain():
+    EXECUTOR.chain(REQUEST)
+
+
+def main():
+    for name, func in [
+        ("per-call chain", per_call_chain),
+        ("prebuilt chain", prebuilt_chain),
+    ]:
+        best = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f"{name:>20}: {best / NUMBER * 1e6:8.2f} us per call")
+
+
+if __name__ == "__main__":
+    main()
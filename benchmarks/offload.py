@@ -0,0 +1,107 @@
+"""
+Event loop latency while an async endpoint decodes a large response
+(about 20 MB of JSON into pydantic models).
+
+A ticker coroutine sleeps 1 ms in a loop and records the longest gap
+between its wake-ups, i.e. how long other coroutines were stalled.
+"inline" decodes the response on the event loop (offload_threshold
+is not set), "offloaded" decodes it in a thread (offload_threshold=1 MiB):
+the items are decoded and validated in chunks, the loop runs between them.
+The remaining stall is mostly the garbage collector walking the objects.
+The network is replaced with a prepared response.
+
+Usage: python benchmarks/offload.py
+"""
+import asyncio
+import json
+import time
+from typing import List
+from unittest import mock
+
+import httpx
+import pydantic
+
+from declarativex import http
+
+
+class Record(pydantic.BaseModel):
+    id: int
+    name: str
+    tags: List[str]
+    score: float
+
+
+CONTENT = json.dumps(
+    [
+        {
+            "id": index,
+            "name": f"Record {index}",
+            "tags": ["alpha", "beta", "gamma"],
+            "score": index / 7,
+        }
+        for index in range(250000)
+    ]
+).encode()
+
+
+@http(
+    "GET",
+    "/records",
+    base_url="https://example.com",
+    timeout=None,
+    offload_threshold=1024 * 1024,
+)
+async def get_records() -> List[Record]:
+    ...
+
+
+@http("GET", "/records", base_url="https://example.com", timeout=None)
+async def get_records_inline() -> List[Record]:
+    ...
+
+
+async def fake_send(self, request, **kwargs):
+    return httpx.Response(200, content=CONTENT, request=request)
+
+
+async def measure(endpoint) -> tuple:
+    done = asyncio.Event()
+    longest = 0.0
+
+    async def ticker():
+        nonlocal longest
+        last = time.perf_counter()
+        while not done.is_set():
+            await asyncio.sleep(0.001)
+            now = time.perf_counter()
+            longest = max(longest, now - last)
+            last = now
+
+    task = asyncio.create_task(ticker())
+    # Let the ticker start before the call
+    await asyncio.sleep(0.01)
+    started = time.perf_counter()
+    records = await endpoint()
+    elapsed = time.perf_counter() - started
+    done.set()
+    await task
+    assert len(records) == 250000
+    return elapsed, longest
+
+
+async def main() -> None:
+    with mock.patch("httpx.AsyncClient.send", fake_send):
+        for name, endpoint in (
+            ("inline", get_records_inline),
+            ("offloaded", get_records),
+        ):
+            elapsed, longest = await measure(endpoint)
+            print(
+                f"{name:10} call {elapsed * 1000:8.1f} ms"
+                f"   longest loop stall {longest * 1000:8.1f} ms"
+            )
+
+
+if __name__ == "__main__":
+    print(f"response size: {len(CONTENT) / 1024 / 1024:.1f} MiB")
+    asyncio.run(main())
@@ -0,0 +1,84 @@
+"""
+Decoding of the items of an enveloped response: 2000 users in
+"data.items" next to a large "meta" object with 20000 entries.
+
+"whole envelope" models the whole envelope and validates it, the way
+it was done without projections. "response_path" validates only
+"data.items" as List[User] (`http(..., response_path="data.items")`).
+
+Usage: python benchmarks/projection.py
+"""
+import json
+import timeit
+from typing import Any, Dict, List
+
+import httpx
+import pydantic
+
+from declarativex.models import Response
+from declarativex.projection import parse_response_path
+
+
+class User(pydantic.BaseModel):
+    id: int
+    name: str
+    email: str
+
+
+class Data(pydantic.BaseModel):
+    items: List[User]
+
+
+class Envelope(pydantic.BaseModel):
+    data: Data
+    meta: Dict[str, Any]
+
+
+ENVELOPE = {
+    "data": {
+        "items": [
+            {
+                "id": index,
+                "name": f"User {index}",
+                "email": f"user{index}@example.com",
+            }
+            for index in range(2000)
+        ]
+    },
+    "meta": {
+        "entries": [
+            {"key": index, "values": [1, 2, 3], "label": "x" * 20}
+            for index in range(20000)
+        ]
+    },
+}
+RESPONSE = httpx.Response(
+    200,
+    content=json.dumps(ENVELOPE).encode(),
+    headers={"Content-Type": "application/json"},
+    request=httpx.Request("GET", "https://example.com/users"),
+)
+
+
+def before() -> List[User]:
+    return Response(response=RESPONSE).as_type(Envelope).data.items
+
+
+def after() -> List[User]:
+    return Response(
+        response=RESPONSE, response_path=parse_response_path("data.items")
+    ).as_type(List[User])
+
+
+def main() -> None:
+    assert before() == after()
+    for name, func in (
+        ("whole envelope", before),
+        ("response_path", after),
+    ):
+        best = min(timeit.repeat(func, number=5, repeat=5)) / 5
+        print(f"{name:16} {best * 1000:8.2f} ms per response")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Per-call overhead of building httpx.Request for a header-heavy client:
+eight default headers, bearer auth and default query parameters.
+
+Usage: python benchmarks/static_defaults.py
+"""
+import timeit
+from typing import Annotated
+
+from declarativex import BearerAuth, Query
+from declarativex.models import ClientConfiguration, EndpointConfiguration
+from declarativex.models import RawRequest
+
+
+def get_user(user_id: int, page: Annotated[int, Query] = 1) -> dict:
+    ...
+
+
+CLIENT = ClientConfiguration(
+    base_url="https://example.com/",
+    auth=BearerAuth("secret-token"),
+    default_headers={
+        "Accept": "application/json",
+        "Accept-Language": "en-US",
+        "User-Agent": "declarativex-benchmark/1.0",
+        "X-Client-Name": "benchmark",
+        "X-Client-Version": "1.0.0",
+        "X-Tenant": "tenant-1",
+        "X-Region": "eu-west-1",
+        "Cache-Control": "no-cache",
+    },
+    default_query_params={"api_version": "2023-10-01", "format": "json"},
+)
+USERS = EndpointConfiguration(
+    client_configuration=CLIENT, method="GET", path="/api/users"
+)
+USER = EndpointConfiguration(
+    client_configuration=CLIENT, method="GET", path="/api/users/{user_id}"
+)
+PLAN = USER.compile_plan(get_user)
+NUMBER = 20_000
+
+
+def static_path():
+    request = RawRequest.initialize(USERS)
+    request.to_httpx_request()
+
+
+def dynamic_values():
+    values, _, _ = PLAN.bind_arguments((1,), {"page": 2})
+    request = PLAN.modify_request(RawRequest.initialize(USER), values)
+    request.to_httpx_request()
+
+
+def main():
+    for name, func in [
+        ("defaults only", static_path),
+        ("with call values", dynamic_values),
+    ]:
+        best = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f"{name:>20}: {best / NUMBER * 1e6:8.2f} us per call")
+
+
+if __name__ == "__main__":
+    main()
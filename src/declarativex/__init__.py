@@ -1,5 +1,9 @@
 from .auth import BasicAuth, BearerAuth, HeaderAuth, QueryParamsAuth
+from .circuit_breaker import circuit_breaker
 from .client import BaseClient
+from .codecs import BinaryCodec, JSONCodec
+from .columnar import Columns
+from .context import deadline, remaining_time
 from .dependencies import (
     Path,
     JsonField,
@@ -8,6 +12,7 @@ from .dependencies import (
     Header,
     Cookie,
     Timeout,
+    Deadline,
     Dependency,
     FormField,
     FormData,
@@ -20,12 +25,17 @@ from .exceptions import (
     DependencyValidationError,
     HTTPException,
     TimeoutException,
+    DeadlineExceeded,
+    ResponseTooLarge,
     UnprocessableEntityException,
     RateLimitExceeded,
+    CircuitOpenException,
 )
-from .methods import http, gql
+from .executors import PreparedRequest
+from .lazy import LazyModel
+from .methods import http, gql, prepare
 from .middlewares import Middleware
 from .rate_limiter import rate_limiter
-from .retry import retry
+from .retry import retry, RetryBudget, RetryPolicy, Jitter
 
 __version__ = "v1.0.0"
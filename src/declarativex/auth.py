@@ -13,6 +13,18 @@ class Auth(abc.ABC):
     key: str
     value: str
 
+    @property
+    def is_static(self) -> bool:
+        """
+        Whether the auth always sets the same value to the headers or the
+        query parameters. Static auth is applied once per configuration
+        together with the defaults instead of every request.
+        """
+        return type(self).apply_auth is Auth.apply_auth and self.location in (
+            Location.headers,
+            Location.query_params,
+        )
+
     def apply_auth(self, request: "RawRequest") -> "RawRequest":
         obj = getattr(request, self.location.value)
         obj[self.key] = self.value
@@ -0,0 +1,283 @@
+import enum
+import threading
+import time
+from collections import deque
+from typing import Callable, Collection, Deque, Optional, Tuple, Type
+
+import httpx
+
+from .exceptions import (
+    CircuitOpenException,
+    DeadlineExceeded,
+    HTTPException,
+    MisconfiguredException,
+    TimeoutException,
+)
+from .utils import SupportDecorator
+
+
+class CircuitState(str, enum.Enum):
+    """Enum for circuit breaker states."""
+
+    closed = "closed"
+    open = "open"
+    half_open = "half_open"
+
+
+class Circuit:
+    """
+    State machine of the circuit breaker. Calls are recorded to the rolling
+    window of `window` seconds. When the failure rate or the slow-call rate
+    of the window exceeds the threshold, the circuit opens and rejects calls
+    for `recovery_timeout` seconds. Then it becomes half-open and admits
+    up to `half_open_max_calls` probes: if all of them succeed, the circuit
+    closes, otherwise it opens again.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float,
+        slow_call_rate_threshold: float,
+        slow_call_duration: Optional[float],
+        window: float,
+        minimum_calls: int,
+        recovery_timeout: float,
+        half_open_max_calls: int,
+    ):
+        self._failure_rate_threshold = failure_rate_threshold
+        self._slow_call_rate_threshold = slow_call_rate_threshold
+        self._slow_call_duration = slow_call_duration
+        self._window = window
+        self._minimum_calls = minimum_calls
+        self._recovery_timeout = recovery_timeout
+        self._half_open_max_calls = half_open_max_calls
+
+        self._lock = threading.Lock()
+        self._calls: Deque[Tuple[float, bool, bool]] = deque()
+        self._failures = 0
+        self._slow_calls = 0
+        self._state = CircuitState.closed
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._check_recovery(time.monotonic())
+            return self._state
+
+    def reset(self) -> None:
+        """Close the circuit and forget all recorded calls."""
+        with self._lock:
+            self._transition(CircuitState.closed, 0.0)
+
+    def _transition(self, state: CircuitState, now: float) -> None:
+        self._state = state
+        self._opened_at = now
+        self._probes = 0
+        self._probe_successes = 0
+        self._calls.clear()
+        self._failures = 0
+        self._slow_calls = 0
+
+    def _check_recovery(self, now: float) -> None:
+        if (
+            self._state is CircuitState.open
+            and now - self._opened_at >= self._recovery_timeout
+        ):
+            self._transition(CircuitState.half_open, now)
+
+    def acquire(self) -> float:
+        """
+        Get a permission to make a call. Raises CircuitOpenException if the
+        circuit is open or all the half-open probes are already in flight.
+        Returns the start time of the call.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._check_recovery(now)
+            if self._state is CircuitState.open:
+                opened_for = now - self._opened_at
+                raise CircuitOpenException(
+                    retry_after=self._recovery_timeout - opened_for
+                )
+            if self._state is CircuitState.half_open:
+                if self._probes >= self._half_open_max_calls:
+                    raise CircuitOpenException(retry_after=None)
+                self._probes += 1
+            return now
+
+    def record(self, started_at: float, failed: bool) -> None:
+        """
+        Record the result of the call started at the given time. Calls
+        started before the last transition, e.g. before the circuit
+        opened, don't affect the current state.
+        """
+        with self._lock:
+            if started_at < self._opened_at:
+                return
+            now = time.monotonic()
+            slow = (
+                self._slow_call_duration is not None
+                and now - started_at > self._slow_call_duration
+            )
+            if self._state is CircuitState.half_open:
+                self._record_probe(now, failed or slow)
+            elif self._state is CircuitState.closed:
+                self._record_call(now, failed, slow)
+
+    def release(self, started_at: float) -> None:
+        """
+        Give back the permission of the call started at the given time
+        without recording its outcome, e.g. when it was cancelled.
+        """
+        with self._lock:
+            if (
+                self._state is CircuitState.half_open
+                and started_at >= self._opened_at
+            ):
+                # The probe of the current half-open state, not of
+                # the previous one
+                self._probes -= 1
+
+    def _record_probe(self, now: float, failed: bool) -> None:
+        if failed:
+            self._transition(CircuitState.open, now)
+            return
+        self._probe_successes += 1
+        if self._probe_successes >= self._half_open_max_calls:
+            self._transition(CircuitState.closed, now)
+
+    def _record_call(self, now: float, failed: bool, slow: bool) -> None:
+        self._calls.append((now, failed, slow))
+        self._failures += failed
+        self._slow_calls += slow
+        threshold = now - self._window
+        while self._calls and self._calls[0][0] < threshold:
+            _, old_failed, old_slow = self._calls.popleft()
+            self._failures -= old_failed
+            self._slow_calls -= old_slow
+
+        total = len(self._calls)
+        if total < self._minimum_calls:
+            return
+        if (
+            self._failures / total >= self._failure_rate_threshold
+            or self._slow_calls / total >= self._slow_call_rate_threshold
+        ):
+            self._transition(CircuitState.open, now)
+
+
+class circuit_breaker(SupportDecorator):
+    """
+    Fail fast with CircuitOpenException while the upstream is down instead
+    of waiting for the timeout of every call.
+
+    Parameters:
+        failure_rate_threshold: The failure rate (0..1) that opens the
+            circuit.
+        slow_call_rate_threshold: The slow-call rate (0..1) that opens the
+            circuit.
+        slow_call_duration: Calls longer than this number of seconds are
+            considered slow. None disables slow-call detection.
+        window: The length of the rolling window in seconds.
+        minimum_calls: The minimum number of calls in the window
+            to calculate the rates.
+        recovery_timeout: How long the circuit stays open, in seconds.
+        half_open_max_calls: The number of probes admitted in the
+            half-open state.
+        exceptions: The exception classes counted as failures.
+        status_codes: The HTTP status codes counted as failures.
+    """
+
+    def __init__(
+        self,
+        *,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 1.0,
+        slow_call_duration: Optional[float] = None,
+        window: float = 60.0,
+        minimum_calls: int = 10,
+        recovery_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        exceptions: Tuple[Type[BaseException], ...] = (
+            TimeoutException,
+            httpx.TransportError,
+        ),
+        status_codes: Collection[int] = frozenset(range(500, 600)),
+    ):
+        if not 0 < failure_rate_threshold <= 1:
+            raise MisconfiguredException(
+                "failure_rate_threshold must be in range (0, 1]"
+            )
+        if not 0 < slow_call_rate_threshold <= 1:
+            raise MisconfiguredException(
+                "slow_call_rate_threshold must be in range (0, 1]"
+            )
+        if minimum_calls < 1 or half_open_max_calls < 1:
+            raise MisconfiguredException(
+                "minimum_calls and half_open_max_calls must be positive"
+            )
+        self._circuit = Circuit(
+            failure_rate_threshold=failure_rate_threshold,
+            slow_call_rate_threshold=slow_call_rate_threshold,
+            slow_call_duration=slow_call_duration,
+            window=window,
+            minimum_calls=minimum_calls,
+            recovery_timeout=recovery_timeout,
+            half_open_max_calls=half_open_max_calls,
+        )
+        self._exceptions = exceptions
+        self._status_codes = frozenset(status_codes)
+
+    @property
+    def state(self) -> CircuitState:
+        return self._circuit.state
+
+    def reset(self) -> None:
+        self._circuit.reset()
+
+    def _is_failure(self, exc: Exception) -> bool:
+        if isinstance(exc, HTTPException):
+            return exc.status_code in self._status_codes
+        return isinstance(exc, self._exceptions)
+
+    async def _decorate_async(self, func: Callable, *args, **kwargs):
+        started_at = self._circuit.acquire()
+        try:
+            result = await func(*args, **kwargs)
+        except DeadlineExceeded:
+            # The deadline of the caller is not a failure of the upstream
+            self._circuit.release(started_at)
+            raise
+        except Exception as e:
+            self._circuit.record(started_at, failed=self._is_failure(e))
+            raise
+        except BaseException:
+            # Cancelled or interrupted calls are neither successes
+            # nor failures
+            self._circuit.release(started_at)
+            raise
+        self._circuit.record(started_at, failed=False)
+        return result
+
+    def _decorate_sync(self, func: Callable, *args, **kwargs):
+        started_at = self._circuit.acquire()
+        try:
+            result = func(*args, **kwargs)
+        except DeadlineExceeded:
+            # The deadline of the caller is not a failure of the upstream
+            self._circuit.release(started_at)
+            raise
+        except Exception as e:
+            self._circuit.record(started_at, failed=self._is_failure(e))
+            raise
+        except BaseException:
+            # Cancelled or interrupted calls are neither successes
+            # nor failures
+            self._circuit.release(started_at)
+            raise
+        self._circuit.record(started_at, failed=False)
+        return result
@@ -1,9 +1,16 @@
+import inspect
 from typing import Dict, Optional, Sequence, Type
 
 from .auth import Auth
+from .codecs import (
+    BinaryCodecType,
+    JSONCodecType,
+    check_binary_codec,
+    check_json_codec,
+)
 from .exceptions import MisconfiguredException
 from .middlewares import Middleware
-from .utils import ProxiesType
+from .utils import DECLARED_MARK, DeclaredMethod, ProxiesType
 
 
 class BaseClient:
@@ -17,6 +24,13 @@ class BaseClient:
         middlewares: List of middlewares for the client.
         error_mappings: Mapping of status codes to exceptions.
         proxies: Proxy configuration for the client.
+        json_codec: Codec of the JSON bodies: "json", "orjson", "msgspec",
+            "auto" or a JSONCodec instance.
+        max_response_bytes: Limit of the response body size in bytes.
+        binary_codec: Binary format negotiated instead of JSON: "msgpack",
+            "cbor" or a BinaryCodec instance.
+        binary_requests: Encode the JSON request bodies with the binary
+            codec too. By default, only the responses are negotiated.
     """
 
     base_url: str = ""
@@ -26,7 +40,13 @@ class BaseClient:
     middlewares: Sequence[Middleware] = []
     error_mappings: Dict[int, Type] = {}
     proxies: ProxiesType = None
+    json_codec: JSONCodecType = None
+    max_response_bytes: Optional[int] = None
+    binary_codec: BinaryCodecType = None
+    binary_requests: bool = False
 
+    # The parameters before json_codec stay positional for compatibility
+    # pylint: disable-next=too-many-positional-arguments
     def __init__(
         self,
         base_url: Optional[str] = None,
@@ -36,6 +56,11 @@ class BaseClient:
         middlewares: Optional[Sequence[Middleware]] = None,
         error_mappings: Optional[Dict[int, Type]] = None,
         proxies: ProxiesType = None,
+        *,
+        json_codec: JSONCodecType = None,
+        max_response_bytes: Optional[int] = None,
+        binary_codec: BinaryCodecType = None,
+        binary_requests: Optional[bool] = None,
     ) -> None:
         self.base_url = base_url or self.base_url
         if not self.base_url:
@@ -48,6 +73,22 @@ class BaseClient:
         self.middlewares = middlewares or self.middlewares
         self.error_mappings = error_mappings or self.error_mappings
         self.proxies = proxies or self.proxies
+        check_json_codec(json_codec)
+        self.json_codec = json_codec or self.json_codec
+        if max_response_bytes is not None:
+            self.max_response_bytes = max_response_bytes
+        check_binary_codec(binary_codec)
+        self.binary_codec = binary_codec or self.binary_codec
+        if binary_requests is not None:
+            self.binary_requests = binary_requests
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # The endpoints are bound to the instances on access, so they
+        # can be prepared with `client.endpoint.prepare(...)`
+        for name, value in list(cls.__dict__.items()):
+            if inspect.isfunction(value) and hasattr(value, DECLARED_MARK):
+                setattr(cls, name, DeclaredMethod(value))
 
 
 __all__ = ["BaseClient"]
@@ -0,0 +1,367 @@
+import abc
+import functools
+import importlib.util
+import json
+from json import JSONDecodeError
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, Union
+
+from .exceptions import MisconfiguredException
+from .warnings import (
+    warn_binary_codec_unavailable,
+    warn_codec_unavailable,
+)
+
+
+class JSONCodec(abc.ABC):
+    """
+    Encoder of the JSON request bodies and decoder of the JSON responses.
+    The codec is set with the `json_codec` parameter of the client or the
+    declaration, either by name or as an instance of the subclass.
+    """
+
+    name: str
+    # The module that must be installed to use the codec
+    module: Optional[str] = None
+    media_type = "application/json"
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Encode the object to the JSON document."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: Union[bytes, str]) -> Any:
+        """
+        Decode the JSON document. Raises JSONDecodeError
+        if the document is not a valid JSON.
+        """
+        raise NotImplementedError
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class StdlibJSONCodec(JSONCodec):
+    """The codec of the standard json module, used by default."""
+
+    name = "json"
+
+    def dumps(self, obj: Any) -> bytes:
+        # The same encoding as httpx uses for the json parameter
+        return json.dumps(obj).encode("utf-8")
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return json.loads(data)
+
+
+class OrjsonCodec(JSONCodec):
+    """The codec of orjson."""
+
+    name = "orjson"
+    module = "orjson"
+
+    def __init__(self) -> None:
+        # pylint: disable=no-member
+        # pylint: disable-next=import-outside-toplevel
+        import orjson  # type: ignore[import-not-found]
+
+        self._dumps = functools.partial(
+            orjson.dumps, option=orjson.OPT_NON_STR_KEYS
+        )
+        # orjson.JSONDecodeError is a subclass of JSONDecodeError
+        self._loads = orjson.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        return self._loads(data)
+
+
+class MsgspecCodec(JSONCodec):
+    """The codec of msgspec.json."""
+
+    name = "msgspec"
+    module = "msgspec"
+
+    def __init__(self) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        import msgspec  # type: ignore[import-not-found]
+
+        self._decode_error = msgspec.DecodeError
+        self._dumps: Callable[[Any], bytes] = msgspec.json.Encoder().encode
+        self._loads: Callable[[Any], Any] = msgspec.json.Decoder().decode
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        try:
+            return self._loads(data)
+        except self._decode_error as e:
+            raise JSONDecodeError(str(e), "", 0) from e
+
+
+JSON_CODECS: Dict[str, Type[JSONCodec]] = {
+    codec.name: codec
+    for codec in (StdlibJSONCodec, OrjsonCodec, MsgspecCodec)
+}
+# The codecs tried by "auto", the fastest first
+_AUTO_ORDER = ("orjson", "msgspec", "json")
+
+JSONCodecType = Union[str, JSONCodec, None]
+# Type hints of the JSON values that need no validation: the outer type
+# of the decoded value and the type of the items, if they are checked
+_PLAIN_JSON_TYPES: Dict[Any, Tuple[Any, Optional[type]]] = {
+    Any: (object, None),
+    dict: (dict, None),
+    Dict[str, Any]: (dict, None),
+    list: (list, None),
+    List[Any]: (list, None),
+    List[dict]: (list, dict),
+    List[Dict[str, Any]]: (list, dict),
+}
+
+
+def _installed(
+    codec_class: Union[Type[JSONCodec], Type["BinaryCodec"]],
+) -> bool:
+    return (
+        codec_class.module is None
+        or importlib.util.find_spec(codec_class.module) is not None
+    )
+
+
+def check_json_codec(codec: JSONCodecType) -> None:
+    """
+    Check that the codec is a known name or an instance of JSONCodec.
+    Raises MisconfiguredException otherwise.
+    """
+    if codec is None or isinstance(codec, JSONCodec):
+        return
+    if codec != "auto" and codec not in JSON_CODECS:
+        raise MisconfiguredException(
+            f"Unknown json_codec {codec!r}, expected one of "
+            f"{', '.join(['auto', *JSON_CODECS])} or a JSONCodec instance"
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _codec_by_name(name: str) -> JSONCodec:
+    if name == "auto":
+        for auto_name in _AUTO_ORDER:
+            if _installed(JSON_CODECS[auto_name]):
+                return JSON_CODECS[auto_name]()
+    codec_class = JSON_CODECS[name]
+    if not _installed(codec_class):
+        warn_codec_unavailable(name)
+        return StdlibJSONCodec()
+    return codec_class()
+
+
+def get_json_codec(codec: JSONCodecType) -> JSONCodec:
+    """
+    Get the codec instance: by name, "auto" for the fastest installed one,
+    or the standard json module if the codec is not set. If the codec is
+    not installed, the standard json module is used with a warning.
+    """
+    if isinstance(codec, JSONCodec):
+        return codec
+    check_json_codec(codec)
+    return _codec_by_name(codec or "json")
+
+
+class BinaryDecodeError(ValueError):
+    """Raised by the binary codecs if the document is not valid."""
+
+
+class BinaryCodec(abc.ABC):
+    """
+    Codec of a binary format, e.g. MessagePack, negotiated instead of JSON.
+    The request bodies are encoded with the codec, and the responses are
+    decoded with it, if their Content-Type is one of the media types of the
+    codec. The codec is set with the `binary_codec` parameter of the client
+    or the declaration, either by name or as an instance of the subclass.
+    """
+
+    name: str
+    # The module that must be installed to use the codec
+    module: Optional[str] = None
+    # The media type of the request bodies and the Accept header
+    media_type: str
+    # The media types of the responses decoded with the codec
+    media_types: Tuple[str, ...] = ()
+
+    @abc.abstractmethod
+    def dumps(self, obj: Any) -> bytes:
+        """Encode the object to the document."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def loads(self, data: bytes) -> Any:
+        """
+        Decode the document. Raises BinaryDecodeError
+        if the document is not valid.
+        """
+        raise NotImplementedError
+
+    def accepts(self, media_type: str) -> bool:
+        """Check if the responses of the media type are decoded."""
+        return media_type == self.media_type or media_type in self.media_types
+
+    def __repr__(self):
+        return f"{self.__class__.__name__}()"
+
+
+class MsgpackCodec(BinaryCodec):
+    """The MessagePack codec of msgpack."""
+
+    name = "msgpack"
+    module = "msgpack"
+    media_type = "application/msgpack"
+    media_types = ("application/x-msgpack", "application/vnd.msgpack")
+
+    def __init__(self) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        import msgpack  # type: ignore[import-untyped,import-not-found]
+
+        self._errors = (ValueError, msgpack.UnpackException)
+        self._dumps = functools.partial(msgpack.packb, use_bin_type=True)
+        self._loads = functools.partial(msgpack.unpackb, raw=False)
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._loads(data)
+        except self._errors as e:
+            raise BinaryDecodeError(str(e)) from e
+
+
+class CBORCodec(BinaryCodec):
+    """The CBOR codec of cbor2."""
+
+    name = "cbor"
+    module = "cbor2"
+    media_type = "application/cbor"
+
+    def __init__(self) -> None:
+        # pylint: disable-next=import-outside-toplevel
+        import cbor2  # type: ignore[import-not-found]
+
+        self._decode_error = cbor2.CBORDecodeError
+        self._dumps: Callable[[Any], bytes] = cbor2.dumps
+        self._loads: Callable[[bytes], Any] = cbor2.loads
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        try:
+            return self._loads(data)
+        except self._decode_error as e:
+            raise BinaryDecodeError(str(e)) from e
+
+
+BINARY_CODECS: Dict[str, Type[BinaryCodec]] = {
+    codec.name: codec for codec in (MsgpackCodec, CBORCodec)
+}
+
+BinaryCodecType = Union[str, BinaryCodec, None]
+
+
+def check_binary_codec(codec: BinaryCodecType) -> None:
+    """
+    Check that the codec is a known name or an instance of BinaryCodec.
+    Raises MisconfiguredException otherwise.
+    """
+    if codec is None or isinstance(codec, BinaryCodec):
+        return
+    if codec not in BINARY_CODECS:
+        raise MisconfiguredException(
+            f"Unknown binary_codec {codec!r}, expected one of "
+            f"{', '.join(BINARY_CODECS)} or a BinaryCodec instance"
+        )
+
+
+@functools.lru_cache(maxsize=None)
+def _binary_codec_by_name(name: str) -> Optional[BinaryCodec]:
+    codec_class = BINARY_CODECS[name]
+    if not _installed(codec_class):
+        return None
+    return codec_class()
+
+
+def get_binary_codec(codec: BinaryCodecType) -> Optional[BinaryCodec]:
+    """
+    Get the codec instance by name, or None if the codec is not set.
+    If the codec is not installed, JSON is used with a warning.
+    """
+    if codec is None or isinstance(codec, BinaryCodec):
+        return codec
+    check_binary_codec(codec)
+    instance = _binary_codec_by_name(codec)
+    if instance is None:
+        warn_binary_codec_unavailable(codec)
+    return instance
+
+
+def binary_codec_for(
+    content_type: Optional[str], codec: Optional[BinaryCodec] = None
+) -> Optional[BinaryCodec]:
+    """
+    Get the codec of the responses with the Content-Type: the codec of
+    the client, if it accepts the media type, or the installed codec of
+    the media type. None for other media types, e.g. JSON.
+    """
+    if not content_type:
+        return None
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if codec is not None and codec.accepts(media_type):
+        return codec
+    for codec_class in BINARY_CODECS.values():
+        if media_type == codec_class.media_type or (
+            media_type in codec_class.media_types
+        ):
+            return _binary_codec_by_name(codec_class.name)
+    return None
+
+
+def plain_json_type(type_hint: Any) -> Optional[Tuple[Any, Optional[type]]]:
+    """
+    Get the types to check the decoded JSON against, if the type hint
+    is a plain JSON type that needs no validation, e.g. dict or List[dict].
+    """
+    try:
+        return _PLAIN_JSON_TYPES.get(type_hint)
+    except TypeError:  # pragma: no cover
+        # Unhashable type hints
+        return None
+
+
+def is_plain_json(data: Any, plain_type: Tuple[Any, Optional[type]]) -> bool:
+    """Check if the decoded JSON is the value of the plain JSON type."""
+    outer_type, item_type = plain_type
+    if not isinstance(data, outer_type):
+        return False
+    return item_type is None or all(
+        isinstance(item, item_type) for item in data
+    )
+
+
+__all__ = [
+    "JSONCodec",
+    "StdlibJSONCodec",
+    "OrjsonCodec",
+    "MsgspecCodec",
+    "JSONCodecType",
+    "get_json_codec",
+    "BinaryCodec",
+    "BinaryDecodeError",
+    "MsgpackCodec",
+    "CBORCodec",
+    "BinaryCodecType",
+    "get_binary_codec",
+    "binary_codec_for",
+]
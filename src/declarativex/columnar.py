@@ -0,0 +1,267 @@
+import datetime
+import functools
+import importlib.util
+import warnings
+from json import JSONDecodeError
+from typing import (
+    Annotated,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    List,
+    Tuple,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+from .exceptions import MisconfiguredException
+from .lazy import is_lazy_type, record_fields
+
+T = TypeVar("T")
+_NONE_TYPE = type(None)
+# The dtypes of the field types, the other types are kept as objects
+_DTYPES: Dict[Any, str] = {
+    int: "int64",
+    float: "float64",
+    bool: "bool",
+    datetime.datetime: "datetime64[us]",
+    datetime.date: "datetime64[D]",
+}
+# The dtypes of the optional fields, where null is NaN or NaT
+_OPTIONAL_DTYPES: Dict[Any, str] = {
+    int: "float64",
+    float: "float64",
+    datetime.datetime: "datetime64[us]",
+    datetime.date: "datetime64[D]",
+}
+
+
+class Columns(Dict[str, Any], Generic[T]):
+    """
+    Return type that decodes a JSON array of flat records into columns:
+    a dictionary of NumPy arrays keyed by the field of the model, e.g.
+    `-> Columns[Record]`, where Record is a pydantic model or a dataclass.
+    The dtypes are derived from the types of the fields, the records are
+    not validated or built as the model. Requires NumPy.
+    """
+
+
+def is_columns_type(type_hint: Any) -> bool:
+    """Check if the type hint is a parametrized Columns."""
+    return get_origin(type_hint) is Columns
+
+
+def _numpy() -> Any:
+    try:
+        # pylint: disable-next=import-outside-toplevel
+        import numpy  # type: ignore[import-not-found]
+    except ImportError as e:  # pragma: no cover
+        raise ImportError(
+            "Please install extra using 'pip install "
+            "declarativex[numpy]' to use Columns return type"
+        ) from e
+    return numpy
+
+
+def _explicit_dtype(metadata: Tuple[Any, ...]) -> Any:
+    """The NumPy dtype in the metadata of Annotated, if any."""
+    numpy = _numpy()
+    for item in metadata:
+        if isinstance(item, numpy.dtype) or (
+            isinstance(item, type) and issubclass(item, numpy.generic)
+        ):
+            return item
+    return None
+
+
+def field_dtype(annotation: Any) -> Any:
+    """
+    Get the dtype of the column of the field type: int64, float64, bool
+    and datetime64 for the scalar types, float64 (with NaN) for optional
+    numbers, object for the other types. The dtype can be set explicitly,
+    e.g. `Annotated[int, numpy.int32]`.
+    """
+    if get_origin(annotation) is Annotated:
+        annotation, *metadata = get_args(annotation)
+        dtype = _explicit_dtype(tuple(metadata))
+        if dtype is not None:
+            return dtype
+    if get_origin(annotation) is Union:
+        members = [
+            arg for arg in get_args(annotation) if arg is not _NONE_TYPE
+        ]
+        if len(members) == 1 and len(get_args(annotation)) == 2:
+            return _OPTIONAL_DTYPES.get(members[0], "object")
+        return "object"
+    try:
+        return _DTYPES.get(annotation, "object")
+    except TypeError:  # pragma: no cover
+        # Unhashable type hints
+        return "object"
+
+
+class _Column:
+    __slots__ = ("name", "key", "dtype", "required", "default")
+
+    def __init__(
+        self,
+        name: str,
+        key: str,
+        dtype: Any,
+        required: bool,
+        default: Callable[[], Any],
+    ):
+        self.name = name
+        self.key = key
+        self.dtype = dtype
+        self.required = required
+        self.default = default
+
+    def values(self, rows: List[Dict[str, Any]]) -> List[Any]:
+        """The values of the column, the default ones for missing keys."""
+        key = self.key
+        try:
+            return [row[key] for row in rows]
+        except KeyError:
+            if self.required:
+                raise ValueError(f"missing field {key!r}") from None
+        default = self.default()
+        return [row.get(key, default) for row in rows]
+
+    def to_array(self, values: List[Any]) -> Any:
+        """
+        Build the array of the values with the dtype of the column.
+        Raises ValueError if a value can't be converted to the dtype.
+        """
+        numpy = _numpy()
+        try:
+            if isinstance(self.dtype, str) and self.dtype.startswith(
+                "datetime64"
+            ):
+                with warnings.catch_warnings():
+                    # Timezone-aware datetimes are converted to UTC
+                    warnings.simplefilter("ignore", UserWarning)
+                    return numpy.array(values, dtype=self.dtype)
+            if self.dtype == "object":
+                array = numpy.empty(len(values), dtype=object)
+                # Lists in the values are not turned into dimensions
+                array[:] = values
+                return array
+            return numpy.array(values, dtype=self.dtype)
+        except (TypeError, ValueError, OverflowError) as e:
+            raise ValueError(
+                f"invalid values of field {self.key!r}: {e}"
+            ) from e
+
+
+@functools.lru_cache(maxsize=None)
+def _columns(model: type) -> Tuple[_Column, ...]:
+    """The columns of the model, resolved once per model."""
+    if not is_lazy_type(model):
+        raise MisconfiguredException(
+            f"Columns expects a pydantic model or a dataclass, got {model!r}"
+        )
+    return tuple(
+        _Column(name, key, field_dtype(annotation), required, default)
+        for name, key, annotation, required, default in record_fields(model)
+    )
+
+
+def _model(type_hint: Any) -> type:
+    args = get_args(type_hint)
+    return args[0] if args else None  # type: ignore[return-value]
+
+
+def decode_columns(type_hint: Any, data: Any) -> Columns:
+    """
+    Decode the JSON array of records into the columns of the model of
+    the Columns type hint. Raises ValueError if the data is not an array
+    of objects, a required field is missing or a value can't be converted
+    to the dtype.
+    """
+    columns = _columns(_model(type_hint))
+    if not isinstance(data, list) or not all(
+        isinstance(row, dict) for row in data
+    ):
+        raise ValueError("Columns expects an array of objects")
+    result: Columns = Columns()
+    for column in columns:
+        result[column.name] = column.to_array(column.values(data))
+    return result
+
+
+@functools.lru_cache(maxsize=None)
+def _msgspec_decoder(model: type) -> Any:
+    """
+    The msgspec decoder of the array of records as structs without
+    validation of the values and the garbage collector tracking, or None
+    if msgspec is not installed.
+    """
+    if importlib.util.find_spec("msgspec") is None:
+        return None
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec  # type: ignore[import-not-found]
+
+    fields: List[Any] = [
+        (column.name, Any)
+        if column.required
+        else (
+            column.name,
+            Any,
+            msgspec.field(default_factory=column.default),
+        )
+        for column in _columns(model)
+    ]
+    record = msgspec.defstruct(
+        "Record",
+        fields,
+        rename={column.name: column.key for column in _columns(model)},
+        kw_only=True,
+        gc=False,
+    )
+    return msgspec.json.Decoder(List[record])  # type: ignore[valid-type]
+
+
+def decode_columns_json(
+    type_hint: Any,
+    json_data: Union[str, bytes],
+    loads: Callable[[Union[str, bytes]], Any],
+) -> Columns:
+    """
+    Decode the JSON document into the columns of the model of the Columns
+    type hint. If msgspec is installed, the records are decoded straight
+    from the document as lightweight structs, without the dictionaries.
+    Otherwise, the document is decoded with `loads`.
+    Raises JSONDecodeError if the document is not a valid JSON,
+    ValueError if the records don't match (see decode_columns).
+    """
+    model = _model(type_hint)
+    decoder = _msgspec_decoder(model) if is_lazy_type(model) else None
+    if decoder is None:
+        return decode_columns(type_hint, loads(json_data))
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec
+
+    try:
+        rows = decoder.decode(json_data)
+    except msgspec.ValidationError as e:
+        raise ValueError(str(e)) from e
+    except msgspec.DecodeError as e:
+        raise JSONDecodeError(str(e), "", 0) from e
+    result: Columns = Columns()
+    for column in _columns(model):
+        name = column.name
+        result[name] = column.to_array([getattr(row, name) for row in rows])
+    return result
+
+
+__all__ = [
+    "Columns",
+    "is_columns_type",
+    "field_dtype",
+    "decode_columns",
+    "decode_columns_json",
+]
@@ -1,33 +1,348 @@
+import functools
+import json
+import re
+import sys
 import warnings
-from typing import Any, Type, TypeVar, Union
+from json import JSONDecodeError
+from typing import (
+    TYPE_CHECKING,
+    Annotated,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
 
-import pydantic
-from pydantic import BaseModel
+if TYPE_CHECKING:  # pragma: no cover
+    from pydantic import BaseModel, TypeAdapter
 
-
-M = TypeVar("M", bound=BaseModel)
+# pydantic is imported on the first use, so importing declarativex
+# doesn't pay for it if the client doesn't use pydantic models.
+M = TypeVar("M", bound="BaseModel")
 T = TypeVar("T")
 
 
+def __getattr__(name: str) -> Any:
+    # PEP 562, pydantic and its BaseModel are imported on the first access
+    if name in ("pydantic", "BaseModel"):
+        # pylint: disable-next=import-outside-toplevel,redefined-outer-name
+        import pydantic
+
+        return pydantic if name == "pydantic" else pydantic.BaseModel
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+@functools.lru_cache(maxsize=None)
+def pydantic_v2() -> bool:
+    """Check once if pydantic v2 is installed."""
+    # pylint: disable-next=import-outside-toplevel
+    from pydantic.version import VERSION
+
+    return VERSION.startswith("2.")
+
+
+def is_pydantic_model(obj: Any) -> bool:
+    """
+    Check if the object is an instance of pydantic model. If pydantic
+    wasn't imported yet, the object can't be its instance.
+    """
+    pydantic = sys.modules.get("pydantic")
+    return pydantic is not None and isinstance(obj, pydantic.BaseModel)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_type_adapter(type_: Any) -> "TypeAdapter":
+    return _type_adapter(type_)
+
+
+def _type_adapter(type_: Any) -> "TypeAdapter":
+    # pylint: disable-next=import-outside-toplevel
+    from pydantic import TypeAdapter
+
+    return TypeAdapter(type_)
+
+
+def get_type_adapter(type_: Any) -> "TypeAdapter":
+    """
+    Get the TypeAdapter of the type (pydantic v2 only). Building
+    the adapter is expensive, so adapters are cached per type.
+    """
+    try:
+        return _cached_type_adapter(type_)
+    except TypeError:  # pragma: no cover
+        # Unhashable types are not cached
+        return _type_adapter(type_)
+
+
 def parse_obj(pydantic_model: Type[M], obj: Any) -> M:
+    if pydantic_v2():
+        return pydantic_model.model_validate(obj)
     with warnings.catch_warnings():  # pragma: no cover
         warnings.simplefilter("ignore", category=DeprecationWarning)
         return pydantic_model.parse_obj(obj=obj)
 
 
 def parse_raw(pydantic_model: Type[M], json_data: Union[str, bytes]) -> M:
+    if pydantic_v2():
+        return pydantic_model.model_validate_json(json_data)
     with warnings.catch_warnings():  # pragma: no cover
         warnings.simplefilter("ignore", category=DeprecationWarning)
         return pydantic_model.parse_raw(b=json_data)
 
 
 def to_dict(pydantic_obj: M, **kwargs) -> dict:
+    if pydantic_v2():
+        return pydantic_obj.model_dump(**kwargs)
     with warnings.catch_warnings():  # pragma: no cover
         warnings.simplefilter("ignore", category=DeprecationWarning)
         return pydantic_obj.dict(**kwargs)
 
 
+def is_pydantic_model_type(type_: Any) -> bool:
+    """
+    Check if the type is a pydantic model class. If pydantic wasn't
+    imported yet, the type can't be its subclass.
+    """
+    pydantic = sys.modules.get("pydantic")
+    return (
+        pydantic is not None
+        and isinstance(type_, type)
+        and issubclass(type_, pydantic.BaseModel)
+    )
+
+
+def model_fields(
+    pydantic_model: Type["BaseModel"],
+) -> Iterator[Tuple[str, str, Any, bool, Callable[[], Any]]]:
+    """
+    Get the fields of the pydantic model: the name, the key in the input
+    data, the type with its constraints, whether the field is required
+    and the function that returns the default value.
+    """
+    if pydantic_v2():
+        fields = pydantic_model.model_fields
+        for name, field in fields.items():  # type: ignore[attr-defined]
+            annotation: Any = field.annotation
+            if field.metadata:
+                annotation = Annotated[(annotation, *field.metadata)]
+            yield (
+                name,
+                field.alias or name,
+                annotation,
+                field.is_required(),
+                functools.partial(
+                    field.get_default, call_default_factory=True
+                ),
+            )
+        return
+    v1_fields: Dict[str, Any] = getattr(pydantic_model, "__fields__")
+    for name, field in v1_fields.items():  # pragma: no cover
+        yield name, field.alias, field.outer_type_, field.required, (
+            field.get_default
+        )
+
+
 def parse_obj_as(type_: Type[T], obj: Any) -> T:
+    if is_msgspec_type(type_):
+        # pylint: disable-next=import-outside-toplevel
+        import msgspec  # type: ignore[import-not-found]
+
+        return msgspec.convert(obj, type_)
+    if pydantic_v2():
+        return get_type_adapter(type_).validate_python(obj)
+    # pylint: disable-next=import-outside-toplevel
+    import pydantic
+
     with warnings.catch_warnings():  # pragma: no cover
         warnings.simplefilter("ignore", category=DeprecationWarning)
         return pydantic.parse_obj_as(type_, obj)
+
+
+def parse_json_as(
+    type_: Type[T],
+    json_data: Union[str, bytes],
+    loads: Callable[[Union[str, bytes]], Any] = json.loads,
+) -> T:
+    """
+    Parse the JSON document as the type. With pydantic v2 the document is
+    validated directly, without building the intermediate Python objects,
+    otherwise it is decoded with `loads` first.
+    Raises JSONDecodeError if the document is not a valid JSON.
+    """
+    if is_msgspec_type(type_):
+        return parse_msgspec_json(type_, json_data)
+    if not pydantic_v2():
+        return parse_obj_as(type_, loads(json_data))
+    # pylint: disable-next=import-outside-toplevel
+    from pydantic import ValidationError
+
+    try:
+        return get_type_adapter(type_).validate_json(json_data)
+    except ValidationError as e:
+        errors = e.errors()
+        if errors and errors[0]["type"] == "json_invalid":
+            raise JSONDecodeError(errors[0]["msg"], "", 0) from e
+        raise
+
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_JSON_ARRAY = re.compile(r"[ \t\n\r]*\[")
+_DECODER = json.JSONDecoder()
+
+
+def supports_chunks(type_: Any) -> bool:
+    """
+    Check if the JSON document can be parsed as the type in chunks:
+    a list of items validated by pydantic v2.
+    """
+    return (
+        get_origin(type_) is list
+        and pydantic_v2()
+        and not is_msgspec_type(type_)
+    )
+
+
+def _skip_whitespace(text: str, index: int = 0) -> int:
+    """The index of the first non-whitespace character from the index."""
+    match = _WHITESPACE.match(text, index)
+    return match.end() if match else index
+
+
+def _json_array_chunks(text: str, chunk_size: int) -> Iterator[list]:
+    """
+    Decode the items of the JSON array one by one with the standard json
+    module, in lists of `chunk_size` items. Each item is decoded with
+    a separate call, so other threads run between them.
+    Raises JSONDecodeError if the document is not a valid JSON array.
+    """
+    index = _skip_whitespace(text)
+    if text[index:index + 1] != "[":
+        raise JSONDecodeError("Expecting '['", text, index)
+    index = _skip_whitespace(text, index + 1)
+    chunk: list = []
+    closed = text[index:index + 1] == "]"
+    while not closed:
+        item, index = _DECODER.raw_decode(text, index)
+        chunk.append(item)
+        if len(chunk) == chunk_size:
+            yield chunk
+            chunk = []
+        index = _skip_whitespace(text, index)
+        closed = text[index:index + 1] == "]"
+        if not closed:
+            if text[index:index + 1] != ",":
+                raise JSONDecodeError("Expecting ',' delimiter", text, index)
+            index = _skip_whitespace(text, index + 1)
+    if _skip_whitespace(text, index + 1) != len(text):
+        raise JSONDecodeError("Extra data", text, index + 1)
+    if chunk:
+        yield chunk
+
+
+def parse_json_in_chunks(
+    type_: Type[T],
+    json_data: Union[str, bytes],
+    chunk_size: int,
+) -> T:
+    """
+    Parse the JSON array as the list of items (see `supports_chunks`)
+    in chunks: the items are decoded with the standard json module and
+    validated `chunk_size` items at a time. Each call holds the GIL, but
+    other threads, e.g. the event loop, run between them.
+    Other types and documents are parsed with `parse_json_as`.
+    Raises JSONDecodeError if the document is not a valid JSON.
+    """
+    if isinstance(json_data, bytes):
+        json_data = json_data.decode(
+            json.detect_encoding(json_data), "surrogatepass"
+        )
+    if not supports_chunks(type_) or not _JSON_ARRAY.match(json_data):
+        return parse_json_as(type_, json_data)
+    # pylint: disable-next=import-outside-toplevel
+    from pydantic import ValidationError
+
+    adapter = get_type_adapter(type_)
+    result: list = []
+    try:
+        for chunk in _json_array_chunks(json_data, chunk_size):
+            result.extend(adapter.validate_python(chunk))
+    except ValidationError:
+        # The locations of the errors are relative to the chunk,
+        # the whole document is validated again to report them
+        adapter.validate_json(json_data)
+        raise
+    return result  # type: ignore[return-value]
+
+
+def is_msgspec_struct(obj: Any) -> bool:
+    """
+    Check if the object is an instance of msgspec.Struct. If msgspec
+    wasn't imported yet, the object can't be its instance.
+    """
+    msgspec = sys.modules.get("msgspec")
+    return msgspec is not None and isinstance(obj, msgspec.Struct)
+
+
+def is_msgspec_type(type_: Any) -> bool:
+    """
+    Check if the type is a msgspec.Struct, a parametrized generic Struct
+    or a container of them, e.g. List[User] or Dict[str, User].
+    """
+    msgspec = sys.modules.get("msgspec")
+    if msgspec is None:
+        return False
+    try:
+        return _cached_contains_struct(type_, msgspec.Struct)
+    except TypeError:  # pragma: no cover
+        # Unhashable types are not cached
+        return _contains_struct(type_, msgspec.Struct)
+
+
+def _contains_struct(type_: Any, struct: type) -> bool:
+    candidate = get_origin(type_) or type_
+    if isinstance(candidate, type) and issubclass(candidate, struct):
+        return True
+    return any(_contains_struct(arg, struct) for arg in get_args(type_))
+
+
+_cached_contains_struct = functools.lru_cache(maxsize=1024)(_contains_struct)
+
+
+def msgspec_to_builtins(obj: Any) -> Any:
+    """Convert the msgspec.Struct to the builtin types, e.g. a dict."""
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec  # type: ignore[import-not-found]
+
+    return msgspec.to_builtins(obj)
+
+
+@functools.lru_cache(maxsize=1024)
+def _msgspec_decoder(type_: Any) -> Any:
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec
+
+    return msgspec.json.Decoder(type_)
+
+
+def parse_msgspec_json(type_: Any, json_data: Union[str, bytes]) -> Any:
+    """
+    Decode the JSON document as the msgspec type with the decoder cached
+    per type. The document is decoded and validated in one pass.
+    Raises JSONDecodeError if the document is not a valid JSON,
+    msgspec.ValidationError if it doesn't match the type.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec
+
+    try:
+        return _msgspec_decoder(type_).decode(json_data)
+    except msgspec.ValidationError:
+        raise
+    except msgspec.DecodeError as e:
+        raise JSONDecodeError(str(e), "", 0) from e
@@ -0,0 +1,158 @@
+import contextlib
+import inspect
+import time
+from contextvars import ContextVar
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    Iterator,
+    Optional,
+    Tuple,
+)
+
+import httpx
+
+from .dependencies import Deadline
+from .exceptions import DeadlineExceeded, MisconfiguredException
+
+ResponseObserver = Callable[[httpx.Response], None]
+
+_response_observers: ContextVar[Tuple[ResponseObserver, ...]] = ContextVar(
+    "declarativex_response_observers", default=()
+)
+_deadline: ContextVar[Optional[float]] = ContextVar(
+    "declarativex_deadline", default=None
+)
+
+
+@contextlib.contextmanager
+def observe_responses(observer: ResponseObserver) -> Iterator[None]:
+    """
+    Register an observer for every httpx.Response received by the executors
+    inside of this context. Observers are stacked, so nested support
+    decorators all receive the response.
+    """
+    token = _response_observers.set(_response_observers.get() + (observer,))
+    try:
+        yield
+    finally:
+        _response_observers.reset(token)
+
+
+def notify_response(response: httpx.Response) -> None:
+    """
+    Pass the response to all observers registered in the current context.
+    """
+    for observer in _response_observers.get():
+        observer(response)
+
+
+@contextlib.contextmanager
+def deadline(
+    timeout: Optional[float] = None, *, at: Optional[float] = None
+) -> Iterator[None]:
+    """
+    Limit the total time of all calls made inside of this context.
+    The deadline is either `timeout` seconds from now or the `at` moment
+    of time.monotonic() clock, e.g. the caller's own deadline.
+    Nested deadlines can only shrink the outer one.
+    """
+    if (timeout is None) == (at is None):
+        raise MisconfiguredException(
+            "Either timeout or at must be specified"
+        )
+    if at is None:
+        at = time.monotonic() + timeout  # type: ignore[operator]
+    current = _deadline.get()
+    token = _deadline.set(at if current is None else min(current, at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining_time() -> Optional[float]:
+    """
+    Seconds left until the deadline of the current context or None
+    if there is no deadline.
+    """
+    at = _deadline.get()
+    if at is None:
+        return None
+    return at - time.monotonic()
+
+
+def check_deadline(delay: float = 0.0) -> None:
+    """
+    Raise DeadlineExceeded if the deadline of the current context
+    will be overrun after waiting for `delay` seconds.
+    """
+    remaining = remaining_time()
+    if remaining is not None and delay >= remaining:
+        raise DeadlineExceeded()
+
+
+def _is_deadline(annotation: Any) -> bool:
+    """Check if the annotation is Annotated with Deadline dependency."""
+    metadata = getattr(annotation, "__metadata__", None)
+    if not metadata:
+        return False
+    dependency = metadata[0]
+    return isinstance(dependency, Deadline) or (
+        isinstance(dependency, type) and issubclass(dependency, Deadline)
+    )
+
+
+class DeadlineParameter:
+    """
+    Parameter of the declared function annotated with Deadline dependency.
+    Used by decorators to start the deadline before the call is made.
+    """
+
+    def __init__(self, name: str, position: int, default: Any):
+        self.name = name
+        self.position = position
+        self.default = default
+
+    @classmethod
+    def find(cls, func: Callable) -> Optional["DeadlineParameter"]:
+        """Find the Deadline parameter in the function signature."""
+        annotations = getattr(func, "__annotations__", {})
+        if not any(
+            _is_deadline(annotation) for annotation in annotations.values()
+        ):
+            # Most functions have no deadline, skip the signature
+            return None
+        parameters = inspect.signature(func).parameters
+        for position, (name, parameter) in enumerate(parameters.items()):
+            if _is_deadline(annotations.get(name)):
+                default = parameter.default
+                if default is inspect.Parameter.empty:
+                    default = None
+                return cls(name=name, position=position, default=default)
+        return None
+
+    def scope(
+        self, args: Tuple[Any, ...], kwargs: Dict[str, Any]
+    ) -> ContextManager[None]:
+        """Enter the deadline passed to the call, if any."""
+        if len(args) > self.position:
+            value = args[self.position]
+        else:
+            value = kwargs.get(self.name, self.default)
+        if value is None:
+            return contextlib.nullcontext()
+        return deadline(value)
+
+
+__all__ = [
+    "observe_responses",
+    "notify_response",
+    "ResponseObserver",
+    "deadline",
+    "remaining_time",
+    "check_deadline",
+    "DeadlineParameter",
+]
@@ -0,0 +1,214 @@
+import dataclasses
+import threading
+from collections import abc
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    Tuple,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+Decoder = Callable[[Any], Any]
+_SEQUENCES = (list, abc.Sequence, abc.MutableSequence, abc.Iterable)
+_MAPPINGS = (dict, abc.Mapping, abc.MutableMapping)
+_NONE_TYPE = type(None)
+
+_decoders: Dict[Any, Decoder] = {}
+# Decoders being generated, only accessed under the lock
+_generating: Dict[Any, Decoder] = {}
+_lock = threading.RLock()
+
+
+def _identity(value: Any) -> Any:
+    return value
+
+
+def _is_dataclass_type(type_hint: Any) -> bool:
+    return isinstance(type_hint, type) and dataclasses.is_dataclass(type_hint)
+
+
+def _resolve_field_types(
+    dataclass_type: type, type_arguments: Mapping[Any, Any]
+) -> Dict[str, Any]:
+    """
+    Get the types of the fields accepted by __init__ with the TypeVars
+    replaced by the arguments of the parametrization.
+    """
+    try:
+        hints = get_type_hints(dataclass_type)
+    except (NameError, TypeError):  # pragma: no cover
+        # Unresolvable forward references are left as is
+        hints = {}
+    return {
+        field.name: _substitute(
+            hints.get(field.name, field.type), type_arguments
+        )
+        for field in dataclasses.fields(dataclass_type)
+        if field.init
+    }
+
+
+def _substitute(type_hint: Any, type_arguments: Mapping[Any, Any]) -> Any:
+    """Replace the TypeVars in the type hint with the concrete types."""
+    if isinstance(type_hint, TypeVar):
+        return type_arguments.get(type_hint, Any)
+    args = get_args(type_hint)
+    if not args or not type_arguments:
+        return type_hint
+    substituted = tuple(_substitute(arg, type_arguments) for arg in args)
+    if substituted == args:
+        return type_hint
+    origin = get_origin(type_hint)
+    if origin is Union:
+        return Union[substituted]
+    try:
+        # Generic aliases of typing and of the user classes
+        return type_hint.copy_with(substituted)
+    except AttributeError:  # pragma: no cover
+        # Builtin generics, e.g. list[int]
+        return origin[substituted]
+
+
+def _compile_converter(type_hint: Any) -> Decoder:
+    """
+    Compile the converter of the value of the type hint. Values that
+    don't contain dataclasses are returned as is, without copying.
+    """
+    origin = get_origin(type_hint)
+    if _is_dataclass_type(type_hint) or _is_dataclass_type(origin):
+        return get_dataclass_decoder(type_hint)
+    if origin is Union:
+        return _compile_optional_converter(get_args(type_hint))
+    if origin in _SEQUENCES or origin in _MAPPINGS:
+        return _compile_collection_converter(origin, get_args(type_hint))
+    return _identity
+
+
+def _compile_optional_converter(args: Tuple[Any, ...]) -> Decoder:
+    members = [arg for arg in args if arg is not _NONE_TYPE]
+    if len(members) != 1:
+        # Unions of several types can't be told apart without
+        # validation, the value is kept as is
+        return _identity
+    convert = _compile_converter(members[0])
+    if convert is _identity:
+        return _identity
+    return lambda value: None if value is None else convert(value)
+
+
+def _compile_collection_converter(
+    origin: Any, args: Tuple[Any, ...]
+) -> Decoder:
+    convert = _compile_converter(args[-1]) if args else _identity
+    if convert is _identity:
+        return _identity
+    if origin in _MAPPINGS:
+        return lambda value: {
+            key: convert(item) for key, item in value.items()
+        }
+    return lambda value: [convert(item) for item in value]
+
+
+def _generate_decoder(
+    dataclass_type: type, field_types: Mapping[str, Any]
+) -> Decoder:
+    """
+    Generate the source of the decoder function and compile it. Required
+    fields are read from the dictionary directly, fields with defaults
+    only if they are present. Unknown keys are ignored.
+    """
+    name = dataclass_type.__qualname__
+
+    def missing_field(error: KeyError) -> TypeError:
+        return TypeError(
+            f"{name} is missing required field {error.args[0]!r}"
+        )
+
+    namespace: Dict[str, Any] = {
+        "cls": dataclass_type,
+        "missing_field": missing_field,
+    }
+    required: List[str] = []
+    optional: List[str] = []
+    for index, (field_name, field_type) in enumerate(field_types.items()):
+        convert = _compile_converter(field_type)
+        value = f"data[{field_name!r}]"
+        if convert is not _identity:
+            namespace[f"convert_{index}"] = convert
+            value = f"convert_{index}({value})"
+        field = dataclass_type.__dataclass_fields__[  # type: ignore
+            field_name
+        ]
+        if (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING
+        ):
+            required.append(f"            {field_name!r}: {value},\n")
+        else:
+            optional.append(
+                f"    if {field_name!r} in data:\n"
+                f"        kwargs[{field_name!r}] = {value}\n"
+            )
+    source = (
+        "def decode(data):\n"
+        "    try:\n"
+        "        kwargs = {\n" + "".join(required) + "        }\n"
+        "    except KeyError as e:\n"
+        "        raise missing_field(e) from None\n"
+        + "".join(optional)
+        + "    return cls(**kwargs)\n"
+    )
+    # pylint: disable-next=exec-used
+    exec(compile(source, f"<decoder of {name}>", "exec"), namespace)
+    return namespace["decode"]
+
+
+def get_dataclass_decoder(type_hint: Any) -> Decoder:
+    """
+    Get the decoder of the dataclass, e.g. `User` or `Paginated[User]`,
+    that builds the instance from the decoded JSON object. The decoder is
+    generated once per concrete parametrization: the field types, nested
+    dataclasses, Optional, List and Dict fields are resolved when the
+    decoder is generated, not on every response.
+    The input data is never changed.
+    """
+    decoder = _decoders.get(type_hint)
+    if decoder is not None:
+        return decoder
+    with _lock:
+        decoder = _decoders.get(type_hint) or _generating.get(type_hint)
+        if decoder is not None:
+            return decoder
+
+        # Self-referencing dataclasses get the decoder that is being
+        # generated, it is looked up when the data is decoded
+        def deferred(data: Any) -> Any:
+            return _decoders[type_hint](data)
+
+        _generating[type_hint] = deferred
+        try:
+            origin = get_origin(type_hint) or type_hint
+            parameters = getattr(origin, "__parameters__", ())
+            type_arguments = dict(zip(parameters, get_args(type_hint)))
+            decoder = _generate_decoder(
+                origin, _resolve_field_types(origin, type_arguments)
+            )
+        finally:
+            del _generating[type_hint]
+        _decoders[type_hint] = decoder
+    return decoder
+
+
+def decode_dataclass(type_hint: Any, data: Any) -> Any:
+    """Build the dataclass (or its parametrization) from the data."""
+    return get_dataclass_decoder(type_hint)(data)
+
+
+__all__ = ["get_dataclass_decoder", "decode_dataclass", "Decoder"]
@@ -1,30 +1,39 @@
 import abc
+import copy
 import dataclasses
 import enum
+import functools
 import inspect
 import json
 from string import Formatter
 from typing import (
     Any,
     Callable,
+    Collection,
+    Dict,
     List,
     Optional,
+    Sequence,
     TYPE_CHECKING,
+    Tuple,
     Type,
     TypeVar,
     Union,
     get_args,
 )
 
-from pydantic import BaseModel
-
-from .compatibility import to_dict
+from .compatibility import (
+    is_msgspec_struct,
+    is_pydantic_model,
+    msgspec_to_builtins,
+    to_dict,
+)
 from .exceptions import (
     AnnotationException,
     DependencyValidationError,
     MisconfiguredException,
 )
-from .validation import _validate_type_hint
+from .validation import Validator, compile_validator
 from .warnings import warn_no_type_hint
 
 if TYPE_CHECKING:
@@ -43,6 +52,7 @@ class Location(str, enum.Enum):
     cookies = "cookies"
     json = "json"
     timeout = "timeout"
+    deadline = "deadline"
     data = "data"
     files = "files"
 
@@ -61,6 +71,8 @@ class Dependency(abc.ABC):
     _field_name: str
     _value: Any
     _type_hint: Optional[Type] = None
+    _validator: Optional[Validator] = None
+    trusted: bool = False
 
     def __init__(
         self,
@@ -89,8 +101,12 @@ class Dependency(abc.ABC):
 
     @type_hint.setter
     def type_hint(self, value: Union[Type[Value], None]) -> None:
-        """Set the type hint for the dependency."""
+        """
+        Set the type hint for the dependency. The validator of the type
+        hint is compiled once here, not on every call.
+        """
         self._type_hint = value
+        self._validator = compile_validator(value) if value else None
 
     @property
     def field_name(self) -> str:
@@ -114,25 +130,35 @@ class Dependency(abc.ABC):
 
     def validate(self, value: Any) -> Any:
         """
-        Validate the value against the type hint.
+        Validate the value against the type hint. Values of trusted
+        dependencies and dependencies without type hint are not validated,
+        the missing type hint is reported when the call plan is compiled.
         :param value: The value to validate.
         :return: The value if it is valid.
         """
-        if self.type_hint:
-            return _validate_type_hint(self.type_hint, value)
-        # If no type hint is provided, we can't validate the value.
-        # We show a warning instead and return the original value.
-        warn_no_type_hint(self.field_name)
-        return value
+        if self._validator is None or self.trusted:
+            return value
+        return self._validator(value)
 
     def modify_request(self, request: "RawRequest") -> "RawRequest":
         """
-        Modify the request.
+        Modify the request with the value set to the dependency.
+        :param request: The request to modify.
+        :return: The modified request.
+        """
+        return self.apply(request, self.value)
+
+    def apply(self, request: "RawRequest", value: Any) -> "RawRequest":
+        """
+        Modify the request with the validated value of the call. The
+        dependency itself stays untouched, so one instance is shared
+        by all calls of the endpoint.
         :param request: The request to modify.
+        :param value: The validated value.
         :return: The modified request.
         """
         data = getattr(request, self.location.value)
-        data[self.field_name] = self.value
+        data[self.field_name] = value
         setattr(request, self.location.value, data)
         return request
 
@@ -193,7 +219,7 @@ class FormField(Dependency):
 
 class FullReplacementDependency(Dependency):
     """
-    Dependency for JSON. The value can be a BaseModel,
+    Dependency for JSON. The value can be a BaseModel, a msgspec.Struct,
     a dataclass, a dict or a JSON string.
     """
 
@@ -203,29 +229,34 @@ class FullReplacementDependency(Dependency):
         """Field name is unused for Json."""
         super().__init__()
 
-    def modify_request(self, request: "RawRequest") -> "RawRequest":
+    def apply(self, request: "RawRequest", value: Any) -> "RawRequest":
         """
         Modify the request. If the value is a BaseModel or a dataclass, the
         fields of the value are merged with the JSON data.
         :param request: The request to modify.
+        :param value: The validated value.
         :return: The modified request.
         """
         data = getattr(request, self.location.value)
-        if isinstance(self.value, BaseModel):
+        if is_pydantic_model(value):
             # If the value is a BaseModel, we convert it to
             # a dict and merge it with the JSON data.
-            data = {**data, **to_dict(self.value)}
-        elif dataclasses.is_dataclass(self.value):
-            # If the value is a dataclass, we convert it to
+            data = {**data, **to_dict(value)}
+        elif is_msgspec_struct(value):
+            # If the value is a msgspec.Struct, we convert it to
+            # a dict and merge it with the JSON data.
+            data = {**data, **msgspec_to_builtins(value)}
+        elif dataclasses.is_dataclass(value) and not isinstance(value, type):
+            # If the value is a dataclass instance, we convert it to
             # a dict and merge it with the JSON data.
-            data = {**data, **dataclasses.asdict(self.value)}
-        elif isinstance(self.value, dict):
+            data = {**data, **dataclasses.asdict(value)}
+        elif isinstance(value, dict):
             # If the value is a dict, we merge it with the JSON data.
-            data = {**data, **self.value}
-        elif isinstance(self.value, str):
+            data = {**data, **value}
+        elif isinstance(value, str):
             # If the value is a JSON string, we merge it with the JSON data.
             try:
-                data = {**data, **json.loads(self.value)}
+                data = {**data, **json.loads(value)}
             except ValueError as exc:
                 # If the value is not a valid JSON string, we raise a
                 # DependencyValidationError.
@@ -249,8 +280,8 @@ class Files(Dependency):
     location = Location.files
     _http_method_whitelist = ["POST", "PUT", "PATCH"]
 
-    def modify_request(self, request: "RawRequest") -> "RawRequest":
-        setattr(request, self.location.value, self.value)
+    def apply(self, request: "RawRequest", value: Any) -> "RawRequest":
+        setattr(request, self.location.value, value)
         return request
 
 
@@ -261,13 +292,215 @@ class Timeout(Dependency):
 
     location = Location.timeout
 
-    def modify_request(self, request: "RawRequest") -> "RawRequest":
+    def apply(self, request: "RawRequest", value: Any) -> "RawRequest":
         """
         Modify the request.
         :param request: The request to modify.
+        :param value: The validated value.
         :return: The modified request.
         """
-        setattr(request, self.location.value, self.value)
+        setattr(request, self.location.value, value)
+        return request
+
+
+class Deadline(Dependency):
+    """
+    Dependency for the deadline of the whole call. The value is the number
+    of seconds the call may take, including retries, rate limiter waits and
+    middlewares. Unlike Timeout, it is not applied per attempt.
+    """
+
+    location = Location.deadline
+
+    def apply(self, request: "RawRequest", value: Any) -> "RawRequest":
+        """
+        The deadline is applied by the decorators before the request is
+        prepared, so the request is left untouched.
+        :param request: The request to modify.
+        :param value: The validated value.
+        :return: The request.
+        """
+        return request
+
+
+def get_parameter_names(func: Callable) -> Sequence[str]:
+    """
+    Get the names of the parameters of the function. Reads the code object
+    of plain functions, which is much faster than inspect.signature.
+    """
+    code = getattr(func, "__code__", None)
+    if code is None or hasattr(func, "__wrapped__"):
+        return list(inspect.signature(func).parameters)
+    count = code.co_argcount + code.co_kwonlyargcount
+    # pylint: disable-next=no-member
+    count += bool(code.co_flags & inspect.CO_VARARGS)
+    # pylint: disable-next=no-member
+    count += bool(code.co_flags & inspect.CO_VARKEYWORDS)
+    return code.co_varnames[:count]
+
+
+class ParameterPlan:
+    """
+    Compiled parameter of the endpoint: its name, default value and
+    the dependency template with the type hint and field name set.
+    """
+
+    __slots__ = ("name", "default", "dependency")
+
+    def __init__(self, name: str, default: Any, dependency: Dependency):
+        self.name = name
+        self.default = default
+        self.dependency = dependency
+
+
+class CallPlan:
+    """
+    Call plan of the endpoint, compiled once from the function signature.
+    On every call the values are only validated and applied by the shared
+    dependencies, the signature and Annotated metadata are not inspected
+    again.
+    """
+
+    def __init__(
+        self,
+        parameter_names: Sequence[str],
+        parameters: Sequence[ParameterPlan],
+        return_type: Any,
+    ):
+        self.parameter_names = tuple(parameter_names)
+        self.parameters = tuple(parameters)
+        self.return_type = return_type
+
+    @staticmethod
+    def _resolve_dependency(
+        annotation: Any,
+        is_template_variable: bool,
+        gql: bool,
+    ) -> Dependency:
+        """
+        Resolve the dependency of the parameter from its annotation.
+        :param annotation: The annotation of the parameter.
+        :param is_template_variable: Whether the parameter is in the URL
+            template or GraphQL query variables.
+        :param gql: Whether the endpoint is GraphQL endpoint.
+        :return: The dependency template.
+        """
+        if hasattr(annotation, "__metadata__"):
+            # Extracting the type hint and the dependency from the
+            # Annotated type.
+            type_hint, dependency = get_args(annotation)
+            if isinstance(dependency, Dependency):
+                # If the dependency is already an instance of Dependency,
+                # we copy it, so the annotation stays untouched.
+                dependency = copy.copy(dependency)
+            elif inspect.isclass(dependency) and issubclass(
+                dependency, Dependency
+            ):
+                # If the dependency is a class, we instantiate it.
+                dependency = dependency()
+            else:
+                # If the dependency is not an instance of Dependency,
+                # we raise an AnnotationException.
+                raise AnnotationException(annotation)
+            dependency.type_hint = type_hint
+            return dependency
+        if is_template_variable:
+            # If the parameter is in the URL template and not annotated,
+            # we assume it is a Path dependency.
+            dependency = JsonField() if gql else Path()
+        else:
+            # If the parameter is not annotated and not in the URL
+            # template, we assume it is a Query dependency.
+            dependency = Query()
+        dependency.type_hint = annotation
+        return dependency
+
+    @classmethod
+    def compile(
+        cls,
+        func: Callable,
+        method: str,
+        url_template_variables: Collection[str],
+        gql: bool = False,
+        trusted: bool = False,
+    ) -> "CallPlan":
+        """
+        Compile the call plan of the function.
+        :param func: The declared function.
+        :param method: The HTTP method of the endpoint.
+        :param url_template_variables: The variables of the URL template
+            or GraphQL query.
+        :param gql: Whether the endpoint is GraphQL endpoint.
+        :param trusted: Whether to skip the validation of the values.
+        :return: The call plan.
+        """
+        signature = inspect.signature(func)
+        parameters = []
+        for key, val in signature.parameters.items():
+            if key in ["self", "cls"]:
+                # We don't need the self or cls parameter.
+                continue
+            dependency = cls._resolve_dependency(
+                annotation=func.__annotations__.get(key, None),
+                is_template_variable=key in url_template_variables,
+                gql=gql,
+            )
+            dependency.is_available_for_method(method)
+            dependency.field_name = key
+            dependency.trusted = trusted
+            parameters.append(
+                ParameterPlan(
+                    name=key, default=val.default, dependency=dependency
+                )
+            )
+        return cls(
+            parameter_names=list(signature.parameters.keys()),
+            parameters=parameters,
+            return_type=signature.return_annotation,
+        )
+
+    @staticmethod
+    def warn_missing_type_hints(func: Callable) -> None:
+        """
+        Show a warning for every parameter without type hint, its value
+        can't be validated. The code object is used instead of the
+        signature, so it's cheap enough to be called at decoration time.
+        :param func: The declared function.
+        """
+        annotations = getattr(func, "__annotations__", {})
+        for name in get_parameter_names(func):
+            if name not in ("self", "cls") and name not in annotations:
+                warn_no_type_hint(name)
+
+    def bind_arguments(
+        self, args: Sequence[Any], kwargs: Dict[str, Any]
+    ) -> Tuple[Dict[str, Any], Any, Any]:
+        """
+        Merge args and kwargs into a single kwargs dictionary.
+        :return: The values and the self and cls objects, if present.
+        """
+        values = dict(kwargs)
+        values.update(zip(self.parameter_names, args))
+        # Remove self and cls from values, it will be used
+        # later to get and update the client configuration
+        return values, values.pop("self", None), values.pop("cls", None)
+
+    def modify_request(
+        self, request: "RawRequest", values: Dict[str, Any]
+    ) -> "RawRequest":
+        """
+        Validate the values and apply them to the request. The values are
+        passed to the dependencies, which are not copied per call.
+        :param request: The request to modify.
+        :param values: The values of the call.
+        :return: The modified request.
+        """
+        for parameter in self.parameters:
+            dependency = parameter.dependency
+            value = dependency.validate(
+                values.get(parameter.name, parameter.default)
+            )
+            request = dependency.apply(request, value)
         return request
 
 
@@ -278,7 +511,7 @@ class RequestModifier:
     """
 
     @staticmethod
-    def __extract_variables_from_url_template(url_template: str) -> List[str]:
+    def extract_variables_from_url_template(url_template: str) -> List[str]:
         """
         Extract variables from a URL template.
         :param url_template: The URL template.
@@ -297,79 +530,45 @@ class RequestModifier:
         **values,
     ) -> "RawRequest":
         """
-        Prepare a request for sending. This method is used internally by
-        declarativex. It is called before the request is sent. It modifies the
-        request according to the dependencies. It also validates the values
-        against the type hints.
+        Prepare a request for sending. It modifies the request according
+        to the dependencies. It also validates the values against the type
+        hints. The call plan of the function is compiled once and cached.
         :param request: The request to prepare.
         :param func: The function that is called.
         :param gql: The GraphQL configuration.
         :param values: The values to set the dependencies to.
         :return: The prepared request.
         """
-        signature = inspect.signature(func)
         if gql:
-            from .graphql import extract_variables_from_gql_query
-
-            url_template_variables = extract_variables_from_gql_query(
-                gql.query
-            )
+            url_template_variables = gql.variables
         else:
-            url_template_variables = cls.__extract_variables_from_url_template(
+            url_template_variables = cls.extract_variables_from_url_template(
                 request.url_template
             )
-        dependencies = []
-        for key, val in signature.parameters.items():
-            if key in ["self", "cls"]:
-                # We don't need the self or cls parameter.
-                continue
-
-            # We check if the parameter is annotated.
-            annotation = func.__annotations__.get(key, None)
-            if hasattr(annotation, "__metadata__"):
-                # Extracting the type hint and the dependency from the
-                # Annotated type.
-                type_hint, dependency = get_args(annotation)
-                if not isinstance(dependency, Dependency):
-                    if inspect.isclass(dependency) and issubclass(
-                        dependency, Dependency
-                    ):
-                        # If the dependency is a class, we instantiate it.
-                        dependency = dependency()
-                        dependency.type_hint = type_hint
-                    else:
-                        # If the dependency is not an instance of Dependency,
-                        # we raise an AnnotationException.
-                        raise AnnotationException(annotation)
-                else:
-                    # If the dependency is already an instance of Dependency,
-                    # we are setting only the type hint.
-                    dependency.type_hint = type_hint
-            elif key in url_template_variables:
-                # If the parameter is in the URL template and not annotated,
-                # we assume it is a Path dependency.
-                if gql:
-                    dependency = JsonField()
-                else:
-                    dependency = Path()
-                dependency.type_hint = annotation
-            else:
-                # If the parameter is not annotated and not in the URL
-                # template, we assume it is a Query dependency.
-                dependency = Query()
-                dependency.type_hint = annotation
-
-            dependency.is_available_for_method(request.method)
-
-            # We set the field name and the value of the dependency.
-            dependency.field_name = key
-            dependency.value = values.get(key, val.default)
-            dependencies.append(dependency)
-
-        # Modifying the request according to the dependencies in loop.
-        for dependency in dependencies:
-            request = dependency.modify_request(request)
-        return request
+        plan = _cached_call_plan(
+            func, request.method, tuple(url_template_variables), bool(gql)
+        )
+        return plan.modify_request(request, values)
+
+
+@functools.lru_cache(maxsize=1024)
+def _cached_call_plan(
+    func: Callable,
+    method: str,
+    url_template_variables: Tuple[str, ...],
+    gql: bool,
+) -> CallPlan:
+    """
+    The call plan of the function prepared by RequestModifier. The missing
+    type hints are reported once, when the plan is compiled.
+    """
+    CallPlan.warn_missing_type_hints(func)
+    return CallPlan.compile(
+        func,
+        method=method,
+        url_template_variables=url_template_variables,
+        gql=gql,
+    )
 
 
 __all__ = [
@@ -384,6 +583,9 @@ __all__ = [
     "FormData",
     "Files",
     "Timeout",
+    "Deadline",
     "RequestModifier",
+    "CallPlan",
+    "ParameterPlan",
     "Location",
 ]
@@ -3,9 +3,8 @@ from typing import Type, Sequence, Union, Mapping, Optional, TYPE_CHECKING, Any
 
 import httpx
 
-from .compatibility import parse_obj_as
-
 if TYPE_CHECKING:  # pragma: no cover
+    from .codecs import BinaryCodec, JSONCodec
     from .models import RawRequest
 
 
@@ -81,13 +80,64 @@ class TimeoutException(DeclarativeException):
         request(`httpx.Request`): The request that timed out.
     """
 
+    timeout: Optional[float]
+    request: Optional[httpx.Request]
+
     def __init__(self, timeout: Union[float, None], request: httpx.Request):
+        self.timeout = timeout
+        self.request = request
         super().__init__(
             f"Request timed out after {timeout} seconds: "
             f"{request.method} {request.url}"
         )
 
 
+class DeadlineExceeded(TimeoutException):
+    """
+    Raised when the deadline of the call is exceeded.
+
+    Parameters:
+        request(`Optional[httpx.Request]`):
+            The request that was in flight, if any.
+    """
+
+    # pylint: disable-next=super-init-not-called
+    def __init__(self, request: Optional[httpx.Request] = None):
+        # TimeoutException message requires the timeout, so it is skipped
+        self.timeout = None
+        self.request = request
+        message = "Deadline exceeded"
+        if request is not None:
+            message += f": {request.method} {request.url}"
+        # pylint: disable-next=non-parent-init-called
+        DeclarativeException.__init__(self, message)
+
+
+class ResponseTooLarge(DeclarativeException):
+    """
+    Raised when the body of the response is larger than the limit.
+    The body is not read further, so the response has no content.
+
+    Parameters:
+        limit(`int`): The limit of the body size in bytes.
+        response(`httpx.Response`): The response that was received.
+        size(`Optional[int]`): The size declared by Content-Length,
+            if the body wasn't read, otherwise the bytes read so far.
+    """
+
+    def __init__(
+        self, limit: int, response: httpx.Response, size: Optional[int]
+    ):
+        self.limit = limit
+        self.response = response
+        self.size = size
+        request = response.request
+        super().__init__(
+            f"Response body exceeds the limit of {limit} bytes: "
+            f"{request.method} {request.url}"
+        )
+
+
 class HTTPException(DeclarativeException):
     """
     Raised when a request fails with HTTP status code.
@@ -98,6 +148,10 @@ class HTTPException(DeclarativeException):
         raw_request(`RawRequest`): The raw request that was sent.
         error_mappings(`Mapping[int, Type]`):
             A mapping of status codes to error models.
+        json_codec(`Optional[JSONCodec]`):
+            The codec of the JSON error responses.
+        binary_codec(`Optional[BinaryCodec]`):
+            The binary codec negotiated for the responses.
     """
 
     raw_request: "RawRequest"
@@ -111,9 +165,14 @@ class HTTPException(DeclarativeException):
         response: httpx.Response,
         raw_request: "RawRequest",
         error_mappings: Optional[Mapping[int, Type]] = None,
+        *,
+        json_codec: Optional["JSONCodec"] = None,
+        binary_codec: Optional["BinaryCodec"] = None,
     ):
         self.raw_request = raw_request
         self._response = response
+        self._json_codec = json_codec
+        self._binary_codec = binary_codec
         self.status_code = response.status_code
         if error_mappings and response.status_code in error_mappings:
             self._model = error_mappings[response.status_code]
@@ -126,14 +185,30 @@ class HTTPException(DeclarativeException):
     def response(self):
         """
         The response that was received. If a model is specified, the response
-        will be parsed and returned as an instance of that model.
+        will be parsed and returned as an instance of that model. The body
+        is decoded by its Content-Type, like the successful responses.
         :return: httpx.Response or Instance of self._model
         """
         response = self._response
         if self._model:
-            return parse_obj_as(self._model, response.json())
+            # pylint: disable-next=import-outside-toplevel
+            from .responses import Response
+
+            return Response(
+                response=response,
+                json_codec=self._json_codec,
+                binary_codec=self._binary_codec,
+            ).convert(self._model)
         return response
 
+    @property
+    def raw_response(self) -> httpx.Response:
+        """
+        The response that was received, regardless of the error mappings.
+        :return: httpx.Response
+        """
+        return self._response
+
 
 class UnprocessableEntityException(DeclarativeException):
     """
@@ -141,12 +216,18 @@ class UnprocessableEntityException(DeclarativeException):
 
     Parameters:
         response(`httpx.Response`): The response that was received.
+        reason(`str`): Why the response can't be parsed, if known.
     """
 
-    def __init__(self, response: httpx.Response):
+    def __init__(
+        self, response: httpx.Response, reason: Optional[str] = None
+    ):
         self.response = response
+        self.reason = reason
+        details = f"{reason}. " if reason else ""
         super().__init__(
             f"Failed to parse response. Status code: {response.status_code}. "
+            f"{details}"
             "You can access the raw response using the `response` attribute."
         )
 
@@ -157,13 +238,33 @@ class RateLimitExceeded(DeclarativeException):
     """
 
 
+class CircuitOpenException(DeclarativeException):
+    """
+    Raised when a request is rejected because the circuit breaker is open.
+
+    Parameters:
+        retry_after(`Optional[float]`):
+            Seconds left until the circuit becomes half-open.
+    """
+
+    def __init__(self, retry_after: Optional[float]):
+        self.retry_after = retry_after
+        message = "Circuit breaker is open"
+        if retry_after is not None:
+            message += f", retry after {retry_after:.2f} seconds"
+        super().__init__(message)
+
+
 __all__ = [
     "DeclarativeException",
     "MisconfiguredException",
     "AnnotationException",
     "DependencyValidationError",
     "TimeoutException",
+    "DeadlineExceeded",
+    "ResponseTooLarge",
     "HTTPException",
     "UnprocessableEntityException",
     "RateLimitExceeded",
+    "CircuitOpenException",
 ]
@@ -1,41 +1,119 @@
 # pylint: disable=invalid-overridden-method
 import abc
 import asyncio
-import inspect
+import copy
+import functools
+import importlib.util
 import threading
+import weakref
 from asyncio import (
     wait_for,
     CancelledError,
     TimeoutError as AsyncioTimeoutError,
 )
 from queue import Empty, Queue
-from typing import Any, Callable, Dict, Optional, Tuple
+from contextlib import nullcontext
+from typing import (
+    Any,
+    Callable,
+    ContextManager,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
 
 import httpx
 
 from . import BaseClient
-from .exceptions import HTTPException, TimeoutException, MisconfiguredException
-from .models import (
-    EndpointConfiguration,
-    ClientConfiguration,
-    RawRequest,
-    Response,
+from . import context
+from .codecs import BinaryCodec, JSONCodec
+from .context import DeadlineParameter, notify_response, remaining_time
+from .dependencies import CallPlan
+from .exceptions import (
+    DeadlineExceeded,
+    HTTPException,
+    TimeoutException,
+    MisconfiguredException,
+    ResponseTooLarge,
 )
-from .utils import ReturnType
+from .models import EndpointConfiguration, RawRequest
+from .responses import Response
+
+# Items of a list validated at once, when the response is decoded
+# in a thread: the event loop runs between the chunks
+OFFLOAD_CHUNK_SIZE = 1000
+
+
+@functools.lru_cache(maxsize=None)
+def http2_available() -> bool:
+    """
+    Check if h2 is installed to enable http2 support. The module is only
+    looked up, httpx imports it when the first client is created.
+    """
+    return importlib.util.find_spec("h2") is not None
+
+
+def check_content_length(response: httpx.Response, limit: int) -> None:
+    """
+    Check the size of the body declared by Content-Length before reading
+    it. Raises ResponseTooLarge if it exceeds the limit.
+    """
+    length = response.headers.get("Content-Length")
+    if length is not None and length.isdigit() and int(length) > limit:
+        raise ResponseTooLarge(
+            limit=limit, response=response, size=int(length)
+        )
+
 
-# Check if h2 is installed to enable http2 support
-try:  # pragma: no cover
-    import h2  # type: ignore[import]
-except ImportError:  # pragma: no cover
-    h2 = None
+def with_timeout(request: httpx.Request, timeout: float) -> httpx.Request:
+    """
+    Get the copy of the request with the timeout of httpx. The request
+    itself is not changed, as prepared requests are sent concurrently.
+    """
+    request = copy.copy(request)
+    request.extensions = {
+        **request.extensions,
+        "timeout": httpx.Timeout(timeout).as_dict(),
+    }
+    return request
+
+
+def _set_content(response: httpx.Response, chunks: List[bytes]) -> None:
+    # The same as httpx.Response.read() does, that has no limit
+    response._content = b"".join(chunks)  # pylint: disable=protected-access
 
 
 class Executor(abc.ABC):
-    raw_request: RawRequest
+    """
+    Executor of the declared function. Executors are long-lived: the
+    declaration keeps one executor per function, and the executor keeps
+    one executor per client instance with the configuration of the client.
+    The per-call state is passed through the arguments, so an executor
+    can run concurrent calls.
+    """
+
     _func: Callable
 
-    def __init__(self, endpoint_configuration: EndpointConfiguration):
+    def __init__(
+        self,
+        endpoint_configuration: EndpointConfiguration,
+        plan: Optional[CallPlan] = None,
+    ):
         self.endpoint_configuration = endpoint_configuration
+        self._plan = plan
+        self._chain: Optional[Callable[[RawRequest], Any]] = None
+        self._clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+
+    @property
+    def plan(self) -> CallPlan:
+        """
+        The call plan of the function. Declarations pass the plan compiled
+        at decoration time, otherwise it is compiled on the first access.
+        """
+        if self._plan is None:
+            self._plan = self.endpoint_configuration.compile_plan(self.func)
+        return self._plan
 
     @property
     def func(self) -> Callable:
@@ -43,8 +121,15 @@ class Executor(abc.ABC):
 
     @func.setter
     def func(self, func: Callable) -> None:
+        self._func = func
+
+    def check_middlewares(self) -> None:
+        """
+        Check that the middlewares can be used with the function:
+        sync middlewares with sync functions and async with async ones.
+        """
+        is_async = asyncio.iscoroutinefunction(self.func)
         for middleware in self._middlewares:
-            is_async = asyncio.iscoroutinefunction(func)
             if getattr(middleware, "_async") is not is_async:
                 mw_type = ["sync", "async"]
                 raise MisconfiguredException(
@@ -53,8 +138,6 @@ class Executor(abc.ABC):
                     f"{mw_type[is_async]} function"
                 )
 
-        self._func = func
-
     def merge_args_and_kwargs(
         self, *args, **kwargs
     ) -> Tuple[Dict[str, Any], Optional[BaseClient], Optional[BaseClient]]:
@@ -63,105 +146,187 @@ class Executor(abc.ABC):
         dictionary. It also returns the self and cls objects if they are
         present in the kwargs.
         """
-        signature = inspect.signature(self.func)
-        param_names = list(signature.parameters.keys())
-        kwargs.update(dict(zip(param_names, args)))
-        # Remove self and cls from kwargs, it will be used
-        # later to get and update the client configuration
-        self_, cls_ = kwargs.pop("self", None), kwargs.pop("cls", None)
-        return kwargs, self_, cls_
+        return self.plan.bind_arguments(args, kwargs)
+
+    def get_timeout(
+        self, request: httpx.Request, timeout: Optional[float]
+    ) -> Tuple[Optional[float], bool]:
+        """
+        This method is used to get the timeout of the attempt. The timeout
+        of the request is shrunk to the time left until the deadline of the
+        call, if any. Returns the timeout and whether it is bounded
+        by the deadline.
+        """
+        remaining = remaining_time()
+        if remaining is None:
+            return timeout, False
+        if remaining <= 0:
+            raise DeadlineExceeded(request=request)
+        if not timeout or remaining < timeout:
+            return remaining, True
+        return timeout, False
+
+    def timeout_exception(
+        self, timeout: Optional[float], request: httpx.Request, deadline: bool
+    ) -> TimeoutException:
+        """
+        This method is used to get the exception for the timed out request.
+        """
+        if deadline:
+            return DeadlineExceeded(request=request)
+        return TimeoutException(timeout=timeout, request=request)
 
     @abc.abstractmethod
-    def wait_for(self, client, request: httpx.Request):
+    def wait_for(
+        self, client, request: httpx.Request, timeout: Optional[float]
+    ):
         """
         This method is used to wait for a function to finish, especially
         for timeout handling.
         """
         raise NotImplementedError
 
-    def update_configuration(
-        self, self_: Optional[BaseClient], cls_: Optional[BaseClient]
-    ) -> None:
+    def for_client(self, client: Optional[BaseClient]) -> "Executor":
         """
-        This method is used to update the client configuration with the
-        configuration from the self and cls objects.
-        If the self or cls objects are not present, this method does nothing.
+        Get the executor with the endpoint configuration merged with the
+        configuration of the client instance (or class). The executor is
+        created again only when the client configuration changes.
+        If there is no client, this executor is returned.
         """
-        class_config = ClientConfiguration.extract_from_func_kwargs(
-            self_=self_, cls_=cls_
+        if client is None:
+            return self
+        endpoint_configuration = self.endpoint_configuration.for_client(
+            client
         )
-        if class_config:
-            client_configuration = (
-                self.endpoint_configuration.client_configuration.merge(
-                    class_config
-                )
-            )
-            self.endpoint_configuration.client_configuration = (
-                client_configuration
+        try:
+            executor = self._clients.get(client)
+        except TypeError:  # pragma: no cover
+            # Unhashable clients are not cached
+            executor = None
+        if (
+            executor is None
+            or executor.endpoint_configuration is not endpoint_configuration
+        ):
+            executor = self.__class__(
+                endpoint_configuration=endpoint_configuration,
+                plan=self.plan,
             )
+            executor.func = self.func
+            try:
+                self._clients[client] = executor
+            except TypeError:  # pragma: no cover
+                pass
+        return executor
 
-    def prepare_request(self, **kwargs) -> None:
+    def prepare_request(self, **kwargs) -> RawRequest:
         """
-        This method is used to prepare the raw request.
-        It also applies the middlewares to the raw request.
+        This method is used to prepare the raw request
+        from the values of the call.
         """
-        self.raw_request = RawRequest.initialize(
-            self.endpoint_configuration
-        ).prepare(self.func, gql=self.endpoint_configuration.gql, **kwargs)
+        return self.plan.modify_request(
+            RawRequest.initialize(self.endpoint_configuration), kwargs
+        )
+
+    def wrap_response(
+        self, httpx_response: httpx.Response, chunk_size: Optional[int] = None
+    ) -> Response:
+        """Wrap the httpx response to convert it to the return type."""
+        return Response(
+            response=httpx_response,
+            json_codec=self._json_codec,
+            binary_codec=self._binary_codec,
+            lazy=self.endpoint_configuration.lazy,
+            response_path=self.endpoint_configuration.parsed_response_path,
+            chunk_size=chunk_size,
+        )
 
     def parse_response(
         self,
+        raw_request: RawRequest,
         httpx_request: httpx.Request,
         httpx_response: httpx.Response,
+        chunk_size: Optional[int] = None,
     ):
         """
         This method is used to parse the httpx response into the
         return type of the function.
-        It also applies the middlewares to the response.
         """
         try:
-            return Response(response=httpx_response).as_type_for_func(
-                self.func
+            return self.wrap_response(httpx_response, chunk_size).as_type(
+                self.plan.return_type
             )
         except httpx.HTTPStatusError as e:
             raise HTTPException(
                 request=httpx_request,
                 response=httpx_response,
-                raw_request=self.raw_request,
+                raw_request=raw_request,
                 error_mappings=self._error_mappings,
+                json_codec=self._json_codec,
+                binary_codec=self._binary_codec,
             ) from e
 
-    def _chain_middlewares(
-        self, execute: Callable[[RawRequest], ReturnType]
-    ) -> ReturnType:
+    @property
+    def chain(self) -> Callable[[RawRequest], Any]:
         """
-        This method is used to chain the middlewares together. It uses
-        recursion to chain them together. The last middleware will call
-        the execute function.
+        The middlewares chained together. The last middleware calls
+        the _execute method. The chain is checked and built on the first
+        call and reused, without middlewares it is the _execute method.
         """
-        execute_func = execute
-        for mw in reversed(self._middlewares):
+        if self._chain is None:
+            self.check_middlewares()
+            execute_func: Callable[[RawRequest], Any] = self._execute
+            for mw in reversed(self._middlewares):
 
-            def wrap(middleware, prev_func):
-                def _wrapped(request: RawRequest):
-                    return middleware(request=request, call_next=prev_func)
+                def wrap(middleware, prev_func):
+                    def _wrapped(request: RawRequest):
+                        return middleware(request=request, call_next=prev_func)
 
-                return _wrapped
+                    return _wrapped
 
-            execute_func = wrap(mw, execute_func)
-        return execute_func(self.raw_request)
+                execute_func = wrap(mw, execute_func)
+            self._chain = execute_func
+        return self._chain
 
     def execute(self, func, *args, **kwargs):
         self.func = func
         kwargs, self_, cls_ = self.merge_args_and_kwargs(*args, **kwargs)
-        self.update_configuration(self_, cls_)
-        self.prepare_request(**kwargs)
-        if self._middlewares:
-            return self._chain_middlewares(self._execute)
-        return self._execute(self.raw_request)
+        executor = self.for_client(self_ or cls_)
+        return executor.chain(executor.prepare_request(**kwargs))
+
+    def prepare(self, func, send, *args, **kwargs) -> "PreparedRequest":
+        """
+        Bind the arguments and build the request once, so it can be sent
+        many times with the PreparedRequest through the `send` chain
+        of the support decorators.
+        """
+        self.func = func
+        kwargs, self_, cls_ = self.merge_args_and_kwargs(*args, **kwargs)
+        executor = self.for_client(self_ or cls_)
+        deadline_parameter = DeadlineParameter.find(func)
+        return PreparedRequest(
+            executor=executor,
+            request=executor.prepare_request(**kwargs),
+            send=send,
+            deadline=(
+                kwargs.get(
+                    deadline_parameter.name, deadline_parameter.default
+                )
+                if deadline_parameter
+                else None
+            ),
+        )
 
-    @abc.abstractmethod
     def _execute(self, request: RawRequest):
+        return self.send(request, request.to_httpx_request())
+
+    @abc.abstractmethod
+    def send(
+        self, request: RawRequest, httpx_request: httpx.Request
+    ):
+        """
+        Send the httpx request built from the raw request
+        and parse the response.
+        """
         raise NotImplementedError
 
     @property
@@ -172,6 +337,31 @@ class Executor(abc.ABC):
         """
         return self.endpoint_configuration.client_configuration.error_mappings
 
+    @property
+    def _binary_codec(self) -> Optional[BinaryCodec]:
+        """
+        This property is used to get the binary codec resolved once
+        per client configuration.
+        """
+        return self.endpoint_configuration.request_defaults.binary_codec
+
+    @property
+    def _max_response_bytes(self) -> Optional[int]:
+        """
+        This property is used to get the limit of the response body size
+        from the client configuration.
+        """
+        configuration = self.endpoint_configuration.client_configuration
+        return configuration.max_response_bytes
+
+    @property
+    def _json_codec(self) -> JSONCodec:
+        """
+        This property is used to get the JSON codec resolved once
+        per client configuration.
+        """
+        return self.endpoint_configuration.request_defaults.json_codec
+
     @property
     def _middlewares(self):
         """
@@ -183,7 +373,10 @@ class Executor(abc.ABC):
 
 class AsyncExecutor(Executor):
     async def wait_for(
-        self, client: httpx.AsyncClient, request: httpx.Request
+        self,
+        client: httpx.AsyncClient,
+        request: httpx.Request,
+        timeout: Optional[float],
     ):
         """
         This method is used to wait for a function to finish, especially
@@ -191,82 +384,281 @@ class AsyncExecutor(Executor):
         function to finish. Due to httpx timeouts not working properly,
         this method is used to handle it.
         """
-        timeout = (
-            self.raw_request.timeout or self.endpoint_configuration.timeout
-        )
+        timeout, deadline = self.get_timeout(request, timeout)
 
         if timeout:
             try:
                 return await wait_for(
-                    client.send(request),
+                    self.receive(client, request),
                     timeout=timeout,
                 )
             except (TimeoutError, CancelledError, AsyncioTimeoutError) as e:
-                raise TimeoutException(
+                raise self.timeout_exception(
                     timeout=timeout,
                     request=request,
+                    deadline=deadline,
                 ) from e
-        return await client.send(request)
+        return await self.receive(client, request)
 
-    async def _execute(self, request: RawRequest):
+    async def receive(
+        self, client: httpx.AsyncClient, request: httpx.Request
+    ) -> httpx.Response:
+        """
+        Send the request and read the response. If the size of the body
+        is limited, the body is streamed and the reading is aborted as
+        soon as the limit is exceeded, so it is never buffered whole.
+        """
+        limit = self._max_response_bytes
+        if limit is None:
+            return await client.send(request)
+        response = await client.send(request, stream=True)
+        try:
+            check_content_length(response, limit)
+            chunks: List[bytes] = []
+            size = 0
+            async for chunk in response.aiter_bytes():
+                size += len(chunk)
+                if size > limit:
+                    raise ResponseTooLarge(
+                        limit=limit, response=response, size=size
+                    )
+                chunks.append(chunk)
+        finally:
+            await response.aclose()
+        _set_content(response, chunks)
+        return response
+
+    async def send(
+        self, request: RawRequest, httpx_request: httpx.Request
+    ):
         async with httpx.AsyncClient(
             follow_redirects=True,
-            http2=bool(h2),
+            http2=http2_available(),
             proxies=self.endpoint_configuration.client_configuration.proxies,
         ) as client:
-            httpx_request = request.to_httpx_request()
             httpx_response = await self.wait_for(
-                client=client, request=httpx_request
+                client=client,
+                request=httpx_request,
+                timeout=request.timeout or self.endpoint_configuration.timeout,
             )
+            notify_response(httpx_response)
+            if self.should_offload(httpx_response):
+                # Decoding and validation of large responses would block
+                # the event loop, so they run in the default thread pool.
+                # A single call holds the GIL, so only the lists that are
+                # decoded and validated in chunks are offloaded. The
+                # context (e.g. the deadline) is copied to the thread.
+                return await asyncio.to_thread(
+                    self.parse_response,
+                    raw_request=request,
+                    httpx_request=httpx_request,
+                    httpx_response=httpx_response,
+                    chunk_size=OFFLOAD_CHUNK_SIZE,
+                )
             return self.parse_response(
+                raw_request=request,
                 httpx_request=httpx_request,
                 httpx_response=httpx_response,
             )
 
+    def should_offload(self, httpx_response: httpx.Response) -> bool:
+        """
+        Check if the response should be decoded off the event loop:
+        the offload threshold of the endpoint is set, the response is
+        larger than it, and it is converted to the return type in chunks,
+        so the event loop runs between them.
+        """
+        threshold = self.endpoint_configuration.offload_threshold
+        return (
+            threshold is not None
+            and len(httpx_response.content) > threshold
+            and self.wrap_response(
+                httpx_response, OFFLOAD_CHUNK_SIZE
+            ).converts_in_chunks(self.plan.return_type)
+        )
+
 
 class SyncExecutor(Executor):
-    def wait_for(self, client: httpx.Client, request: httpx.Request):
+    def wait_for(
+        self,
+        client: httpx.Client,
+        request: httpx.Request,
+        timeout: Optional[float],
+    ):
         """
         This method is used to wait for a function to finish, especially
         for timeout handling. It uses threading to wait for the function
         to finish. Due to httpx timeouts not working properly, this
         method is used to handle it.
         """
-        timeout = (
-            self.raw_request.timeout or self.endpoint_configuration.timeout
-        )
+        timeout, deadline = self.get_timeout(request, timeout)
 
         if timeout:
+            # httpx cuts off the send itself, so the thread is not left
+            # running long after the caller gave up on it
+            request = with_timeout(request, timeout)
             queue: Queue = Queue()
 
             def wrapper():
-                result = client.send(request)
-                queue.put(result)
-
-            thread = threading.Thread(target=wrapper)
+                # Pass the exception to the caller instead of losing it
+                # in the thread, otherwise the caller waits for the timeout
+                try:
+                    queue.put((self.receive(client, request), None))
+                # pylint: disable-next=broad-exception-caught
+                except Exception as exc:
+                    queue.put((None, exc))
+
+            thread = threading.Thread(target=wrapper, daemon=True)
             thread.start()
 
             try:
-                return queue.get(timeout=timeout)
+                result, error = queue.get(timeout=timeout)
             except Empty:
-                thread.join()
-                raise TimeoutException(
+                # The thread is not joined, the caller must not wait
+                # for the send longer than the timeout
+                raise self.timeout_exception(
                     timeout=timeout,
                     request=request,
+                    deadline=deadline,
                 )
-        return client.send(request)
-
-    def _execute(self, request: RawRequest):
+            if error is not None:
+                raise error
+            return result
+        return self.receive(client, request)
+
+    def receive(
+        self, client: httpx.Client, request: httpx.Request
+    ) -> httpx.Response:
+        """
+        Send the request and read the response. If the size of the body
+        is limited, the body is streamed and the reading is aborted as
+        soon as the limit is exceeded, so it is never buffered whole.
+        """
+        limit = self._max_response_bytes
+        if limit is None:
+            return client.send(request)
+        response = client.send(request, stream=True)
+        try:
+            check_content_length(response, limit)
+            chunks: List[bytes] = []
+            size = 0
+            for chunk in response.iter_bytes():
+                size += len(chunk)
+                if size > limit:
+                    raise ResponseTooLarge(
+                        limit=limit, response=response, size=size
+                    )
+                chunks.append(chunk)
+        finally:
+            response.close()
+        _set_content(response, chunks)
+        return response
+
+    def send(
+        self, request: RawRequest, httpx_request: httpx.Request
+    ):
         with httpx.Client(
             follow_redirects=True,
-            http2=bool(h2),
+            http2=http2_available(),
             proxies=self.endpoint_configuration.client_configuration.proxies,
         ) as client:
-            httpx_request = request.to_httpx_request()
             httpx_response = self.wait_for(
-                client=client, request=httpx_request
+                client=client,
+                request=httpx_request,
+                timeout=request.timeout or self.endpoint_configuration.timeout,
             )
+            notify_response(httpx_response)
             return self.parse_response(
+                raw_request=request,
                 httpx_request=httpx_request,
                 httpx_response=httpx_response,
             )
+
+
+class PreparedRequest:
+    """
+    Request of the declared function with the arguments bound once.
+    The httpx request is built once too, so sending it again skips
+    binding, validation and encoding. Middlewares of the endpoint get
+    a copy of the request on every send, so the prepared request is
+    never changed and can be sent concurrently.
+
+    Parameters:
+        executor: The executor of the function for the client.
+        request: The raw request with the bound arguments.
+        deadline: The value of the Deadline argument, if any.
+        send: The chain of the support decorators of the function
+            that sends the request, the request is sent directly
+            by default.
+    """
+
+    __slots__ = (
+        "executor",
+        "request",
+        "_deadline",
+        "_httpx_request",
+        "_send",
+    )
+
+    def __init__(
+        self,
+        executor: Executor,
+        request: RawRequest,
+        deadline: Optional[float] = None,
+        send: Optional[Callable[["PreparedRequest"], Any]] = None,
+    ):
+        self.executor = executor
+        self.request = request
+        self._deadline = deadline
+        # Streams of the files can't be read twice, so such
+        # requests are built on every send
+        self._httpx_request = (
+            None if request._files else request.to_httpx_request()
+        )
+        self._send = send or (
+            PreparedRequest.asend_once
+            if isinstance(executor, AsyncExecutor)
+            else PreparedRequest.send_once
+        )
+
+    def _deadline_scope(self) -> ContextManager[None]:
+        if self._deadline is None:
+            return nullcontext()
+        return context.deadline(self._deadline)
+
+    def send_once(self):
+        """Send the request, bypassing the support decorators."""
+        return self._run()
+
+    async def asend_once(self):
+        """Send the request, bypassing the support decorators."""
+        return await self._run()
+
+    def _run(self):
+        executor = self.executor
+        configuration = executor.endpoint_configuration.client_configuration
+        if configuration.middlewares:
+            return executor.chain(self.request.copy())
+        httpx_request = self._httpx_request or self.request.to_httpx_request()
+        return executor.send(self.request, httpx_request)
+
+    def send(self):
+        """Send the request of a sync function and parse the response."""
+        if not isinstance(self.executor, SyncExecutor):
+            raise MisconfiguredException(
+                "Use asend() to send the request of async function"
+            )
+        with self._deadline_scope():
+            return self._send(self)
+
+    async def asend(self):
+        """Send the request of an async function and parse the response."""
+        if not isinstance(self.executor, AsyncExecutor):
+            raise MisconfiguredException(
+                "Use send() to send the request of sync function"
+            )
+        with self._deadline_scope():
+            return await self._send(self)
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.request!r})"
@@ -1,11 +1,42 @@
+import functools
+from typing import List, Optional, Tuple
+
+from graphql.ast import OperationDefinition  # type: ignore[import]
+from graphql.exceptions import ParseError  # type: ignore[import]
 from graphql.parser import GraphQLParser  # type: ignore[import]
 
+from .exceptions import MisconfiguredException
 
-def extract_variables_from_gql_query(gql_query: str):
-    ast = GraphQLParser().parse(gql_query)
+
+@functools.lru_cache(maxsize=None)
+def _get_parser() -> GraphQLParser:
+    # Building the parser tables is much slower than parsing a query
+    return GraphQLParser()
+
+
+def parse_gql_query(gql_query: str) -> Tuple[List[str], Optional[str]]:
+    """
+    Parse the GraphQL query and return its variables and the name of the
+    operation. Raises MisconfiguredException if the query is invalid.
+    """
+    try:
+        ast = _get_parser().parse(gql_query)
+    except ParseError as e:
+        raise MisconfiguredException(f"Invalid GraphQL query: {e}") from e
     variables = []
+    operation_name = None
     for definition in ast.definitions:
+        if not isinstance(definition, OperationDefinition):
+            # Fragments don't declare variables
+            continue
+        if operation_name is None:
+            operation_name = definition.name
         if definition.variable_definitions:
             for variable_definition in definition.variable_definitions:
                 variables.append(variable_definition.name)
+    return variables, operation_name
+
+
+def extract_variables_from_gql_query(gql_query: str):
+    variables, _ = parse_gql_query(gql_query)
     return variables
@@ -0,0 +1,216 @@
+import dataclasses
+import functools
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterator,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+
+from .compatibility import (
+    is_pydantic_model_type,
+    model_fields,
+    parse_obj_as,
+)
+
+T = TypeVar("T")
+_MISSING = object()
+_NONE_TYPE = type(None)
+
+
+def is_lazy_type(type_hint: Any) -> bool:
+    """
+    Check if the response can be decoded lazily as the type: a pydantic
+    model or a dataclass (not parametrized).
+    """
+    return is_pydantic_model_type(type_hint) or (
+        isinstance(type_hint, type) and dataclasses.is_dataclass(type_hint)
+    )
+
+
+def supports_lazy(type_hint: Any) -> bool:
+    """Check if the type hint is a lazy type or a list of them."""
+    if get_origin(type_hint) is list:
+        args = get_args(type_hint)
+        return bool(args) and is_lazy_type(args[0])
+    return is_lazy_type(type_hint)
+
+
+def _nested_lazy_type(annotation: Any) -> Optional[type]:
+    """The model of the field, if it is a model or Optional model."""
+    if get_origin(annotation) is Union:
+        members = [
+            arg for arg in get_args(annotation) if arg is not _NONE_TYPE
+        ]
+        annotation = members[0] if len(members) == 1 else None
+    return annotation if is_lazy_type(annotation) else None
+
+
+class _LazyField:
+    __slots__ = ("key", "annotation", "required", "default", "nested")
+
+    def __init__(
+        self,
+        key: str,
+        annotation: Any,
+        required: bool,
+        default: Callable[[], Any],
+    ):
+        self.key = key
+        self.annotation = annotation
+        self.required = required
+        self.default = default
+        self.nested = _nested_lazy_type(annotation)
+
+    def convert(self, value: Any) -> Any:
+        """
+        Convert the value of the field: models are wrapped lazily again,
+        other values are validated as the type of the field.
+        """
+        if self.nested is not None and isinstance(value, dict):
+            return LazyModel(self.nested, value)
+        return parse_obj_as(self.annotation, value)
+
+
+def record_fields(
+    model: type,
+) -> Iterator[Tuple[str, str, Any, bool, Callable[[], Any]]]:
+    """
+    Get the fields of the model (pydantic model or dataclass): the name,
+    the key in the input data, the type, whether the field is required
+    and the function that returns the default value.
+    """
+    if is_pydantic_model_type(model):
+        yield from model_fields(model)
+        return
+    hints = get_type_hints(model, include_extras=True)
+    for field in dataclasses.fields(model):
+        if not field.init:
+            continue
+        required = (
+            field.default is dataclasses.MISSING
+            and field.default_factory is dataclasses.MISSING
+        )
+        default: Callable[[], Any] = (
+            field.default_factory  # type: ignore[assignment]
+            if field.default_factory is not dataclasses.MISSING
+            else functools.partial(lambda value: value, field.default)
+        )
+        annotation = hints.get(field.name, Any)
+        yield field.name, field.name, annotation, required, default
+
+
+@functools.lru_cache(maxsize=None)
+def _lazy_fields(model: type) -> Dict[str, _LazyField]:
+    """The fields of the model, resolved once per model."""
+    return {
+        name: _LazyField(key, annotation, required, default)
+        for name, key, annotation, required, default in record_fields(model)
+    }
+
+
+class LazyModel(Generic[T]):
+    """
+    Response model that is decoded on attribute access. The decoded JSON
+    object is kept, and a field is validated the first time it is read.
+    Fields that are models are wrapped in LazyModel again, so only the
+    sub-models that are read are built.
+
+    Only the fields are available as attributes, call `validate()` to get
+    the instance of the model with the full validation, including the
+    validators of the model.
+    """
+
+    __slots__ = ("_model", "_data", "_values", "_instance")
+
+    def __init__(self, model: type, data: Dict[str, Any]):
+        self._model = model
+        self._data = data
+        self._values: Dict[str, Any] = {}
+        self._instance: Any = None
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        values = self._values
+        value = values.get(name, _MISSING)
+        if value is not _MISSING:
+            return value
+        field = _lazy_fields(self._model).get(name)
+        if field is None:
+            raise AttributeError(
+                f"{self._model.__name__!r} has no field {name!r}"
+            )
+        raw_value = self._data.get(field.key, _MISSING)
+        if raw_value is _MISSING:
+            if field.required:
+                # The full validation reports the missing field
+                self.validate()
+            value = field.default()
+        else:
+            value = field.convert(raw_value)
+        values[name] = value
+        return value
+
+    def __dir__(self):
+        return [*_lazy_fields(self._model), "validate", "raw"]
+
+    @property
+    def raw(self) -> Dict[str, Any]:
+        """The decoded JSON object."""
+        return self._data
+
+    def validate(self) -> T:
+        """
+        Validate the whole object and return the instance of the model.
+        The instance is built once.
+        """
+        if self._instance is None:
+            self._instance = parse_obj_as(self._model, self._data)
+        return self._instance
+
+    def __eq__(self, other):
+        if isinstance(other, LazyModel):
+            return self._model is other._model and self._data == other._data
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        return f"LazyModel[{self._model.__name__}]({self._data!r})"
+
+
+def lazy_decode(type_hint: Any, data: Any) -> Tuple[bool, Any]:
+    """
+    Wrap the decoded JSON in LazyModel, if the type hint is a model or
+    a list of models. Returns whether the data was wrapped and the result.
+    """
+    if not supports_lazy(type_hint):
+        return False, None
+    if get_origin(type_hint) is list:
+        item_type = get_args(type_hint)[0]
+        if isinstance(data, list) and all(
+            isinstance(item, dict) for item in data
+        ):
+            return True, [LazyModel(item_type, item) for item in data]
+        return False, None
+    if isinstance(data, dict):
+        return True, LazyModel(type_hint, data)
+    return False, None
+
+
+__all__ = [
+    "LazyModel",
+    "is_lazy_type",
+    "supports_lazy",
+    "record_fields",
+    "lazy_decode",
+]
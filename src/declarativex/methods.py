@@ -1,3 +1,6 @@
+import asyncio
+import functools
+import inspect
 from typing import (
     Any,
     Callable,
@@ -8,29 +11,129 @@ from typing import (
 )
 
 from .auth import Auth
-from .executors import AsyncExecutor, SyncExecutor
+from .codecs import BinaryCodecType, JSONCodecType
+from .dependencies import CallPlan
+from .executors import (
+    AsyncExecutor,
+    Executor,
+    PreparedRequest,
+    SyncExecutor,
+)
 from .middlewares import Middleware
 from .models import (
     ClientConfiguration,
     EndpointConfiguration,
     GraphQLConfiguration,
 )
-from .utils import Decorator, ProxiesType
+from .utils import (
+    PREPARE_ATTRIBUTE,
+    SEND_PREPARED_ATTRIBUTE,
+    BoundEndpoint,
+    Decorator,
+    DecoratorArgs,
+    ProxiesType,
+    ReturnType,
+    prepare_endpoint,
+)
 
 
 class _Declaration(Decorator):
     client_configuration: ClientConfiguration
     endpoint_configuration: EndpointConfiguration
+    _executors: Dict[Callable, Executor]
+
+    def _get_executor(
+        self, func: Callable, executor_class: Type[Executor]
+    ) -> Executor:
+        """
+        Get the executor of the function, it is created with the compiled
+        call plan on the first call. If the declaration is misconfigured,
+        the executor is not stored, so the error is raised on every call.
+        """
+        executor = self._executors.get(func)
+        if executor is None:
+            executor = executor_class(
+                endpoint_configuration=self.endpoint_configuration,
+                plan=self.endpoint_configuration.compile_plan(func),
+            )
+            self._executors[func] = executor
+        return executor
 
     async def _decorate_async(self, func: Callable, *args, **kwargs):
-        return await AsyncExecutor(
-            endpoint_configuration=self.endpoint_configuration
-        ).execute(func, *args, **kwargs)
+        return await self._get_executor(func, AsyncExecutor).execute(
+            func, *args, **kwargs
+        )
 
     def _decorate_sync(self, func: Callable, *args, **kwargs):
-        return SyncExecutor(
-            endpoint_configuration=self.endpoint_configuration
-        ).execute(func, *args, **kwargs)
+        return self._get_executor(func, SyncExecutor).execute(
+            func, *args, **kwargs
+        )
+
+    def _prepare(
+        self,
+        func: Callable,
+        executor_class: Type[Executor],
+        send: Callable,
+        *args,
+        **kwargs,
+    ) -> PreparedRequest:
+        return self._get_executor(func, executor_class).prepare(
+            func, send, *args, **kwargs
+        )
+
+    def __call__(
+        self, func: Callable[DecoratorArgs, ReturnType]
+    ) -> Callable[DecoratorArgs, ReturnType]:
+        executor_class = (
+            AsyncExecutor
+            if asyncio.iscoroutinefunction(func)
+            else SyncExecutor
+        )
+        # The call plan is compiled on the first call, so declaring
+        # clients with many endpoints stays cheap. Missing type hints
+        # are reported right away.
+        if not self.endpoint_configuration.trusted:
+            CallPlan.warn_missing_type_hints(func)
+        inner = super().__call__(func)
+        # Support decorators copy the attributes to their wrappers
+        # and wrap the sending of the prepared requests
+        setattr(
+            inner,
+            PREPARE_ATTRIBUTE,
+            functools.partial(self._prepare, func, executor_class),
+        )
+        setattr(
+            inner,
+            SEND_PREPARED_ATTRIBUTE,
+            (
+                PreparedRequest.asend_once
+                if executor_class is AsyncExecutor
+                else PreparedRequest.send_once
+            ),
+        )
+        return inner
+
+
+def prepare(endpoint: Callable, *args, **kwargs) -> PreparedRequest:
+    """
+    Prepare the request of the declared endpoint with the given arguments.
+    The returned PreparedRequest can be sent many times with `send()`
+    or `await asend()` without binding the arguments and building
+    the request again, e.g. in polling loops. Every send goes through
+    the support decorators of the endpoint, like retry or rate_limiter.
+    The endpoints of the clients are prepared with
+    `client.endpoint.prepare(...)` too.
+
+    Parameters:
+        endpoint: The declared function or the method of a client.
+    """
+    if isinstance(endpoint, BoundEndpoint):
+        return endpoint.prepare(*args, **kwargs)
+    if inspect.ismethod(endpoint):
+        # Bound to the client instance or class
+        args = (endpoint.__self__, *args)
+        endpoint = endpoint.__func__
+    return prepare_endpoint(endpoint, *args, **kwargs)
 
 
 class http(_Declaration):
@@ -47,7 +150,16 @@ class http(_Declaration):
         middlewares: Optional[Sequence[Middleware]] = None,
         error_mappings: Optional[Dict[int, Type]] = None,
         proxies: ProxiesType = None,
+        trusted: bool = False,
+        json_codec: JSONCodecType = None,
+        lazy: bool = False,
+        response_path: Optional[str] = None,
+        offload_threshold: Optional[int] = None,
+        max_response_bytes: Optional[int] = None,
+        binary_codec: BinaryCodecType = None,
+        binary_requests: Optional[bool] = None,
     ):
+        self._executors = {}
         self.client_configuration = ClientConfiguration.create(
             base_url=base_url,
             auth=auth,
@@ -56,6 +168,10 @@ class http(_Declaration):
             middlewares=middlewares,
             error_mappings=error_mappings,
             proxies=proxies,
+            json_codec=json_codec,
+            max_response_bytes=max_response_bytes,
+            binary_codec=binary_codec,
+            binary_requests=binary_requests,
         )
 
         self.endpoint_configuration = EndpointConfiguration(
@@ -63,6 +179,10 @@ class http(_Declaration):
             path=path,
             timeout=timeout,
             client_configuration=self.client_configuration,
+            trusted=trusted,
+            lazy=lazy,
+            response_path=response_path,
+            offload_threshold=offload_threshold,
         )
 
 
@@ -79,6 +199,13 @@ class gql(_Declaration):
         middlewares: Optional[Sequence[Middleware]] = None,
         error_mappings: Optional[Dict[int, Type]] = None,
         proxies: ProxiesType = None,
+        trusted: bool = False,
+        json_codec: JSONCodecType = None,
+        lazy: bool = False,
+        response_path: Optional[str] = None,
+        offload_threshold: Optional[int] = None,
+        max_response_bytes: Optional[int] = None,
+        binary_codec: BinaryCodecType = None,
     ):
         try:
             from graphql.parser import GraphQLParser  # type: ignore  # noqa: F401, E501
@@ -88,6 +215,7 @@ class gql(_Declaration):
                 "declarativex[graphql]' to use gql decorator"
             )
 
+        self._executors = {}
         self.client_configuration = ClientConfiguration.create(
             base_url=base_url,
             auth=auth,
@@ -96,6 +224,9 @@ class gql(_Declaration):
             middlewares=middlewares,
             error_mappings=error_mappings,
             proxies=proxies,
+            json_codec=json_codec,
+            max_response_bytes=max_response_bytes,
+            binary_codec=binary_codec,
         )
 
         self.endpoint_configuration = EndpointConfiguration(
@@ -106,4 +237,8 @@ class gql(_Declaration):
             gql=GraphQLConfiguration(
                 query=query,
             ),
+            trusted=trusted,
+            lazy=lazy,
+            response_path=response_path,
+            offload_threshold=offload_threshold,
         )
@@ -1,7 +1,7 @@
+import copy
 import dataclasses
-import inspect
 import json
-from json import JSONDecodeError
+import weakref
 from typing import (
     Any,
     Callable,
@@ -10,161 +10,50 @@ from typing import (
     Sequence,
     Type,
     List,
-    get_origin,
+    Mapping,
+    MutableMapping,
     TypeVar,
-    get_args,
     Union,
     Tuple,
 )
-from urllib.parse import urljoin
-
 import httpx
 
 from .auth import Auth
 from .client import BaseClient
-from .compatibility import parse_obj_as
-from .dependencies import RequestModifier
-from .exceptions import MisconfiguredException, UnprocessableEntityException
+from .codecs import (
+    BinaryCodec,
+    BinaryCodecType,
+    JSONCodec,
+    JSONCodecType,
+    StdlibJSONCodec,
+    check_binary_codec,
+    check_json_codec,
+    get_binary_codec,
+    get_json_codec,
+)
+from .dependencies import CallPlan, Location, RequestModifier
+from .exceptions import MisconfiguredException
 from .middlewares import Middleware
+from .projection import parse_response_path
+from .responses import Response  # noqa: F401 (re-exported)
+from .url_template import URLTemplate, compile_url_template
 from .utils import (
-    ReturnType,
     SUPPORTED_METHODS,
     merge_proxies,
     ProxiesType,
 )
-from .warnings import warn_list_return_type
 
 T = TypeVar("T")
 
 
-@dataclasses.dataclass
-class Response:
-    """
-    Wrapper around httpx.Response that provides a method to convert the
-    response to a specific type.
-
-    Parameters:
-        response: The response to wrap.
-
-    Methods:
-        as_type: Convert the response to a specific type.
-        as_type_for_func: Convert the response to the return type of function.
-    """
-
-    response: httpx.Response
-
-    @staticmethod
-    def __replace_type_var(type_hint: Type, replacement: Type):
-        """
-        Replace a TypeVar with a concrete type. If the type hint is a list
-        of TypeVars, replace the TypeVar in the list with the concrete type.
-        """
-        if isinstance(type_hint, TypeVar):
-            return replacement
-        if get_origin(type_hint) is list and isinstance(
-            get_args(type_hint)[0], TypeVar
-        ):
-            return List[replacement]  # type: ignore[valid-type]
-        return type_hint
-
-    @classmethod
-    def _dataclass_from_dict(
-        cls, dataclass_type: Type[T], generic: Type, data: Dict[str, Any]
-    ) -> T:
-        """
-        Create a dataclass from a dictionary. This method will recursively
-        create dataclasses for fields that are dataclasses. If the dataclass
-        has a generic type, the generic type will be replaced with the
-        concrete type.
-        """
-        field_types = {
-            f.name: cls.__replace_type_var(f.type, generic)
-            for f in dataclasses.fields(
-                dataclass_type  # type: ignore[arg-type]
-            )
-        }
-
-        # Recursively update fields that are dataclasses
-        for name, field_type in field_types.items():
-            if "__origin__" in dir(field_type) and issubclass(
-                field_type.__origin__, list
-            ):
-                elem_type = field_type.__args__[0]
-                if dataclasses.is_dataclass(elem_type):
-                    data[name] = [
-                        cls._dataclass_from_dict(
-                            elem_type, Any, elem  # type: ignore[arg-type]
-                        )
-                        for elem in data[name]
-                    ]
-            elif dataclasses.is_dataclass(field_type):
-                data[name] = cls._dataclass_from_dict(
-                    field_type, Any, data[name]  # type: ignore[arg-type]
-                )
-
-        return dataclass_type(
-            **{k: v for k, v in data.items() if k in field_types}
-        )
-
-    def as_type(self, type_hint: Type):
-        """
-        Convert the response to a specific type. Supports dataclasses,
-        pydantic models, dictionaries and lists of them.
-        """
-        self.response.raise_for_status()
-        if (
-            type_hint is None
-            or type_hint is inspect.Signature.empty
-            or type_hint is httpx.Response
-        ):
-            # If the type hint is None or inspect.Signature.empty, return the
-            # httpx.Response as is.
-            return self.response
-        try:
-            # Try to parse the response as JSON
-            raw_response = json.loads(self.response.text)
-        except JSONDecodeError as e:
-            # If the response is not JSON, raise an exception
-            raise UnprocessableEntityException(response=self.response) from e
-        return_type = type_hint
-        outer_type = get_origin(type_hint)
-        is_list = outer_type == list
-        inner_type = get_args(type_hint)[0] if is_list else type_hint
-        if isinstance(raw_response, list) and not is_list:
-            # If the response is a list, but the type hint is not, show a
-            # warning and apply the type hint to the list.
-            warn_list_return_type(type_hint)
-            return_type = List[type_hint]  # type: ignore[valid-type]
-
-        if dataclasses.is_dataclass(outer_type):
-            # If the type hint is a dataclass, create a dataclass from the
-            # response.
-            generic_args = get_args(inner_type)
-            generic_type = generic_args[0] if generic_args else None
-            return self._dataclass_from_dict(
-                outer_type,  # type: ignore[arg-type]
-                generic_type,
-                data=raw_response,
-            )
-
-        # In other cases, parse the response as the type hint.
-        return parse_obj_as(return_type, raw_response)
-
-    def as_type_for_func(self, func: Callable[..., ReturnType]) -> ReturnType:
-        """
-        Convert the response to the return type of function.
-        """
-        return_type: type = inspect.signature(func).return_annotation
-        return self.as_type(return_type)
-
-
-@dataclasses.dataclass
+@dataclasses.dataclass(frozen=True)
 class ClientConfiguration:
     """
     Configuration for a client. This class is used to configure the client
     with default values for query parameters, headers, middlewares and
     error mappings. The configuration can be passed to the client as a
-    parameter or as a class attribute.
+    parameter or as a class attribute. The configuration is immutable,
+    merging creates a new one.
     """
 
     base_url: Optional[str] = dataclasses.field(default=None)
@@ -176,6 +65,10 @@ class ClientConfiguration:
     middlewares: Sequence[Middleware] = dataclasses.field(default_factory=list)
     error_mappings: Dict[int, Type] = dataclasses.field(default_factory=dict)
     proxies: ProxiesType = dataclasses.field(default=None)
+    json_codec: JSONCodecType = None
+    max_response_bytes: Optional[int] = None
+    binary_codec: BinaryCodecType = None
+    binary_requests: Optional[bool] = None
 
     def __post_init__(self):
         """
@@ -198,6 +91,12 @@ class ClientConfiguration:
         if not isinstance(self.error_mappings, dict):
             # error_mappings should be a dictionary
             raise MisconfiguredException("error_mappings must be a dictionary")
+        check_json_codec(self.json_codec)
+        check_binary_codec(self.binary_codec)
+        if self.max_response_bytes is not None and self.max_response_bytes < 0:
+            raise MisconfiguredException(
+                "max_response_bytes must be a non-negative number"
+            )
 
     @classmethod
     def extract_from_func_kwargs(
@@ -219,6 +118,10 @@ class ClientConfiguration:
                 middlewares=cls_instance.middlewares,
                 error_mappings=cls_instance.error_mappings,
                 proxies=cls_instance.proxies,
+                json_codec=cls_instance.json_codec,
+                max_response_bytes=cls_instance.max_response_bytes,
+                binary_codec=cls_instance.binary_codec,
+                binary_requests=cls_instance.binary_requests,
             )
         return None
 
@@ -238,6 +141,28 @@ class ClientConfiguration:
             middlewares=other.middlewares,
             error_mappings={**other.error_mappings, **self.error_mappings},
             proxies=merge_proxies(self.proxies, other.proxies),
+            # The codec of the declaration takes precedence,
+            # like its error mappings
+            json_codec=(
+                self.json_codec
+                if self.json_codec is not None
+                else other.json_codec
+            ),
+            max_response_bytes=(
+                self.max_response_bytes
+                if self.max_response_bytes is not None
+                else other.max_response_bytes
+            ),
+            binary_codec=(
+                self.binary_codec
+                if self.binary_codec is not None
+                else other.binary_codec
+            ),
+            binary_requests=(
+                self.binary_requests
+                if self.binary_requests is not None
+                else other.binary_requests
+            ),
         )
 
     @classmethod
@@ -252,14 +177,90 @@ class ClientConfiguration:
 
 @dataclasses.dataclass
 class GraphQLConfiguration:
+    """
+    Configuration for a GraphQL operation. The query is parsed once when
+    the configuration is created, so syntax errors are raised when the
+    endpoint is declared. The variables, the operation name and the
+    serialized query are cached for building the request bodies.
+    """
+
     query: str
+    variables: List[str] = dataclasses.field(init=False)
+    operation_name: Optional[str] = dataclasses.field(init=False)
+    _body_prefix: bytes = dataclasses.field(init=False, repr=False)
 
+    def __post_init__(self):
+        from .graphql import parse_gql_query
 
-@dataclasses.dataclass
+        self.variables, self.operation_name = parse_gql_query(self.query)
+        body_prefix = '{"query": ' + json.dumps(self.query)
+        if self.operation_name:
+            body_prefix += ', "operationName": ' + json.dumps(
+                self.operation_name
+            )
+        self._body_prefix = body_prefix.encode("utf-8")
+
+    def build_body(
+        self,
+        variables: Optional[Dict[str, Any]],
+        codec: Optional[JSONCodec] = None,
+    ) -> bytes:
+        """
+        Build the JSON body of the request. Only the variables are
+        serialized, with the codec if set, the query is serialized once.
+        """
+        if not variables:
+            return self._body_prefix + b"}"
+        encoded = (codec or get_json_codec(None)).dumps(variables)
+        return self._body_prefix + b', "variables": ' + encoded + b"}"
+
+
+def _client_attributes(client: BaseClient) -> Tuple[Any, ...]:
+    return (
+        client.base_url,
+        client.auth,
+        client.default_query_params,
+        client.default_headers,
+        client.middlewares,
+        client.error_mappings,
+        client.proxies,
+        client.json_codec,
+        client.max_response_bytes,
+        client.binary_codec,
+        client.binary_requests,
+    )
+
+
+def _snapshot(attributes: Tuple[Any, ...]) -> Tuple[Any, ...]:
+    """
+    The snapshot of the client attributes. The containers are copied, so
+    their in-place changes are detected too, the other values are kept.
+    """
+    return tuple(
+        copy.copy(value) if isinstance(value, (dict, list)) else value
+        for value in attributes
+    )
+
+
+def _unchanged(snapshot: Tuple[Any, ...], attributes: Tuple[Any, ...]) -> bool:
+    """
+    Check if the client attributes match the snapshot: the containers by
+    value, the other values by identity, as auth, codecs and proxies have
+    no value equality.
+    """
+    return all(
+        old is new or (isinstance(old, (dict, list)) and old == new)
+        for old, new in zip(snapshot, attributes)
+    )
+
+
+@dataclasses.dataclass(frozen=True)
 class EndpointConfiguration:
     """
     Configuration for an endpoint. This class is used to configure the
     endpoint with a method, path, timeout and client configuration.
+    The configuration is immutable, the configuration merged with the
+    client attributes is created by `for_client` method.
     """
 
     client_configuration: ClientConfiguration
@@ -267,6 +268,67 @@ class EndpointConfiguration:
     path: str
     timeout: Optional[float] = dataclasses.field(default=5.0)
     gql: Optional[GraphQLConfiguration] = None
+    trusted: bool = False
+    lazy: bool = False
+    response_path: Optional[str] = None
+    offload_threshold: Optional[int] = None
+    _resolved: weakref.WeakKeyDictionary = dataclasses.field(
+        default_factory=weakref.WeakKeyDictionary,
+        init=False,
+        repr=False,
+        compare=False,
+    )
+    _request_defaults: Optional["RequestDefaults"] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+    _compiled_url_template: Optional[URLTemplate] = dataclasses.field(
+        default=None, init=False, repr=False, compare=False
+    )
+
+    @property
+    def request_defaults(self) -> "RequestDefaults":
+        """
+        The defaults of the requests encoded once per configuration.
+        """
+        defaults = self._request_defaults
+        if defaults is None:
+            defaults = RequestDefaults(self.client_configuration)
+            # The configuration is frozen, the defaults are derived from it
+            object.__setattr__(self, "_request_defaults", defaults)
+        return defaults
+
+    def for_client(
+        self, client: Optional[BaseClient]
+    ) -> "EndpointConfiguration":
+        """
+        Get the configuration merged with the attributes of the client
+        instance (or class). The merged configuration is cached per client
+        and computed again only when the client attributes change.
+        """
+        if client is None:
+            return self
+        attributes = _client_attributes(client)
+        try:
+            cached = self._resolved.get(client)
+        except TypeError:  # pragma: no cover
+            # Unhashable clients are not cached
+            cached = None
+        if cached is not None and _unchanged(cached[0], attributes):
+            return cached[1]
+
+        resolved = dataclasses.replace(
+            self,
+            client_configuration=self.client_configuration.merge(
+                ClientConfiguration.extract_from_func_kwargs(
+                    self_=client, cls_=None
+                )  # type: ignore[arg-type]
+            ),
+        )
+        try:
+            self._resolved[client] = (_snapshot(attributes), resolved)
+        except TypeError:  # pragma: no cover
+            pass
+        return resolved
 
     @property
     def url_template(self):
@@ -275,15 +337,52 @@ class EndpointConfiguration:
         of the client configuration joined with the path of the endpoint
         configuration.
         """
-        return urljoin(self.client_configuration.base_url, self.path)
+        return self.compiled_url_template.template
+
+    @property
+    def compiled_url_template(self) -> URLTemplate:
+        """
+        The compiled URL template, looked up once per configuration.
+        Templates are compiled once per base URL and path.
+        """
+        compiled = self._compiled_url_template
+        if compiled is None:
+            compiled = compile_url_template(
+                self.client_configuration.base_url, self.path
+            )
+            # The configuration is frozen, the template is derived from it
+            object.__setattr__(self, "_compiled_url_template", compiled)
+        return compiled
+
+    def compile_plan(self, func: Callable) -> CallPlan:
+        """
+        Compile the call plan of the function declared with this endpoint
+        configuration. Variables of the path (or the GraphQL query) not
+        annotated with a dependency are treated as path (or JSON) fields.
+        Values of trusted endpoints are not validated.
+        """
+        if self.gql:
+            variables = self.gql.variables
+        else:
+            variables = RequestModifier.extract_variables_from_url_template(
+                self.path
+            )
+        return CallPlan.compile(
+            func,
+            method=self.method,
+            url_template_variables=variables,
+            gql=bool(self.gql),
+            trusted=self.trusted,
+        )
 
     def __post_init__(self):
         """
         Validate the configuration. Raises an exception if the configuration
         is invalid. The method must be one of the supported methods. The
-        timeout must be a non-negative number.
+        timeout and the offload threshold must be non-negative numbers.
+        The response path must be keys separated by dots or a JSON pointer.
         """
-        self.method = self.method.upper()
+        object.__setattr__(self, "method", self.method.upper())
         if self.method not in SUPPORTED_METHODS:
             methods = sorted(list(SUPPORTED_METHODS))
             raise MisconfiguredException(f"method must be one of {methods}")
@@ -292,9 +391,248 @@ class EndpointConfiguration:
             raise MisconfiguredException(
                 "timeout must be a non-negative number"
             )
+        if self.offload_threshold is not None and self.offload_threshold < 0:
+            raise MisconfiguredException(
+                "offload_threshold must be a non-negative number"
+            )
+        if self.response_path is not None:
+            # Raises an exception if the path is invalid
+            parse_response_path(self.response_path)
+
+    @property
+    def parsed_response_path(self) -> Optional[Tuple[str, ...]]:
+        """The keys of the response path, parsed once per path."""
+        if self.response_path is None:
+            return None
+        return parse_response_path(self.response_path)
+
+
+class LayeredParams(MutableMapping):
+    """
+    Copy-on-write view of the parameters of a request. The values of the
+    call are written to the own layer over the shared defaults of the
+    client configuration, so the defaults are never changed. The layer is
+    allocated on the first write. Deleting a default copies the defaults
+    to the layer first.
+    """
+
+    __slots__ = ("_defaults", "_layer", "_encoded_defaults")
+
+    def __init__(
+        self, defaults: Mapping[str, Any], encoded_defaults: Any = None
+    ):
+        self._defaults = defaults
+        self._layer: Optional[Dict[str, Any]] = None
+        self._encoded_defaults = encoded_defaults
+
+    @property
+    def defaults(self) -> Mapping[str, Any]:
+        return self._defaults
+
+    @property
+    def layer(self) -> Mapping[str, Any]:
+        """The values of the call."""
+        return self._layer or {}
+
+    @property
+    def encoded_defaults(self) -> Any:
+        """
+        The defaults encoded once per configuration, e.g. httpx.Headers
+        or a query string. None if the defaults were changed.
+        """
+        return self._encoded_defaults
+
+    def flatten(self) -> Mapping[str, Any]:
+        """
+        Get the parameters as a single mapping. The defaults are returned
+        as is if the call has no values of its own, so the result should
+        not be changed.
+        """
+        if not self._layer:
+            return self._defaults
+        if not self._defaults:
+            return self._layer
+        return {**self._defaults, **self._layer}
+
+    def copy(self) -> "LayeredParams":
+        """Copy the parameters, the defaults stay shared."""
+        params = LayeredParams(self._defaults, self._encoded_defaults)
+        if self._layer:
+            params.update(self._layer)
+        return params
+
+    def __getitem__(self, key):
+        layer = self._layer
+        if layer is not None and key in layer:
+            return layer[key]
+        return self._defaults[key]
+
+    def __contains__(self, key) -> bool:
+        layer = self._layer
+        return (layer is not None and key in layer) or key in self._defaults
+
+    def __setitem__(self, key, value):
+        if self._layer is None:
+            self._layer = {}
+        self._layer[key] = value
+
+    def __delitem__(self, key):
+        if key in self._defaults:
+            # Copy on write, the defaults are shared
+            self._layer = {**self._defaults, **(self._layer or {})}
+            self._defaults = {}
+            self._encoded_defaults = None
+        if self._layer is None:
+            raise KeyError(key)
+        del self._layer[key]
+
+    def __iter__(self):
+        return iter(self.flatten())
+
+    def __len__(self) -> int:
+        return len(self.flatten())
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({dict(self.flatten())!r})"
+
+
+class RequestDefaults:
+    """
+    Defaults of the requests of a client configuration: the default query
+    parameters and headers with the static auth applied, and their encoded
+    forms. They are encoded once per configuration and shared by all
+    requests, only the values of the call are encoded per request.
+    Auth that is not static is kept to be applied to every request.
+    """
+
+    __slots__ = (
+        "query_params",
+        "headers",
+        "encoded_query",
+        "encoded_headers",
+        "auth",
+        "json_codec",
+        "binary_codec",
+        "body_codec",
+    )
+
+    def __init__(self, client_configuration: ClientConfiguration):
+        query_params = dict(client_configuration.default_query_params)
+        headers = dict(client_configuration.default_headers)
+        auth = client_configuration.auth
+        if auth is not None and auth.is_static:
+            if auth.location is Location.headers:
+                headers[auth.key] = auth.value
+            else:
+                query_params[auth.key] = auth.value
+            auth = None
+        binary_codec = get_binary_codec(client_configuration.binary_codec)
+        if binary_codec is not None and not any(
+            key.lower() == "accept" for key in headers
+        ):
+            # JSON is accepted too, if the server doesn't support the format
+            headers["Accept"] = (
+                f"{binary_codec.media_type}, application/json;q=0.9"
+            )
+        self.auth = auth
+        self.query_params = query_params
+        self.headers = headers
+        self.encoded_query = str(httpx.QueryParams(query_params))
+        self.encoded_headers = httpx.Headers(headers)
+        self.json_codec = get_json_codec(client_configuration.json_codec)
+        self.binary_codec = binary_codec
+        # The codec of the request bodies, the binary codec only negotiates
+        # the responses unless the binary requests are enabled
+        self.body_codec: Union[JSONCodec, BinaryCodec] = (
+            binary_codec
+            if binary_codec is not None
+            and client_configuration.binary_requests
+            else self.json_codec
+        )
+
+
+def _flatten(params: Optional[Mapping[str, Any]]) -> Optional[Mapping]:
+    if isinstance(params, LayeredParams):
+        return params.flatten()
+    return params
+
+
+def _encode_query(query_params: Optional[Mapping[str, Any]]) -> str:
+    """
+    Encode the query parameters of the request. The defaults encoded once
+    are reused, only the values of the call are encoded.
+    """
+    if not query_params:
+        return ""
+    if (
+        isinstance(query_params, LayeredParams)
+        and query_params.encoded_defaults is not None
+    ):
+        encoded = query_params.encoded_defaults
+        layer = query_params.layer
+        if not layer:
+            return encoded
+        if layer.keys().isdisjoint(query_params.defaults):
+            encoded_layer = str(httpx.QueryParams(layer))
+            if encoded and encoded_layer:
+                return f"{encoded}&{encoded_layer}"
+            return encoded or encoded_layer
+    return str(httpx.QueryParams(_flatten(query_params)))
+
+
+def _encode_headers(
+    headers: Optional[Mapping[str, Any]]
+) -> Optional[Union[httpx.Headers, Mapping[str, Any]]]:
+    """
+    Get the headers of the request. The defaults encoded once are copied
+    and only the values of the call are encoded.
+    """
+    if (
+        isinstance(headers, LayeredParams)
+        and headers.encoded_defaults is not None
+    ):
+        if not headers.layer:
+            return headers.encoded_defaults
+        encoded = httpx.Headers(headers.encoded_defaults)
+        encoded.update(headers.layer)
+        return encoded
+    return _flatten(headers) or None
+
+
+def _copy_params(params: Any) -> Any:
+    if params is None:
+        return None
+    if isinstance(params, LayeredParams):
+        return params.copy()
+    return dict(params)
+
+
+class _LazyDict:
+    """
+    Dictionary attribute of RawRequest stored in the slot with underscore
+    prefix. The dictionary is allocated on the first access, so unused
+    parameters don't cost anything.
+    """
+
+    def __init__(self):
+        self.slot = ""
+
+    def __set_name__(self, owner: type, name: str):
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = getattr(instance, self.slot)
+        if value is None:
+            value = {}
+            setattr(instance, self.slot, value)
+        return value
+
+    def __set__(self, instance, value):
+        setattr(instance, self.slot, value)
 
 
-@dataclasses.dataclass
 class RawRequest:
     """
     A raw request. This class is used to configure a request with a method,
@@ -302,21 +640,135 @@ class RawRequest:
     body and timeout. The request can be prepared with a function and
     arguments. The function signature is used to modify the request
     before it is sent.
+
+    Query parameters and headers are layered over the defaults of the
+    client configuration (see LayeredParams), other parameters are
+    allocated when they are used.
     """
 
-    method: str
-    url_template: str
-    path_params: Dict[str, str] = dataclasses.field(default_factory=dict)
-    query_params: Dict[str, Any] = dataclasses.field(default_factory=dict)
-    headers: Dict[str, str] = dataclasses.field(default_factory=dict)
-    cookies: Dict[str, str] = dataclasses.field(default_factory=dict)
-    json: Dict[str, Any] = dataclasses.field(default_factory=dict)
-    data: Dict[str, Any] = dataclasses.field(default_factory=dict)
+    __slots__ = (
+        "method",
+        "url_template",
+        "_path_params",
+        "_query_params",
+        "_headers",
+        "_cookies",
+        "_json",
+        "_data",
+        "_files",
+        "timeout",
+        "_gql",
+        "_compiled_url_template",
+        "_body_codec",
+    )
+
+    path_params: Dict[str, str] = _LazyDict()  # type: ignore[assignment]
+    query_params: MutableMapping[str, Any] = _LazyDict()  # type: ignore
+    headers: MutableMapping[str, str] = _LazyDict()  # type: ignore
+    cookies: Dict[str, str] = _LazyDict()  # type: ignore[assignment]
+    json: Dict[str, Any] = _LazyDict()  # type: ignore[assignment]
+    data: Dict[str, Any] = _LazyDict()  # type: ignore[assignment]
     files: Dict[
         str, Union[bytes, Tuple[str, bytes], Tuple[str, bytes, str]]
-    ] = dataclasses.field(default_factory=dict)
-    timeout: Optional[float] = None
-    _gql: Optional[GraphQLConfiguration] = None
+    ] = _LazyDict()  # type: ignore[assignment]
+
+    # The parameters before _compiled_url_template stay positional
+    # for compatibility with the former dataclass
+    # pylint: disable-next=too-many-arguments,too-many-positional-arguments
+    def __init__(
+        self,
+        method: str,
+        url_template: str,
+        path_params: Optional[Dict[str, str]] = None,
+        query_params: Optional[MutableMapping[str, Any]] = None,
+        headers: Optional[MutableMapping[str, str]] = None,
+        cookies: Optional[Dict[str, str]] = None,
+        json: Optional[Dict[str, Any]] = None,  # pylint: disable=W0621
+        data: Optional[Dict[str, Any]] = None,
+        files: Optional[
+            Dict[str, Union[bytes, Tuple[str, bytes], Tuple[str, bytes, str]]]
+        ] = None,
+        timeout: Optional[float] = None,
+        _gql: Optional[GraphQLConfiguration] = None,
+        *,
+        _compiled_url_template: Optional[URLTemplate] = None,
+        _body_codec: Union[JSONCodec, BinaryCodec, None] = None,
+    ):
+        self.method = method
+        self.url_template = url_template
+        self._path_params = path_params
+        self._query_params = query_params
+        self._headers = headers
+        self._cookies = cookies
+        self._json = json
+        self._data = data
+        self._files = files
+        self.timeout = timeout
+        self._gql = _gql
+        self._compiled_url_template = _compiled_url_template
+        self._body_codec = _body_codec
+
+    def _fields(self) -> Tuple[Any, ...]:
+        return (
+            self.method,
+            self.url_template,
+            self._path_params or {},
+            dict(self._query_params or {}),
+            dict(self._headers or {}),
+            self._cookies or {},
+            self._json or {},
+            self._data or {},
+            self._files or {},
+            self.timeout,
+            self._gql,
+        )
+
+    def __eq__(self, other):
+        if other.__class__ is not self.__class__:
+            return NotImplemented
+        return self._fields() == other._fields()
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self):
+        names = (
+            "method",
+            "url_template",
+            "path_params",
+            "query_params",
+            "headers",
+            "cookies",
+            "json",
+            "data",
+            "files",
+            "timeout",
+            "_gql",
+        )
+        fields = ", ".join(
+            f"{name}={value!r}" for name, value in zip(names, self._fields())
+        )
+        return f"{self.__class__.__name__}({fields})"
+
+    def copy(self) -> "RawRequest":
+        """
+        Copy the request. The parameters are copied too, so the copy can be
+        changed without changing this request, e.g. by middlewares.
+        """
+        return RawRequest(
+            method=self.method,
+            url_template=self.url_template,
+            path_params=_copy_params(self._path_params),
+            query_params=_copy_params(self._query_params),
+            headers=_copy_params(self._headers),
+            cookies=_copy_params(self._cookies),
+            json=_copy_params(self._json),
+            data=_copy_params(self._data),
+            files=_copy_params(self._files),
+            timeout=self.timeout,
+            _gql=self._gql,
+            _compiled_url_template=self._compiled_url_template,
+            _body_codec=self._body_codec,
+        )
 
     @classmethod
     def initialize(
@@ -328,18 +780,34 @@ class RawRequest:
         will be initialized with the default query parameters and headers
         of the client configuration.
         """
-        q = endpoint_configuration.client_configuration.default_query_params
-        h = endpoint_configuration.client_configuration.default_headers
-        a = endpoint_configuration.client_configuration.auth
+        defaults = endpoint_configuration.request_defaults
+        url_template = endpoint_configuration.compiled_url_template
         request = RawRequest(
             method=endpoint_configuration.method,
-            url_template=endpoint_configuration.url_template,
-            query_params=q,
-            headers=h,
+            url_template=url_template.template,
+            # The defaults are shared between calls, so the values
+            # of the call are written to the separate layer
+            query_params=(
+                LayeredParams(defaults.query_params, defaults.encoded_query)
+                if defaults.query_params
+                else None
+            ),
+            headers=(
+                LayeredParams(defaults.headers, defaults.encoded_headers)
+                if defaults.headers
+                else None
+            ),
             _gql=endpoint_configuration.gql,
+            _compiled_url_template=url_template,
+            # GraphQL requests are always sent as JSON
+            _body_codec=(
+                defaults.json_codec
+                if endpoint_configuration.gql
+                else defaults.body_codec
+            ),
         )
-        if a:
-            request = a.apply_auth(request)
+        if defaults.auth:
+            request = defaults.auth.apply_auth(request)
         return request
 
     def prepare(
@@ -356,24 +824,81 @@ class RawRequest:
             request=self, func=func, gql=gql, **values
         )
 
-    def url(self):
-        return self.url_template.format(**self.path_params)
+    @property
+    def compiled_url_template(self) -> URLTemplate:
+        """
+        The compiled URL template of the request. It is compiled again
+        if the URL template was changed, e.g. by a middleware.
+        """
+        compiled = self._compiled_url_template
+        if compiled is None or compiled.template != self.url_template:
+            compiled = compile_url_template(None, self.url_template)
+            self._compiled_url_template = compiled
+        return compiled
+
+    def url(self) -> str:
+        """The URL with percent-encoded path parameters."""
+        return self.compiled_url_template.render(self._path_params or {})
 
     def to_httpx_request(self) -> httpx.Request:
-        """Convert the request to a httpx.Request."""
-        if self._gql:
-            _json: dict[str, Any] = {"query": self._gql.query}
-            if self.json:
-                _json["variables"] = self.json
+        """
+        Convert the request to a httpx.Request. The defaults encoded once
+        per configuration are reused.
+        """
+        url_template = self.compiled_url_template
+        path_params = self._path_params or {}
+        if url_template.has_query:
+            # Let httpx merge the parameters with the query of the template
+            url = url_template.to_httpx_url(path_params)
+            params = _flatten(self._query_params) or None
         else:
-            _json = self.json
+            url = url_template.to_httpx_url(
+                path_params, query=_encode_query(self._query_params)
+            )
+            params = None
+        # Slots are used to not allocate the unused parameters
+        headers = _encode_headers(self._headers)
+        codec = self._body_codec
+        if self._gql:
+            headers = httpx.Headers(headers)
+            headers.setdefault("Content-Type", "application/json")
+            return httpx.Request(
+                method=self.method,
+                url=url,
+                params=params,
+                headers=headers,
+                cookies=self._cookies or None,
+                content=self._gql.build_body(
+                    self._json,
+                    codec if isinstance(codec, JSONCodec) else None,
+                ),
+            )
+        if (
+            self._json
+            and codec is not None
+            and not isinstance(codec, StdlibJSONCodec)
+            and not self._data
+            and not self._files
+        ):
+            # The body is encoded with the codec of the client,
+            # httpx encodes it with the standard json module
+            headers = httpx.Headers(headers)
+            headers.setdefault("Content-Type", codec.media_type)
+            return httpx.Request(
+                method=self.method,
+                url=url,
+                params=params,
+                headers=headers,
+                cookies=self._cookies or None,
+                content=codec.dumps(self._json),
+            )
         return httpx.Request(
             method=self.method,
-            url=self.url(),
-            params=self.query_params if self.query_params else None,
-            headers=self.headers if self.headers else None,
-            cookies=self.cookies if self.cookies else None,
-            json=_json if _json else None,
-            data=self.data if self.data else None,
-            files=self.files if self.files else None,
+            url=url,
+            params=params,
+            headers=headers,
+            cookies=self._cookies or None,
+            json=self._json or None,
+            data=self._data or None,
+            files=self._files or None,
         )
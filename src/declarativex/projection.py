@@ -0,0 +1,107 @@
+import functools
+from typing import Any, Sequence, Tuple
+
+from .compatibility import is_msgspec_type
+from .exceptions import MisconfiguredException
+
+
+@functools.lru_cache(maxsize=None)
+def parse_response_path(response_path: str) -> Tuple[str, ...]:
+    """
+    Parse the path of the response sub-tree: the keys separated by dots,
+    e.g. "data.items", or a JSON pointer, e.g. "/data/items".
+    Raises MisconfiguredException if the path is empty.
+    """
+    if response_path.startswith("/"):
+        keys = tuple(
+            key.replace("~1", "/").replace("~0", "~")
+            for key in response_path[1:].split("/")
+        )
+    else:
+        keys = tuple(response_path.split("."))
+    if not response_path or not all(keys):
+        raise MisconfiguredException(
+            f"Invalid response_path {response_path!r}, expected keys "
+            "separated by dots, e.g. 'data.items', or a JSON pointer"
+        )
+    return keys
+
+
+def _envelope_type(path: Sequence[str], type_hint: Any) -> Any:
+    """
+    Build the type of the envelope, where the only key at every level
+    is the next key of the path and the value at the end is the type hint.
+    """
+    # pylint: disable-next=import-outside-toplevel
+    from typing_extensions import TypedDict
+
+    envelope: Any = type_hint
+    for key in reversed(path):
+        # The functional syntax allows any keys, not only identifiers
+        envelope = TypedDict("Envelope", {key: envelope})  # type: ignore
+    return envelope
+
+
+def _msgspec_envelope_type(path: Sequence[str], type_hint: Any) -> Any:
+    # pylint: disable-next=import-outside-toplevel
+    import msgspec  # type: ignore[import-not-found]
+
+    envelope = type_hint
+    for key in reversed(path):
+        envelope = msgspec.defstruct(
+            "Envelope", [("value", envelope)], rename={"value": key}
+        )
+    return envelope
+
+
+def _build_envelope_type(path: Tuple[str, ...], type_hint: Any) -> Any:
+    if is_msgspec_type(type_hint):
+        return _msgspec_envelope_type(path, type_hint)
+    return _envelope_type(path, type_hint)
+
+
+_cached_envelope_type = functools.lru_cache(maxsize=1024)(
+    _build_envelope_type
+)
+
+
+def envelope_type(path: Tuple[str, ...], type_hint: Any) -> Any:
+    """
+    Get the envelope type of the projection, cached per path and type.
+    Validating the response as the envelope skips the other keys, so only
+    the sub-tree at the path is decoded into the type.
+    """
+    try:
+        return _cached_envelope_type(path, type_hint)
+    except TypeError:  # pragma: no cover
+        # Unhashable types are not cached
+        return _build_envelope_type(path, type_hint)
+
+
+def unwrap_envelope(path: Tuple[str, ...], type_hint: Any, envelope: Any):
+    """Get the value at the path from the envelope decoded by the type."""
+    if is_msgspec_type(type_hint):
+        for _ in path:
+            envelope = envelope.value
+        return envelope
+    return project(path, envelope)
+
+
+def project(path: Tuple[str, ...], data: Any) -> Any:
+    """
+    Get the value at the path from the decoded JSON. Raises KeyError
+    if the path is not in the data.
+    """
+    for key in path:
+        if not isinstance(data, dict):
+            raise KeyError(key)
+        data = data[key]
+    return data
+
+
+__all__ = [
+    "parse_response_path",
+    "envelope_type",
+    "unwrap_envelope",
+    "project",
+]
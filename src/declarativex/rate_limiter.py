@@ -1,98 +1,202 @@
 import asyncio
 import time
-from typing import Callable, Union, Awaitable
+from typing import Callable, Optional, Union, Awaitable
 
-from .exceptions import RateLimitExceeded
-from .utils import ReturnType, SupportDecorator
+import httpx
+
+from .context import check_deadline, observe_responses
+from .exceptions import MisconfiguredException, RateLimitExceeded
+from .utils import (
+    ReturnType,
+    SupportDecorator,
+    parse_rate_limit_reset,
+    parse_retry_after,
+)
 
 
 class Bucket:
     token_fill_rate: float
     last_time_token_added: float
     token_bucket: float
+    paused_until: float
 
-    def __init__(self, max_calls: float, interval: float):
+    def __init__(
+        self, max_calls: float, interval: float, max_pause: float = 300.0
+    ):
         self._max_calls = max_calls
         self._interval = interval
+        self._max_pause = max_pause
 
         self.token_fill_rate = max_calls / interval
         self.last_time_token_added = 0.0
         self.token_bucket = max_calls
+        self.paused_until = 0.0
+        self._adapted_until = 0.0
 
     @property
     def max_calls(self):
         return self._max_calls
 
+    @property
+    def base_fill_rate(self) -> float:
+        return self._max_calls / self._interval
+
     def refill(self):
         self.token_bucket = self._max_calls
         self.last_time_token_added = 0.0
+        self.token_fill_rate = self.base_fill_rate
+        self.paused_until = 0.0
+        self._adapted_until = 0.0
+
+    def pause_left(self) -> float:
+        """
+        Seconds left until the upstream allows calls again. Also restores
+        the configured fill rate when the adapted window is over.
+        """
+        now = time.monotonic()
+        if self._adapted_until and now >= self._adapted_until:
+            self.token_fill_rate = self.base_fill_rate
+            self._adapted_until = 0.0
+        return max(self.paused_until - now, 0.0)
+
+    def pause(self, seconds: float) -> None:
+        """
+        Pause all callers of the bucket for the given number of seconds,
+        at most for max_pause seconds.
+        """
+        seconds = min(seconds, self._max_pause)
+        self.token_bucket = 0.0
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def adapt(self, response: httpx.Response) -> None:
+        """
+        Adjust the bucket according to the rate limit headers of the
+        upstream response. On 429, all callers are paused until the time
+        from Retry-After or X-RateLimit-Reset header. Otherwise, remaining
+        tokens are capped with X-RateLimit-Remaining and the refill rate
+        is slowed down to spread them evenly until X-RateLimit-Reset.
+        The reset and the pauses are capped with max_pause, so a bogus
+        header can't stall the callers indefinitely.
+        """
+        headers = response.headers
+        reset = parse_rate_limit_reset(headers.get("X-RateLimit-Reset"))
+        if reset is not None:
+            reset = min(reset, self._max_pause)
+        if response.status_code == 429:
+            retry_after = parse_retry_after(headers.get("Retry-After"))
+            if retry_after is None:
+                retry_after = reset
+            if retry_after is None:
+                # Nothing to rely on, wait for a single token
+                retry_after = 1 / self.base_fill_rate
+            self.pause(retry_after)
+            return
+
+        try:
+            remaining = float(headers["X-RateLimit-Remaining"])
+        except (KeyError, ValueError):
+            return
+        self.token_bucket = min(self.token_bucket, remaining)
+        if not reset:
+            return
+        if remaining < 1:
+            self.pause(reset)
+            return
+        self.token_fill_rate = min(self.base_fill_rate, remaining / reset)
+        self._adapted_until = time.monotonic() + reset
 
 
 class rate_limiter(SupportDecorator):
-    def __init__(self, max_calls: int, interval: float, reject: bool = False):
-        self._bucket = Bucket(max_calls, interval)
+    def __init__(
+        self,
+        max_calls: int,
+        interval: float,
+        reject: bool = False,
+        adaptive: bool = False,
+        *,
+        max_pause: float = 300.0,
+    ):
+        if max_pause <= 0:
+            raise MisconfiguredException("max_pause must be a positive number")
+        self._bucket = Bucket(max_calls, interval, max_pause)
         self._reject = reject
-        self._loop = asyncio.get_event_loop()
+        self._adaptive = adaptive
         self._lock = asyncio.Lock()
 
+    def _pause_left(self) -> Optional[float]:
+        """
+        Check if the upstream asked to pause. Raises RateLimitExceeded if
+        calls should be rejected instead of waiting and DeadlineExceeded if
+        the pause would overrun the deadline of the call.
+        """
+        if not self._adaptive:
+            return None
+        left_to_wait = self._bucket.pause_left()
+        if left_to_wait:
+            if self._reject:
+                raise RateLimitExceeded()
+            check_deadline(left_to_wait)
+        return left_to_wait
+
+    def _take_token(self) -> float:
+        """
+        Refill the bucket for the time passed and take the token of the
+        call. Returns the seconds to wait until the token is available.
+        Raises RateLimitExceeded if calls should be rejected instead of
+        waiting and DeadlineExceeded if the wait would overrun the deadline.
+        """
+        bucket = self._bucket
+        now = time.monotonic()
+        bucket.token_bucket = min(
+            bucket.token_bucket
+            + (now - bucket.last_time_token_added) * bucket.token_fill_rate,
+            bucket.max_calls,
+        )
+        bucket.last_time_token_added = now
+
+        # check if we have to wait for a function call
+        # (min 1 token in order to make a call)
+        left_to_wait = 0.0
+        if bucket.token_bucket < 1.0:
+            if self._reject:
+                raise RateLimitExceeded()
+            left_to_wait = (1 - bucket.token_bucket) / bucket.token_fill_rate
+            check_deadline(left_to_wait)
+        # The token is taken before the call, so the adaptive bucket
+        # caps the rest with the remaining calls reported by upstream
+        bucket.token_bucket -= 1.0
+        return left_to_wait
+
     async def _decorate_async(
         self, func: Callable[..., Awaitable[ReturnType]], *args, **kwargs
     ) -> ReturnType:
         async with self._lock:
-            try:
-                elapsed = (
-                    self._loop.time() - self._bucket.last_time_token_added
-                )
-                self._bucket.token_bucket = min(
-                    self._bucket.token_bucket
-                    + elapsed * self._bucket.token_fill_rate,
-                    self._bucket.max_calls,
-                )
-                self._bucket.last_time_token_added = self._loop.time()
-
-                # check if we have to wait for a function call
-                # (min 1 token in order to make a call)
-                if self._bucket.token_bucket < 1.0:
-                    if self._reject:
-                        raise RateLimitExceeded()
-                    left_to_wait = (
-                        1 - self._bucket.token_bucket
-                    ) / self._bucket.token_fill_rate
-                    await asyncio.sleep(left_to_wait)
-
-                return await func(*args, **kwargs)
-            finally:
-                # for every call we can consume one token,
-                # if the bucket is empty, we have to wait
-                self._bucket.token_bucket -= 1.0
+            paused = self._pause_left()
+            if paused:
+                await asyncio.sleep(paused)
+            left_to_wait = self._take_token()
+            if left_to_wait:
+                await asyncio.sleep(left_to_wait)
+
+            if self._adaptive:
+                with observe_responses(self._bucket.adapt):
+                    return await func(*args, **kwargs)
+            return await func(*args, **kwargs)
 
     def _decorate_sync(
         self, func: Callable[..., ReturnType], *args, **kwargs
     ) -> ReturnType:
-        try:
-            elapsed = time.perf_counter() - self._bucket.last_time_token_added
-            self._bucket.token_bucket = min(
-                self._bucket.token_bucket
-                + elapsed * self._bucket.token_fill_rate,
-                self._bucket.max_calls,
-            )
-            self._bucket.last_time_token_added = time.perf_counter()
-
-            # check if we have to wait for a function call
-            # (min 1 token in order to make a call)
-            if self._bucket.token_bucket < 1.0:
-                if self._reject:
-                    raise RateLimitExceeded()
-                left_to_wait = (
-                    1 - self._bucket.token_bucket
-                ) / self._bucket.token_fill_rate
-                time.sleep(left_to_wait)
-
-            return func(*args, **kwargs)
-        finally:
-            # for every call we can consume one token,
-            # if the bucket is empty, we have to wait
-            self._bucket.token_bucket -= 1.0
+        paused = self._pause_left()
+        if paused:
+            time.sleep(paused)
+        left_to_wait = self._take_token()
+        if left_to_wait:
+            time.sleep(left_to_wait)
+
+        if self._adaptive:
+            with observe_responses(self._bucket.adapt):
+                return func(*args, **kwargs)
+        return func(*args, **kwargs)
 
     def refill(self):
         self._bucket.refill()
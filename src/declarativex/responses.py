@@ -0,0 +1,312 @@
+import dataclasses
+import inspect
+import re
+from json import JSONDecodeError
+from typing import (
+    Any,
+    Callable,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    Union,
+    get_origin,
+)
+
+import httpx
+
+from .codecs import (
+    BinaryCodec,
+    BinaryDecodeError,
+    JSONCodec,
+    StdlibJSONCodec,
+    binary_codec_for,
+    is_plain_json,
+    plain_json_type,
+)
+from .columnar import (
+    Columns,
+    decode_columns,
+    decode_columns_json,
+    is_columns_type,
+)
+from .compatibility import (
+    is_msgspec_type,
+    parse_json_as,
+    parse_json_in_chunks,
+    parse_obj_as,
+    pydantic_v2,
+    supports_chunks,
+)
+from .decoders import decode_dataclass
+from .exceptions import UnprocessableEntityException
+from .lazy import lazy_decode, supports_lazy
+from .projection import envelope_type, project, unwrap_envelope
+from .utils import ReturnType
+from .warnings import warn_list_return_type
+
+_JSON_ARRAY = re.compile(rb"\s*\[")
+_JSON_ARRAY_TEXT = re.compile(r"\s*\[")
+_UTF8_CHARSETS = frozenset({"utf-8", "utf8", "ascii", "us-ascii"})
+_STDLIB_CODEC = StdlibJSONCodec()
+
+
+def _is_json_array(body: Union[bytes, str]) -> bool:
+    """Check if the JSON document is an array without parsing it."""
+    if isinstance(body, bytes):
+        return _JSON_ARRAY.match(body) is not None
+    return _JSON_ARRAY_TEXT.match(body) is not None
+
+
+@dataclasses.dataclass
+class Response:
+    """
+    Wrapper around httpx.Response that provides a method to convert the
+    response to a specific type.
+
+    Parameters:
+        response: The response to wrap.
+        json_codec: The codec to decode the JSON body,
+            the standard json module by default.
+        lazy: Return models that are decoded on attribute access
+            (see LazyModel).
+        response_path: The keys of the sub-tree of the response
+            to convert, e.g. ("data", "items").
+        chunk_size: Decode and validate JSON arrays of items in chunks
+            of this size, so other threads run between the chunks
+            (see converts_in_chunks).
+        binary_codec: The codec of the binary format negotiated instead
+            of JSON. Responses of other binary formats are decoded with
+            their codec too, if it is installed.
+
+    Methods:
+        as_type: Convert the response to a specific type.
+        as_type_for_func: Convert the response to the return type of function.
+    """
+
+    response: httpx.Response
+    json_codec: Optional[JSONCodec] = None
+    lazy: bool = False
+    response_path: Optional[Tuple[str, ...]] = None
+    chunk_size: Optional[int] = None
+    binary_codec: Optional[BinaryCodec] = None
+
+    def as_type(self, type_hint: Type):
+        """
+        Convert the response to a specific type. Supports dataclasses,
+        pydantic models, dictionaries and lists of them.
+        """
+        self.response.raise_for_status()
+        return self.convert(type_hint)
+
+    def convert(self, type_hint: Type):
+        """
+        Convert the body of the response to a specific type regardless
+        of the status code, e.g. the body of the error response.
+        The format is picked by the Content-Type of the response.
+        """
+        if (
+            type_hint is None
+            or type_hint is inspect.Signature.empty
+            or type_hint is httpx.Response
+        ):
+            # If the type hint is None or inspect.Signature.empty, return the
+            # httpx.Response as is.
+            return self.response
+        binary_codec = binary_codec_for(
+            self.response.headers.get("Content-Type"), self.binary_codec
+        )
+        if binary_codec is not None:
+            return self._from_binary(type_hint, binary_codec)
+        return self._from_json(type_hint)
+
+    def _from_json(self, type_hint: Any) -> Any:
+        """Convert the JSON response to the type."""
+        body = self._json_body()
+        codec = self.json_codec or _STDLIB_CODEC
+        try:
+            if self.response_path:
+                return self._project(type_hint, body, codec)
+
+            return_type = type_hint
+            if is_columns_type(type_hint):
+                return self._decode_columns(
+                    decode_columns_json, type_hint, body, codec.loads
+                )
+            if get_origin(type_hint) is not list and _is_json_array(body):
+                # If the response is a list, but the type hint is not, show
+                # a warning and apply the type hint to the list.
+                warn_list_return_type(type_hint)
+                return_type = List[type_hint]  # type: ignore[valid-type]
+
+            if self._from_decoded(return_type):
+                return self._convert(return_type, codec.loads(body))
+
+            # In other cases, parse the response as the type hint.
+            # The body is validated without the intermediate objects,
+            # if the pydantic version supports it.
+            if self.chunk_size and self.converts_in_chunks(return_type):
+                return parse_json_in_chunks(
+                    return_type, body, self.chunk_size
+                )
+            return parse_json_as(return_type, body, loads=codec.loads)
+        except JSONDecodeError as e:
+            # If the response is not JSON, raise an exception
+            raise UnprocessableEntityException(response=self.response) from e
+
+    def converts_in_chunks(self, type_hint: Any) -> bool:
+        """
+        Whether the response is decoded and validated as the type in
+        chunks (if chunk_size is set): a JSON array of items validated by
+        pydantic, decoded with the standard json module. The other
+        conversions are single calls that hold the GIL.
+        """
+        return (
+            supports_chunks(type_hint)
+            and not self.response_path
+            and not self._from_decoded(type_hint)
+            and isinstance(self.json_codec or _STDLIB_CODEC, StdlibJSONCodec)
+            and binary_codec_for(
+                self.response.headers.get("Content-Type"), self.binary_codec
+            )
+            is None
+        )
+
+    def _from_binary(self, type_hint: Any, codec: BinaryCodec) -> Any:
+        """
+        Convert the response in the binary format to the type. The body
+        is decoded with the codec, then converted like the decoded JSON.
+        """
+        try:
+            data = codec.loads(self.response.content)
+        except (BinaryDecodeError, KeyError) as e:
+            raise UnprocessableEntityException(response=self.response) from e
+        if self.response_path:
+            data = self._project_decoded(data)
+        return_type = type_hint
+        if (
+            not self.response_path
+            and isinstance(data, list)
+            and get_origin(type_hint) is not list
+            and not is_columns_type(type_hint)
+        ):
+            warn_list_return_type(type_hint)
+            return_type = List[type_hint]  # type: ignore[valid-type]
+        return self._convert(return_type, data)
+
+    def _from_decoded(self, return_type: Any) -> bool:
+        """
+        Whether the type is built from the decoded JSON: generic
+        dataclasses, lazy models, columns, dictionaries and lists.
+        """
+        return (
+            dataclasses.is_dataclass(get_origin(return_type))
+            or is_columns_type(return_type)
+            or (self.lazy and supports_lazy(return_type))
+            or plain_json_type(return_type) is not None
+        )
+
+    def _convert(self, return_type: Any, data: Any) -> Any:
+        """Convert the decoded JSON to the type."""
+        if dataclasses.is_dataclass(get_origin(return_type)):
+            # If the type hint is a generic dataclass, create it from
+            # the response with the decoder generated for the type.
+            return decode_dataclass(return_type, data)
+
+        if is_columns_type(return_type):
+            return self._decode_columns(decode_columns, return_type, data)
+
+        if self.lazy:
+            # The models are validated on attribute access. If the
+            # data doesn't match, the full validation reports it.
+            wrapped, result = lazy_decode(return_type, data)
+            if wrapped:
+                return result
+
+        plain_type = plain_json_type(return_type)
+        if plain_type is not None and is_plain_json(
+            data, plain_type
+        ):
+            # Dictionaries and lists are returned as decoded,
+            # if they are what the type hint expects.
+            return data
+        return parse_obj_as(return_type, data)
+
+    def _decode_columns(
+        self, decode: Callable[..., Columns], *args: Any
+    ) -> Columns:
+        """
+        Decode the records into columns, raises UnprocessableEntityException
+        if they don't match the model.
+        """
+        try:
+            return decode(*args)
+        except ValueError as e:
+            raise UnprocessableEntityException(
+                response=self.response, reason=str(e)
+            ) from e
+
+    def _project(
+        self, type_hint: Any, body: Union[bytes, str], codec: JSONCodec
+    ) -> Any:
+        """
+        Convert the sub-tree of the response at the response path
+        to the type. Pydantic (v2) and msgspec validate the response as
+        the envelope type, that skips the other keys, so only the
+        sub-tree is built.
+        """
+        path: Tuple[str, ...] = self.response_path  # type: ignore
+        if self._from_decoded(type_hint) or not (
+            pydantic_v2() or is_msgspec_type(type_hint)
+        ):
+            data = self._project_decoded(codec.loads(body))
+            return self._convert(type_hint, data)
+        try:
+            envelope = parse_json_as(
+                envelope_type(path, type_hint), body, loads=codec.loads
+            )
+        except ValueError:
+            # Validation errors of pydantic and msgspec are ValueErrors.
+            # A missing path is reported the same way for all the types,
+            # other errors are raised as is.
+            self._project_decoded(codec.loads(body))
+            raise
+        return unwrap_envelope(path, type_hint, envelope)
+
+    def _project_decoded(self, data: Any) -> Any:
+        """
+        Get the sub-tree at the response path from the decoded response.
+        Raises UnprocessableEntityException if the path is missing.
+        """
+        path: Tuple[str, ...] = self.response_path  # type: ignore
+        try:
+            return project(path, data)
+        except KeyError as e:
+            raise UnprocessableEntityException(
+                response=self.response,
+                reason=(
+                    f"Missing key {e.args[0]!r} "
+                    f"of response_path {'.'.join(path)!r}"
+                ),
+            ) from e
+
+    def _json_body(self) -> Union[bytes, str]:
+        """
+        The body of the response to parse as JSON. JSON is UTF-8 encoded,
+        so the raw content is used, unless the response declares another
+        charset.
+        """
+        charset = self.response.charset_encoding
+        if charset is None or charset.lower() in _UTF8_CHARSETS:
+            return self.response.content
+        return self.response.text
+
+    def as_type_for_func(self, func: Callable[..., ReturnType]) -> ReturnType:
+        """
+        Convert the response to the return type of function.
+        """
+        return_type: type = inspect.signature(func).return_annotation
+        return self.as_type(return_type)
+
+
+__all__ = ["Response"]
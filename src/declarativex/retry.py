@@ -1,47 +1,312 @@
 import asyncio
+import dataclasses
+import enum
+import random
+import threading
 import time
-from typing import Callable
+from collections import deque
+from typing import Callable, Collection, Deque, Optional, Tuple, Type
 
-from .utils import SupportDecorator
+import httpx
+
+from .context import remaining_time
+from .exceptions import (
+    HTTPException,
+    MisconfiguredException,
+    TimeoutException,
+)
+from .utils import SupportDecorator, parse_retry_after
+
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+# The base of the decorrelated jitter if the delay is zero, otherwise
+# every delay would be zero too
+DECORRELATED_JITTER_BASE = 0.1
+
+
+class Jitter(str, enum.Enum):
+    """Enum for randomization strategies of the retry delay."""
+
+    none = "none"
+    full = "full"
+    decorrelated = "decorrelated"
+
+
+def _request_method(exc: BaseException) -> Optional[str]:
+    """
+    Get the HTTP method of the request that caused the exception.
+    Returns None if the exception is not bound to a request.
+    """
+    if isinstance(exc, HTTPException):
+        return exc.raw_request.method
+    if isinstance(exc, TimeoutException):
+        return exc.request.method if exc.request else None
+    if isinstance(exc, httpx.RequestError):
+        try:
+            return exc.request.method
+        except RuntimeError:  # pragma: no cover
+            return None
+    return None
+
+
+@dataclasses.dataclass
+class RetryPolicy:
+    """
+    Policy that decides whether a failed call should be retried
+    and how long to wait before the next attempt.
+
+    Parameters:
+        max_retries: The maximum number of retries.
+        exceptions: The exception classes to retry on.
+        status_codes: The HTTP status codes to retry on.
+        methods: The HTTP methods allowed to be retried, idempotent
+            methods by default. None allows all methods.
+        delay: The delay before the first retry.
+        backoff_factor: The multiplier of the delay for every next retry.
+        max_delay: The upper bound of the delay between retries.
+        jitter: The randomization strategy of the delay.
+        respect_retry_after: Whether to wait for the time from Retry-After
+            header of the failed response.
+    """
+
+    max_retries: int = 3
+    exceptions: Tuple[Type[BaseException], ...] = ()
+    status_codes: Collection[int] = frozenset()
+    methods: Optional[Collection[str]] = IDEMPOTENT_METHODS
+    delay: float = 0.0
+    backoff_factor: float = 1.0
+    max_delay: Optional[float] = None
+    jitter: Jitter = Jitter.none
+    respect_retry_after: bool = True
+
+    def __post_init__(self):
+        """
+        Validate the policy. Raises an exception if the policy is invalid.
+        """
+        if self.max_retries < 0:
+            raise MisconfiguredException(
+                "max_retries must be a non-negative number"
+            )
+        if self.delay < 0 or (
+            self.max_delay is not None and self.max_delay < 0
+        ):
+            raise MisconfiguredException(
+                "delay and max_delay must be non-negative numbers"
+            )
+        self.status_codes = frozenset(self.status_codes)
+        if self.methods is not None:
+            self.methods = frozenset(m.upper() for m in self.methods)
+        self.jitter = Jitter(self.jitter)
+
+    def is_retryable(self, exc: BaseException) -> bool:
+        """
+        Check if the exception matches the policy. The exception should be
+        one of the exceptions or HTTPException with one of the status codes,
+        and the request method should be allowed to retry.
+        """
+        matched = (
+            isinstance(exc, HTTPException)
+            and exc.status_code in self.status_codes
+        ) or isinstance(exc, self.exceptions)
+        if not matched:
+            return False
+        if self.methods is None:
+            return True
+        method = _request_method(exc)
+        return method is None or method in self.methods
+
+    def backoff(self, attempt: int, previous_delay: float) -> float:
+        """
+        Calculate the delay before the given retry attempt (starting from 1).
+        """
+        if self.jitter is Jitter.decorrelated:
+            base = self.delay or DECORRELATED_JITTER_BASE
+            value = random.uniform(base, max(previous_delay * 3, base))
+        else:
+            value = self.delay * self.backoff_factor ** (attempt - 1)
+            if self.jitter is Jitter.full:
+                value = random.uniform(0, value)
+        if self.max_delay is not None:
+            value = min(value, self.max_delay)
+        return value
+
+    def get_delay(
+        self, attempt: int, previous_delay: float, exc: BaseException
+    ) -> Optional[float]:
+        """
+        Get the delay before the given retry attempt or None if the call
+        should not be retried. Retry-After of the failed response takes
+        precedence over the calculated delay, but the delay is still
+        capped at max_delay.
+        """
+        if attempt > self.max_retries or not self.is_retryable(exc):
+            return None
+        delay = self.backoff(attempt, previous_delay)
+        if self.respect_retry_after and isinstance(exc, HTTPException):
+            retry_after = parse_retry_after(
+                exc.raw_response.headers.get("Retry-After")
+            )
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+                if self.max_delay is not None:
+                    delay = min(delay, self.max_delay)
+        return delay
+
+
+class RetryBudget:
+    """
+    Shared budget that limits retries to a fraction of recent successful
+    calls, so an upstream incident doesn't turn into a retry storm.
+    Share one budget between endpoints by passing it to several retry
+    decorators or by decorating the whole client class.
+
+    Parameters:
+        ratio: The allowed number of retries per successful call.
+        ttl: The window in seconds for counting recent calls.
+        min_retries_per_second: The number of retries allowed regardless
+            of successful calls, e.g. for rarely called endpoints.
+    """
+
+    def __init__(
+        self,
+        ratio: float = 0.1,
+        ttl: float = 10.0,
+        min_retries_per_second: float = 0.0,
+    ):
+        if ratio < 0 or ttl <= 0 or min_retries_per_second < 0:
+            raise MisconfiguredException(
+                "ratio and min_retries_per_second must be non-negative, "
+                "ttl must be a positive number"
+            )
+        self._ratio = ratio
+        self._ttl = ttl
+        self._reserve = min_retries_per_second * ttl
+        self._successes: Deque[float] = deque()
+        self._retries: Deque[float] = deque()
+        self._lock = threading.Lock()
+        self.successful_calls = 0
+        self.retries = 0
+        self.denied_retries = 0
+
+    def _expire(self, now: float) -> None:
+        threshold = now - self._ttl
+        for events in (self._successes, self._retries):
+            while events and events[0] < threshold:
+                events.popleft()
+
+    def deposit(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            self._successes.append(now)
+            self.successful_calls += 1
+
+    def try_withdraw(self) -> bool:
+        """
+        Try to spend the budget on a retry. Returns False and counts the
+        denied retry if the budget is exhausted.
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            allowed = self._ratio * len(self._successes) + self._reserve
+            if len(self._retries) + 1 > allowed:
+                self.denied_retries += 1
+                return False
+            self._retries.append(now)
+            self.retries += 1
+            return True
 
 
 class retry(SupportDecorator):
     def __init__(
         self,
-        max_retries: int,
-        exceptions: tuple,
+        max_retries: Optional[int] = None,
+        exceptions: tuple = (),
         delay: float = 0.0,
         backoff_factor: float = 1.0,
+        *,
+        policy: Optional[RetryPolicy] = None,
+        budget: Optional[RetryBudget] = None,
     ):
-        self._max_retries = max_retries
-        self._delay = delay
-        self._backoff_factor = backoff_factor
-        self._exceptions = exceptions
+        if policy is None:
+            if max_retries is None:
+                raise MisconfiguredException(
+                    "Either max_retries or policy must be specified"
+                )
+            policy = RetryPolicy(
+                max_retries=max_retries,
+                exceptions=exceptions,
+                delay=delay,
+                backoff_factor=backoff_factor,
+                methods=None,
+            )
+        elif max_retries is not None or exceptions:
+            raise MisconfiguredException(
+                "policy cannot be combined with max_retries or exceptions"
+            )
+        self._policy = policy
+        self._budget = budget
+
+    @property
+    def policy(self) -> RetryPolicy:
+        return self._policy
+
+    @property
+    def budget(self) -> Optional[RetryBudget]:
+        return self._budget
+
+    def _get_delay(
+        self, attempt: int, previous_delay: float, exc: BaseException
+    ) -> Optional[float]:
+        """
+        Get the delay before the next attempt from the policy. Returns None
+        if the policy, the deadline or the retry budget doesn't allow
+        to retry.
+        """
+        delay = self._policy.get_delay(attempt, previous_delay, exc)
+        if delay is None:
+            return None
+        remaining = remaining_time()
+        if remaining is not None and delay >= remaining:
+            # Don't start the sleep that would overrun the deadline
+            return None
+        if self._budget is None:
+            return delay
+        return delay if self._budget.try_withdraw() else None
+
+    def _on_success(self) -> None:
+        if self._budget is not None:
+            self._budget.deposit()
 
     async def _decorate_async(self, func: Callable, *args, **kwargs):
-        retries = 0
-        current_delay = self._delay
-        while retries <= self._max_retries:
+        attempt, delay = 0, self._policy.delay
+        while True:
             try:
-                return await func(*args, **kwargs)
-            except self._exceptions as e:
-                retries += 1
-                if retries > self._max_retries:
+                result = await func(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                attempt += 1
+                next_delay = self._get_delay(attempt, delay, e)
+                if next_delay is None:
                     raise e
-                await asyncio.sleep(current_delay)
-                current_delay *= self._backoff_factor
-        return None  # pragma: no cover
+                delay = next_delay
+                await asyncio.sleep(delay)
+            else:
+                self._on_success()
+                return result
 
     def _decorate_sync(self, func: Callable, *args, **kwargs):
-        retries = 0
-        current_delay = self._delay
-        while retries <= self._max_retries:
+        attempt, delay = 0, self._policy.delay
+        while True:
             try:
-                return func(*args, **kwargs)
-            except self._exceptions as e:
-                retries += 1
-                if retries > self._max_retries:
+                result = func(*args, **kwargs)
+            except Exception as e:  # pylint: disable=broad-exception-caught
+                attempt += 1
+                next_delay = self._get_delay(attempt, delay, e)
+                if next_delay is None:
                     raise e
-                time.sleep(current_delay)
-                current_delay *= self._backoff_factor
-        return None  # pragma: no cover
+                delay = next_delay
+                time.sleep(delay)
+            else:
+                self._on_success()
+                return result
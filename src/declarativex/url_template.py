@@ -0,0 +1,128 @@
+import functools
+from string import Formatter
+from typing import Any, List, Mapping, Optional, Tuple
+from urllib.parse import quote, urljoin
+
+import httpx
+
+# Characters allowed in a path segment (RFC 3986, pchar) and in a query
+# besides the unreserved ones, which are never quoted.
+_PATH_SAFE = "!$&'()*+,;=:@"
+_QUERY_SAFE = "!$'()*,;:@/?"
+
+
+def _encode(value: Any, format_spec: str, safe: str) -> str:
+    text = format(value, format_spec)
+    if text.isascii() and text.isalnum():
+        # Fast path for ids and slugs, nothing to quote
+        return text
+    return quote(text, safe=safe)
+
+
+class URLTemplate:
+    """
+    URL template compiled into literal parts and slots for the variables.
+    Values of the variables are percent-encoded as path segments (or query
+    values, if the slot is in the query string), so a value can't change
+    the structure of the URL. URLs without variables are parsed only once.
+
+    Parameters:
+        template: The URL template, e.g. "https://example.com/users/{id}".
+    """
+
+    __slots__ = (
+        "template",
+        "variables",
+        "has_query",
+        "_parts",
+        "_slots",
+        "_static",
+        "_url",
+        "_url_with_query",
+    )
+
+    def __init__(self, template: str):
+        self.template = template
+        self._parts: List[str] = []
+        self._slots: List[Tuple[int, str, str, str]] = []
+        self._url: Optional[httpx.URL] = None
+        self._url_with_query: Optional[Tuple[str, httpx.URL]] = None
+        in_query = False
+        for literal, field_name, format_spec, conversion in Formatter().parse(
+            template
+        ):
+            self._parts.append(literal)
+            in_query = in_query or "?" in literal
+            if field_name is None:
+                continue
+            if conversion:
+                format_spec = f"!{conversion}:{format_spec}"
+            self._slots.append(
+                (
+                    len(self._parts),
+                    field_name,
+                    format_spec or "",
+                    _QUERY_SAFE if in_query else _PATH_SAFE,
+                )
+            )
+            self._parts.append("")
+        self.variables = [slot[1] for slot in self._slots]
+        self.has_query = in_query
+        # Without variables the URL is constant, but escaped braces
+        # still have to be unescaped, so it isn't the template itself
+        self._static = "".join(self._parts)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Render the URL with the given values of the variables.
+        Raises KeyError if a value is missing.
+        """
+        if not self._slots:
+            return self._static
+        parts = self._parts.copy()
+        for index, name, format_spec, safe in self._slots:
+            if format_spec.startswith("!"):
+                # Conversions are rare, let the formatter handle them
+                parts[index] = quote(
+                    ("{" + format_spec + "}").format(values[name]), safe=safe
+                )
+            else:
+                parts[index] = _encode(values[name], format_spec, safe)
+        return "".join(parts)
+
+    def to_httpx_url(
+        self, values: Mapping[str, Any], query: str = ""
+    ) -> httpx.URL:
+        """
+        Render the URL with the encoded query string and parse it to
+        httpx.URL. The URL without variables is parsed once and reused,
+        the last one with the query string too.
+        """
+        if self._slots:
+            url = self.render(values)
+            return httpx.URL(f"{url}?{query}" if query else url)
+        if query:
+            cached = self._url_with_query
+            if cached is None or cached[0] != query:
+                cached = (query, httpx.URL(f"{self._static}?{query}"))
+                self._url_with_query = cached
+            return cached[1]
+        if self._url is None:
+            self._url = httpx.URL(self._static)
+        return self._url
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({self.template!r})"
+
+
+@functools.lru_cache(maxsize=1024)
+def compile_url_template(base_url: Optional[str], path: str) -> URLTemplate:
+    """
+    Join the base URL with the path and compile the result.
+    The templates are cached, so every endpoint is compiled once
+    per base URL.
+    """
+    return URLTemplate(urljoin(base_url or "", path))
+
+
+__all__ = ["URLTemplate", "compile_url_template"]
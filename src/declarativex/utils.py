@@ -1,12 +1,18 @@
 import abc
 import asyncio
+import functools
+import math
 import sys
+import time
 
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from functools import wraps
-from typing import TypeVar, Callable, Union, Any, Dict
+from typing import TypeVar, Callable, Union, Any, Dict, Optional, cast
 
 from httpx import URL, Proxy
 
+from .context import DeadlineParameter
 from .exceptions import MisconfiguredException
 from .warnings import warn_support_decorator_ignored
 
@@ -20,9 +26,15 @@ else:
 ReturnType = TypeVar("ReturnType")
 SUPPORTED_METHODS = {"GET", "POST", "PUT", "PATCH", "DELETE"}
 DECLARED_MARK = "_declarativex_declared"
+# Attributes of the declared functions: the function that prepares
+# the request, and the chain of support decorators that sends it
+PREPARE_ATTRIBUTE = "_declarativex_prepare"
+SEND_PREPARED_ATTRIBUTE = "_declarativex_send_prepared"
 ProxiesType = Union[
     Dict[Union[URL, str], Union[URL, Proxy, str, None]], str, None, URL, Proxy
 ]
+# Reset values bigger than this are treated as unix timestamps (~2001 year)
+_UNIX_TIMESTAMP_THRESHOLD = 1_000_000_000
 
 
 class Decorator(abc.ABC):
@@ -51,13 +63,6 @@ class Decorator(abc.ABC):
                 subclasses.extend(sub.get_all_subclasses())
         return subclasses
 
-    @classmethod
-    def _subclasses_marks(cls):
-        return {
-            cls.MARK_TEMPLATE.format(cls_name=sub.__name__)
-            for sub in cls.get_all_subclasses()
-        }
-
     @property
     def mark(self) -> str:
         return self.MARK_TEMPLATE.format(cls_name=self.__class__.__name__)
@@ -66,34 +71,53 @@ class Decorator(abc.ABC):
         self, func: Callable[DecoratorArgs, ReturnType]
     ) -> Callable[DecoratorArgs, ReturnType]:
         self._check_already_decorated(func)
+        # The deadline should be started by the outermost decorator,
+        # so retries and rate limiter waits are counted too.
+        deadline_parameter = DeadlineParameter.find(func)
 
         if asyncio.iscoroutinefunction(func):
 
             @wraps(func)
             async def inner(*args, **kwargs):
+                if deadline_parameter:
+                    with deadline_parameter.scope(args, kwargs):
+                        return await self._decorate_async(
+                            func, *args, **kwargs
+                        )
                 return await self._decorate_async(func, *args, **kwargs)
 
         else:
 
             @wraps(func)
             def inner(*args, **kwargs):
+                if deadline_parameter:
+                    with deadline_parameter.scope(args, kwargs):
+                        return self._decorate_sync(func, *args, **kwargs)
                 return self._decorate_sync(func, *args, **kwargs)
 
         setattr(inner, self.mark, True)
-        return inner
+        # Common mark of all decorators, so declared functions are found
+        # without walking the subclasses of Decorator
+        setattr(inner, DECLARED_MARK, True)
+        return cast(Callable[DecoratorArgs, ReturnType], inner)
 
 
 class SupportDecorator(Decorator, abc.ABC):
     @staticmethod
     def _check_declared(obj: Any):
-        return any(
-            hasattr(obj, mark) for mark in Decorator._subclasses_marks()
-        )
+        return hasattr(obj, DECLARED_MARK)
 
     def _decorate_class(self, cls: type) -> type:
         self._check_already_decorated(cls)
-        for attr_name, attr_value in cls.__dict__.items():
-            if self._check_declared(attr_value):
+        for attr_name, attr_value in list(cls.__dict__.items()):
+            if isinstance(attr_value, DeclaredMethod):
+                # Endpoints of the clients are wrapped in the descriptor
+                setattr(
+                    cls,
+                    attr_name,
+                    DeclaredMethod(self(attr_value.__func__)),
+                )
+            elif self._check_declared(attr_value):
                 setattr(cls, attr_name, self(attr_value))
         return cls
 
@@ -105,7 +129,121 @@ class SupportDecorator(Decorator, abc.ABC):
         if not self._check_declared(func_or_cls):
             warn_support_decorator_ignored(self.__class__.__name__)
             return func_or_cls
-        return super().__call__(func_or_cls)
+        inner = super().__call__(func_or_cls)
+        send = getattr(func_or_cls, SEND_PREPARED_ATTRIBUTE, None)
+        if send is not None:
+            # Prepared requests of the endpoint are sent through
+            # the support decorators too
+            setattr(inner, SEND_PREPARED_ATTRIBUTE, self._decorate_send(send))
+        return inner
+
+    def _decorate_send(self, send: Callable) -> Callable:
+        if asyncio.iscoroutinefunction(send):
+
+            async def send_async(prepared):
+                return await self._decorate_async(send, prepared)
+
+            return send_async
+
+        def send_sync(prepared):
+            return self._decorate_sync(send, prepared)
+
+        return send_sync
+
+
+class BoundEndpoint(functools.partial):
+    # The declared endpoint bound to the client, like a method, so the
+    # request can be prepared with `client.endpoint.prepare(...)`.
+    # The other attributes are read from the function.
+
+    __slots__ = ()
+    __doc__ = property(  # type: ignore[assignment]
+        lambda self: self.func.__doc__
+    )
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.func, name)
+
+    def prepare(self, *args, **kwargs) -> Any:
+        """Prepare the request of the endpoint with the arguments."""
+        return prepare_endpoint(self.func, *self.args, *args, **kwargs)
+
+
+class DeclaredMethod:
+    """
+    Descriptor of the endpoint declared in the client class. The endpoint
+    is bound to the instance on access, like a method, and the class
+    access returns the declared function itself.
+    """
+
+    __slots__ = ("__func__",)
+
+    def __init__(self, func: Callable):
+        self.__func__ = func
+
+    def __get__(self, instance: Any, owner: Optional[type] = None) -> Any:
+        if instance is None:
+            return self.__func__
+        return BoundEndpoint(self.__func__, instance)
+
+
+def prepare_endpoint(endpoint: Callable, *args, **kwargs) -> Any:
+    """
+    Prepare the request of the declared function with the arguments,
+    the prepared request is sent through its support decorators.
+    """
+    prepare_func = getattr(endpoint, PREPARE_ATTRIBUTE, None)
+    if prepare_func is None:
+        raise MisconfiguredException(
+            f"{endpoint!r} is not declared with @http or @gql"
+        )
+    return prepare_func(
+        getattr(endpoint, SEND_PREPARED_ATTRIBUTE), *args, **kwargs
+    )
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the Retry-After header value. It can be either a number of
+    seconds or an HTTP-date. Returns the number of seconds to wait or None
+    if the value is missing or malformed, e.g. "nan" or "inf".
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        pass
+    else:
+        return max(seconds, 0.0) if math.isfinite(seconds) else None
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def parse_rate_limit_reset(value: Optional[str]) -> Optional[float]:
+    """
+    Parse the X-RateLimit-Reset header value. Upstreams send either the
+    number of seconds until the window resets or a unix timestamp of the
+    reset moment. Returns the number of seconds until the reset or None
+    if the value is missing or malformed, e.g. "nan" or "inf".
+    """
+    if not value:
+        return None
+    try:
+        reset = float(value)
+    except ValueError:
+        return None
+    if not math.isfinite(reset):
+        return None
+    if reset > _UNIX_TIMESTAMP_THRESHOLD:
+        # Looks like a unix timestamp, not a number of seconds
+        reset -= time.time()
+    return max(reset, 0.0)
 
 
 def merge_proxies(
@@ -1,43 +1,53 @@
-from typing import get_origin, Union, Type, get_args, TypeVar
+import functools
+from typing import Any, Callable, get_origin, Union, get_args, TypeVar
 
 from .exceptions import DependencyValidationError
 
 T = TypeVar("T")
+Validator = Callable[[Any], Any]
 
 
-def _validate_type_hint(type_hint: Type, value: T) -> T:
+def compile_validator(type_hint: Any) -> Validator:
     """
-    Validate the value against the type hint.
+    Compile the validator of the type hint. The origin and the arguments
+    of the type hint are resolved once, so the validator only checks
+    the value. Validators are cached per type hint.
     :param type_hint: The type hint.
-    :param value: The value to validate.
-    :return: The value if it is valid.
+    :return: The function that returns the value if it is valid.
     """
+    try:
+        return _compile_validator(type_hint)
+    except TypeError:  # pragma: no cover
+        # Unhashable type hints are not cached
+        return _compile_validator.__wrapped__(type_hint)
+
+
+@functools.lru_cache(maxsize=1024)
+def _compile_validator(type_hint: Any) -> Validator:
     if get_origin(type_hint) is Union:
         # To check union type hints we need to obtain the Union args.
-        return _validate_union_type_hint(type_hint, value)
-    if not isinstance(value, type_hint):  # type: ignore[arg-type]
-        # If the value is not an instance of the type hint, we raise a
-        # DependencyValidationError.
-        raise DependencyValidationError(
-            expected_type=type_hint,  # type: ignore[arg-type]
-            received_type=type(value),
-        )
-    # If the value is valid, we return it.
-    return value
-
-
-def _validate_union_type_hint(type_hint: Type, value: T) -> T:
-    """
-    Validate the value against a union type hint.
-    :param type_hint: The union type hint.
-    :param value: The value to validate.
-    :return: The value if it is valid.
-    """
-    args = get_args(type_hint)
-    # Checking if the value is an instance of the union args.
-    if not any(isinstance(value, arg) for arg in args):
-        raise DependencyValidationError(
-            expected_type=args, received_type=type(value)
-        )
-    # If the value is valid, we return it.
-    return value
+        args = get_args(type_hint)
+
+        def validate_union(value: T) -> T:
+            # Checking if the value is an instance of the union args,
+            # isinstance stops at the first matching arg like any() does.
+            if not isinstance(value, args):
+                raise DependencyValidationError(
+                    expected_type=args, received_type=type(value)
+                )
+            return value
+
+        return validate_union
+
+    def validate(value: T) -> T:
+        if not isinstance(value, type_hint):  # type: ignore[arg-type]
+            # If the value is not an instance of the type hint, we raise a
+            # DependencyValidationError.
+            raise DependencyValidationError(
+                expected_type=type_hint,  # type: ignore[arg-type]
+                received_type=type(value),
+            )
+        # If the value is valid, we return it.
+        return value
+
+    return validate
@@ -10,6 +10,12 @@ class DeclarativeWarning(Warning):
     SUPPORT_DECORATOR_IGNORED = (
         "{d} decorator is ignored because not applied to endpoint declaration."
     )
+    CODEC_UNAVAILABLE = (
+        "{c} is not installed, the standard json module is used instead."
+    )
+    BINARY_CODEC_UNAVAILABLE = (
+        "{c} codec is not installed, JSON is used instead."
+    )
 
 
 def warn_list_return_type(type_hint: Type) -> None:
@@ -31,3 +37,17 @@ def warn_support_decorator_ignored(decorator_class: str):
         DeclarativeWarning.SUPPORT_DECORATOR_IGNORED.format(d=decorator_class),
         category=DeclarativeWarning,
     )
+
+
+def warn_codec_unavailable(codec_name: str):
+    warnings.warn(
+        DeclarativeWarning.CODEC_UNAVAILABLE.format(c=codec_name),
+        category=DeclarativeWarning,
+    )
+
+
+def warn_binary_codec_unavailable(codec_name: str):
+    warnings.warn(
+        DeclarativeWarning.BINARY_CODEC_UNAVAILABLE.format(c=codec_name),
+        category=DeclarativeWarning,
+    )
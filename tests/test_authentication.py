@@ -1,9 +1,13 @@
+import itertools
 from typing import List, Coroutine, Callable
 
+import httpx
 import pytest
+from pytest_mock import MockerFixture
 
 from declarativex import BaseClient, http, Middleware
 from declarativex.auth import (
+    Auth,
     BasicAuth,
     BearerAuth,
     HeaderAuth,
@@ -102,3 +106,50 @@ client = Client()
 @pytest.mark.asyncio
 async def test_auth(coro: Callable[..., Coroutine]):
     await coro()
+
+
+def test_static_auth_encoded_once(mocker: MockerFixture):
+    class Rotating(Auth):
+        location = Location.headers
+        key = "X-Token"
+
+        def __init__(self):
+            self.tokens = itertools.count()
+
+        def apply_auth(self, request: RawRequest) -> RawRequest:
+            request.headers[self.key] = str(next(self.tokens))
+            return request
+
+    class StaticClient(BaseClient):
+        base_url = "https://example.com/"
+        default_headers = {"Accept": "application/json"}
+
+        @http("GET", "/posts", auth=QueryParamsAuth("api_token", "t 1"))
+        def get_posts(self, page: int = 1) -> httpx.Response:
+            ...
+
+        @http("GET", "/posts", auth=Rotating())
+        def get_posts_rotating(self) -> httpx.Response:
+            ...
+
+    assert QueryParamsAuth("api_token", "t 1").is_static
+    assert not Rotating().is_static
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, request=request
+        ),
+    )
+    static_client = StaticClient()
+    for page in (1, 2):
+        request = static_client.get_posts(page=page).request
+        assert str(request.url) == (
+            f"https://example.com/posts?api_token=t%201&page={page}"
+        )
+        assert request.headers["Accept"] == "application/json"
+
+    tokens = [
+        static_client.get_posts_rotating().request.headers["X-Token"]
+        for _ in range(2)
+    ]
+    assert tokens == ["0", "1"]
@@ -0,0 +1,232 @@
+import dataclasses
+from typing import Annotated, List
+
+import httpx
+import pydantic
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    HTTPException,
+    Json,
+    MisconfiguredException,
+    UnprocessableEntityException,
+    http,
+)
+from declarativex import codecs
+from declarativex.codecs import CBORCodec, MsgpackCodec, get_binary_codec
+from declarativex.warnings import DeclarativeWarning
+
+msgpack = pytest.importorskip("msgpack")
+
+
+class User(pydantic.BaseModel):
+    id: int
+    name: str
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: float
+
+
+class Client(BaseClient):
+    base_url = "https://example.com"
+    binary_codec = "msgpack"
+
+    @http("POST", "/users")
+    def create_user(self, user: Annotated[dict, Json()]) -> User:
+        ...
+
+    @http("GET", "/users")
+    def get_users(self) -> List[User]:
+        ...
+
+    @http("GET", "/users", response_path="data")
+    def get_users_data(self) -> List[User]:
+        ...
+
+    @http("GET", "/points")
+    def get_points(self) -> List[Point]:
+        ...
+
+
+def _respond(mocker: MockerFixture, content: bytes, content_type: str):
+    return mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200,
+            content=content,
+            headers={"Content-Type": content_type},
+            request=request,
+        ),
+    )
+
+
+def test_request_body_and_accept(mocker: MockerFixture):
+    assert isinstance(get_binary_codec("msgpack"), MsgpackCodec)
+    send = _respond(
+        mocker,
+        msgpack.packb({"id": 1, "name": "John"}),
+        "application/msgpack",
+    )
+    user = Client().create_user(user={"id": 1, "name": "John"})
+    assert user == User(id=1, name="John")
+    request = send.call_args.args[0]
+    # Only the response is negotiated by default
+    assert request.content == b'{"id": 1, "name": "John"}'
+    assert request.headers["Content-Type"] == "application/json"
+    assert request.headers["Accept"] == (
+        "application/msgpack, application/json;q=0.9"
+    )
+
+
+def test_binary_request_body(mocker: MockerFixture):
+    send = _respond(
+        mocker,
+        msgpack.packb({"id": 1, "name": "John"}),
+        "application/msgpack",
+    )
+    client = Client(binary_requests=True)
+    assert client.create_user(user={"id": 1, "name": "John"}) == User(
+        id=1, name="John"
+    )
+    request = send.call_args.args[0]
+    assert msgpack.unpackb(request.content) == {"id": 1, "name": "John"}
+    assert request.headers["Content-Type"] == "application/msgpack"
+
+    @http(
+        "POST",
+        "/users",
+        base_url="https://example.com",
+        binary_codec="msgpack",
+        binary_requests=True,
+    )
+    def create_user(user: Annotated[dict, Json()]) -> User:
+        ...
+
+    create_user(user={"id": 1, "name": "John"})
+    request = send.call_args.args[0]
+    assert request.headers["Content-Type"] == "application/msgpack"
+
+
+@pytest.mark.parametrize(
+    "content_type",
+    [
+        "application/msgpack",
+        "application/x-msgpack",
+        "application/vnd.msgpack; charset=binary",
+    ],
+)
+def test_msgpack_response(mocker: MockerFixture, content_type: str):
+    _respond(
+        mocker, msgpack.packb([{"id": 1, "name": "John"}]), content_type
+    )
+    assert Client().get_users() == [User(id=1, name="John")]
+
+
+def test_json_response_with_binary_codec(mocker: MockerFixture):
+    _respond(mocker, b'[{"id": 1, "name": "John"}]', "application/json")
+    assert Client().get_users() == [User(id=1, name="John")]
+
+
+def test_msgpack_response_path_and_dataclasses(mocker: MockerFixture):
+    _respond(
+        mocker,
+        msgpack.packb({"data": [{"id": 1, "name": "John"}], "total": 1}),
+        "application/msgpack",
+    )
+    assert Client().get_users_data() == [User(id=1, name="John")]
+    _respond(
+        mocker, msgpack.packb([{"x": 1, "y": 2.5}]), "application/msgpack"
+    )
+    assert Client().get_points() == [Point(x=1, y=2.5)]
+
+
+def test_msgpack_response_missing_path(mocker: MockerFixture):
+    _respond(mocker, msgpack.packb({"total": 0}), "application/msgpack")
+    with pytest.raises(UnprocessableEntityException, match="'data'"):
+        Client().get_users_data()
+
+
+def test_msgpack_error_response(mocker: MockerFixture):
+    class Error(pydantic.BaseModel):
+        detail: str
+
+    @http(
+        "GET",
+        "/users",
+        base_url="https://example.com",
+        binary_codec="msgpack",
+        error_mappings={404: Error},
+    )
+    def get_users() -> List[User]:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            404,
+            content=msgpack.packb({"detail": "Not found"}),
+            headers={"Content-Type": "application/msgpack"},
+            request=request,
+        ),
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        get_users()
+    assert exc_info.value.response == Error(detail="Not found")
+
+
+def test_cbor_response_without_configuration(mocker: MockerFixture):
+    cbor2 = pytest.importorskip("cbor2")
+    _respond(
+        mocker,
+        cbor2.dumps([{"id": 1, "name": "John"}]),
+        "application/cbor",
+    )
+    # The client negotiates msgpack, CBOR is decoded by its Content-Type
+    assert Client().get_users() == [User(id=1, name="John")]
+    assert isinstance(get_binary_codec("cbor"), CBORCodec)
+
+
+def test_invalid_msgpack_response(mocker: MockerFixture):
+    _respond(mocker, b"\xc1", "application/msgpack")
+    with pytest.raises(UnprocessableEntityException):
+        Client().get_users()
+
+
+def test_unknown_binary_codec():
+    with pytest.raises(MisconfiguredException, match="Unknown binary_codec"):
+        http("GET", "/", binary_codec="yaml")
+
+
+def test_missing_binary_codec_falls_back_to_json(monkeypatch):
+    monkeypatch.setattr(codecs, "_installed", lambda cls: False)
+    codecs._binary_codec_by_name.cache_clear()
+    try:
+        with pytest.warns(DeclarativeWarning, match="msgpack codec is not"):
+            assert get_binary_codec("msgpack") is None
+    finally:
+        codecs._binary_codec_by_name.cache_clear()
+
+
+def test_msgpack_response_as_msgspec_struct(mocker: MockerFixture):
+    msgspec = pytest.importorskip("msgspec")
+
+    class Item(msgspec.Struct):
+        id: int
+        name: str
+
+    class ItemsClient(BaseClient):
+        base_url = "https://example.com"
+
+        @http("GET", "/items")
+        def get_items(self) -> List[Item]:
+            ...
+
+    _respond(
+        mocker, msgpack.packb([{"id": 1, "name": "a"}]), "application/msgpack"
+    )
+    assert ItemsClient().get_items() == [Item(id=1, name="a")]
@@ -0,0 +1,195 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    CircuitOpenException,
+    DeadlineExceeded,
+    HTTPException,
+    MisconfiguredException,
+    TimeoutException,
+    circuit_breaker,
+    http,
+)
+from declarativex.circuit_breaker import Circuit, CircuitState
+
+
+def _response(status_code: int):
+    return httpx.Response(
+        status_code,
+        json={},
+        request=httpx.Request("GET", "https://reqres.in/api/users"),
+    )
+
+
+def test_circuit_breaker_opens_and_recovers(mocker: MockerFixture):
+    breaker = circuit_breaker(
+        failure_rate_threshold=0.5, minimum_calls=4, recovery_timeout=0.2
+    )
+
+    @breaker
+    class BreakerClient(BaseClient):
+        base_url = "https://reqres.in/"
+
+        @http("GET", "/api/users")
+        def get_users(self) -> dict:
+            ...
+
+        @http("GET", "/api/users/{user_id}")
+        def get_user(self, user_id: int) -> dict:
+            ...
+
+    client = BreakerClient()
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=[_response(200), _response(404)]
+        + [_response(503)] * 2,
+    )
+    client.get_users()
+    with pytest.raises(HTTPException):
+        client.get_user(1)
+    assert breaker.state is CircuitState.closed
+    for _ in range(2):
+        with pytest.raises(HTTPException):
+            client.get_users()
+    assert breaker.state is CircuitState.open
+
+    # The circuit is shared by all endpoints of the client
+    with pytest.raises(CircuitOpenException):
+        client.get_user(1)
+    assert send.call_count == 4
+
+    time.sleep(0.25)
+    assert breaker.state is CircuitState.half_open
+    send.side_effect = [_response(200)]
+    assert client.get_users() == {}
+    assert breaker.state is CircuitState.closed
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_half_open_failure(mocker: MockerFixture):
+    breaker = circuit_breaker(minimum_calls=1, recovery_timeout=0.1)
+
+    @breaker
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    async def get_users() -> dict:
+        ...
+
+    request = httpx.Request("GET", "https://reqres.in/api/users")
+    send = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        side_effect=TimeoutException(0.1, request),
+    )
+    with pytest.raises(TimeoutException):
+        await get_users()
+    with pytest.raises(CircuitOpenException) as exc:
+        await get_users()
+    assert 0 < exc.value.retry_after <= 0.1
+
+    time.sleep(0.15)
+    with pytest.raises(TimeoutException):
+        await get_users()
+    assert breaker.state is CircuitState.open
+    assert send.call_count == 2
+
+    breaker.reset()
+    assert breaker.state is CircuitState.closed
+
+
+@pytest.mark.asyncio
+async def test_circuit_breaker_cancelled_probe(mocker: MockerFixture):
+    breaker = circuit_breaker(minimum_calls=1, recovery_timeout=0.1)
+
+    @breaker
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    async def get_users() -> dict:
+        ...
+
+    send = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        side_effect=[_response(503), asyncio.CancelledError()],
+    )
+    with pytest.raises(HTTPException):
+        await get_users()
+    time.sleep(0.15)
+    # The cancelled probe is not recorded as a success or a failure
+    with pytest.raises(asyncio.CancelledError):
+        await get_users()
+    assert breaker.state is CircuitState.half_open
+
+    send.side_effect = [_response(200)]
+    assert await get_users() == {}
+    assert breaker.state is CircuitState.closed
+
+
+def test_circuit_ignores_calls_started_before_transition():
+    circuit = Circuit(
+        failure_rate_threshold=0.5,
+        slow_call_rate_threshold=1.0,
+        slow_call_duration=None,
+        window=60,
+        minimum_calls=1,
+        recovery_timeout=0.05,
+        half_open_max_calls=1,
+    )
+    before_open = circuit.acquire()
+    circuit.record(circuit.acquire(), failed=True)
+    assert circuit.state is CircuitState.open
+    time.sleep(0.1)
+    assert circuit.state is CircuitState.half_open
+    # The call started before the circuit opened completes now
+    circuit.record(before_open, failed=False)
+    assert circuit.state is CircuitState.half_open
+    circuit.record(circuit.acquire(), failed=False)
+    assert circuit.state is CircuitState.closed
+
+
+def test_circuit_breaker_deadline_not_failure(mocker: MockerFixture):
+    breaker = circuit_breaker(minimum_calls=1)
+
+    @breaker
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=DeadlineExceeded(),
+    )
+    with pytest.raises(DeadlineExceeded):
+        get_users()
+    assert breaker.state is CircuitState.closed
+
+
+def test_circuit_breaker_slow_calls(mocker: MockerFixture):
+    breaker = circuit_breaker(
+        slow_call_rate_threshold=0.5, slow_call_duration=0.05, minimum_calls=2
+    )
+
+    @breaker
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    def slow_send(*args, **kwargs):
+        time.sleep(0.1)
+        return _response(200)
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=slow_send
+    )
+    get_users()
+    assert breaker.state is CircuitState.closed
+    get_users()
+    assert breaker.state is CircuitState.open
+
+
+def test_circuit_breaker_misconfiguration():
+    with pytest.raises(MisconfiguredException):
+        circuit_breaker(failure_rate_threshold=0)
+    with pytest.raises(MisconfiguredException):
+        circuit_breaker(half_open_max_calls=0)
@@ -0,0 +1,127 @@
+import json
+from typing import Annotated, Any, Dict, List, Union
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    JSONCodec,
+    Json,
+    MisconfiguredException,
+    http,
+)
+from declarativex import codecs
+from declarativex.codecs import OrjsonCodec, StdlibJSONCodec, get_json_codec
+from declarativex.warnings import DeclarativeWarning
+
+
+class RecordingCodec(JSONCodec):
+    name = "recording"
+
+    def __init__(self):
+        self.dumped: List[Any] = []
+        self.loaded: List[Union[bytes, str]] = []
+
+    def dumps(self, obj: Any) -> bytes:
+        self.dumped.append(obj)
+        return json.dumps(obj, separators=(",", ":")).encode()
+
+    def loads(self, data: Union[bytes, str]) -> Any:
+        self.loaded.append(data)
+        return json.loads(data)
+
+
+def _echo(request: httpx.Request, **kwargs) -> httpx.Response:
+    return httpx.Response(
+        200,
+        content=request.content,
+        headers={"Content-Type": "application/json"},
+        request=request,
+    )
+
+
+def test_default_codec_is_stdlib():
+    assert isinstance(get_json_codec(None), StdlibJSONCodec)
+    assert isinstance(get_json_codec("json"), StdlibJSONCodec)
+
+
+def test_orjson_codec():
+    pytest.importorskip("orjson")
+    codec = get_json_codec("orjson")
+    assert isinstance(codec, OrjsonCodec)
+    assert codec.loads(codec.dumps({"a": [1, 2], 1: None})) == {
+        "a": [1, 2],
+        "1": None,
+    }
+    with pytest.raises(json.JSONDecodeError):
+        codec.loads(b"{")
+
+
+def test_auto_codec_is_installed_one():
+    codec = get_json_codec("auto")
+    assert codec.module is None or codec.name != "json"
+
+
+def test_missing_codec_falls_back_to_stdlib(monkeypatch):
+    monkeypatch.setattr(codecs, "_installed", lambda cls: cls.module is None)
+    codecs._codec_by_name.cache_clear()
+    try:
+        with pytest.warns(DeclarativeWarning, match="msgspec is not"):
+            codec = get_json_codec("msgspec")
+        assert isinstance(codec, StdlibJSONCodec)
+        assert isinstance(get_json_codec("auto"), StdlibJSONCodec)
+    finally:
+        codecs._codec_by_name.cache_clear()
+
+
+def test_unknown_codec():
+    with pytest.raises(MisconfiguredException, match="Unknown json_codec"):
+        http("GET", "/", json_codec="yaml")
+    with pytest.raises(MisconfiguredException, match="Unknown json_codec"):
+
+        class Client(BaseClient):
+            base_url = "https://example.com"
+
+        Client(json_codec="yaml")
+
+
+def test_client_codec_encodes_and_decodes(mocker: MockerFixture):
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_echo
+    )
+    codec = RecordingCodec()
+
+    class Client(BaseClient):
+        base_url = "https://example.com"
+        json_codec = codec
+
+        @http("POST", "/echo")
+        def echo(self, body: Annotated[dict, Json()]) -> dict:
+            ...
+
+    assert Client().echo(body={"name": "John"}) == {"name": "John"}
+    request = send.call_args.args[0]
+    assert request.content == b'{"name":"John"}'
+    assert request.headers["Content-Type"] == "application/json"
+    assert codec.dumped == [{"name": "John"}]
+    assert codec.loaded == [b'{"name":"John"}']
+
+
+def test_declaration_codec_overrides_client(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_echo
+    )
+    codec = RecordingCodec()
+
+    class Client(BaseClient):
+        base_url = "https://example.com"
+        json_codec = "json"
+
+        @http("POST", "/echo", json_codec=codec)
+        def echo(self, body: Annotated[dict, Json()]) -> Dict[str, Any]:
+            ...
+
+    assert Client().echo(body={"items": [1]}) == {"items": [1]}
+    assert codec.loaded == [b'{"items":[1]}']
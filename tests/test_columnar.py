@@ -0,0 +1,197 @@
+import dataclasses
+import datetime
+import json
+from typing import Annotated, List, Optional
+
+import httpx
+import pydantic
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    Columns,
+    UnprocessableEntityException,
+    http,
+)
+from declarativex.columnar import (
+    decode_columns,
+    decode_columns_json,
+    field_dtype,
+)
+from declarativex.exceptions import MisconfiguredException
+
+numpy = pytest.importorskip("numpy")
+
+
+class Record(pydantic.BaseModel):
+    id: int
+    score: float
+    active: bool
+    name: str
+    created_at: datetime.datetime
+    rating: Optional[int] = None
+    tags: List[str] = []
+
+
+@dataclasses.dataclass
+class Point:
+    x: Annotated[int, numpy.int32]
+    y: float = 0.0
+
+
+class Client(BaseClient):
+    base_url = "https://example.com"
+
+    @http("GET", "/records")
+    def get_records(self) -> Columns[Record]:
+        ...
+
+    @http("GET", "/records", response_path="data")
+    def get_points(self) -> Columns[Point]:
+        ...
+
+
+@pytest.mark.parametrize(
+    "annotation,dtype",
+    [
+        (int, "int64"),
+        (float, "float64"),
+        (bool, "bool"),
+        (str, "object"),
+        (datetime.date, "datetime64[D]"),
+        (Optional[int], "float64"),
+        (Optional[bool], "object"),
+        (List[int], "object"),
+        (Annotated[int, numpy.int16], numpy.int16),
+    ],
+)
+def test_field_dtype(annotation, dtype):
+    assert field_dtype(annotation) == dtype
+
+
+def test_columns_response(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200,
+            json=[
+                {
+                    "id": 1,
+                    "score": 0.5,
+                    "active": True,
+                    "name": "first",
+                    "created_at": "2024-01-01T02:00:00+02:00",
+                    "rating": 5,
+                    "tags": ["a"],
+                },
+                {
+                    "id": 2,
+                    "score": 1,
+                    "active": False,
+                    "name": "second",
+                    "created_at": "2024-01-02T00:00:00",
+                    "rating": None,
+                },
+            ],
+            request=request,
+        ),
+    )
+    columns = Client().get_records()
+    assert isinstance(columns, Columns)
+    assert list(columns) == [
+        "id",
+        "score",
+        "active",
+        "name",
+        "created_at",
+        "rating",
+        "tags",
+    ]
+    assert columns["id"].dtype == numpy.int64
+    assert columns["id"].tolist() == [1, 2]
+    assert columns["score"].tolist() == [0.5, 1.0]
+    assert columns["active"].tolist() == [True, False]
+    assert columns["name"].tolist() == ["first", "second"]
+    assert columns["created_at"].tolist() == [
+        datetime.datetime(2024, 1, 1),
+        datetime.datetime(2024, 1, 2),
+    ]
+    assert columns["rating"][0] == 5
+    assert numpy.isnan(columns["rating"][1])
+    assert columns["tags"].tolist() == [["a"], []]
+
+
+def test_columns_response_path(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200,
+            json={"data": [{"x": 1, "y": 2.5}, {"x": 3}]},
+            request=request,
+        ),
+    )
+    columns = Client().get_points()
+    assert columns["x"].dtype == numpy.int32
+    assert columns["x"].tolist() == [1, 3]
+    assert columns["y"].tolist() == [2.5, 0.0]
+
+
+def test_columns_missing_required_field():
+    with pytest.raises(ValueError, match="missing field 'x'"):
+        decode_columns(Columns[Point], [{"x": 1}, {"y": 2.0}])
+
+
+def test_columns_not_array_of_objects():
+    with pytest.raises(ValueError, match="array of objects"):
+        decode_columns(Columns[Point], {"x": 1})
+
+
+def test_columns_of_unsupported_type():
+    with pytest.raises(MisconfiguredException, match="pydantic model"):
+        decode_columns(Columns[int], [])
+
+
+def test_columns_json_without_intermediate_dicts():
+    pytest.importorskip("msgspec")
+    content = b'[{"x": 1, "y": 2.5}, {"x": 3}]'
+    columns = decode_columns_json(Columns[Point], content, json.loads)
+    expected = decode_columns(Columns[Point], json.loads(content))
+    assert columns.keys() == expected.keys()
+    for name, array in columns.items():
+        assert array.tolist() == expected[name].tolist()
+    with pytest.raises(ValueError, match="`x`"):
+        decode_columns_json(Columns[Point], b'[{"y": 2.0}]', json.loads)
+
+
+@pytest.mark.parametrize(
+    "data,reason",
+    [
+        ({"data": [{"x": 1}, {"y": 2.0}]}, "missing field 'x'"),
+        ({"data": [{"x": 1}, "invalid"]}, "array of objects"),
+        ({"data": [{"x": "invalid"}]}, "invalid values of field 'x'"),
+        ({"data": [{"x": 2**40}]}, "invalid values of field 'x'"),
+    ],
+)
+def test_columns_malformed_records(
+    mocker: MockerFixture, data: dict, reason: str
+):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, json=data, request=request
+        ),
+    )
+    with pytest.raises(UnprocessableEntityException, match=reason):
+        Client().get_points()
+
+
+def test_columns_json_malformed_records(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, json=[{"id": 1}], request=request
+        ),
+    )
+    with pytest.raises(UnprocessableEntityException):
+        Client().get_records()
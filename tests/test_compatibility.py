@@ -1,6 +1,7 @@
 import dataclasses
 import importlib
-from typing import Any, Union
+from json import JSONDecodeError
+from typing import Any, List, Union
 from unittest import mock
 
 import pytest
@@ -92,6 +93,23 @@ def test_parse_obj_as_version_2() -> None:
     assert isinstance(result, Data)
 
 
+@pytest.mark.usefixtures("pydantic_version_2")
+def test_parse_json_as_version_2() -> None:
+    compatibility = src.declarativex.compatibility
+
+    @dataclasses.dataclass
+    class Data:
+        test: str
+
+    result = compatibility.parse_json_as(List[Data], b'[{"test": "data"}]')
+    assert result == [Data(test="data")]
+    assert compatibility.get_type_adapter(List[Data]) is (
+        compatibility.get_type_adapter(List[Data])
+    )
+    with pytest.raises(JSONDecodeError):
+        compatibility.parse_json_as(Data, b"not a json")
+
+
 @pytest.mark.usefixtures("pydantic_mock", "pydantic_version_1")
 def test_parse_obj_for_version_1() -> None:
     result = src.declarativex.compatibility.parse_obj(
@@ -126,3 +144,17 @@ def test_parse_obj_as_version_1() -> None:
         Data, {"test": "data"}
     )
     assert isinstance(result, Data)
+
+
+@pytest.mark.usefixtures("pydantic_version_1")
+def test_parse_json_as_version_1() -> None:
+    @dataclasses.dataclass
+    class Data:
+        test: str
+
+    result = src.declarativex.compatibility.parse_json_as(
+        List[Data], b'[{"test": "data"}]'
+    )
+    assert result == [Data(test="data")]
+    with pytest.raises(JSONDecodeError):
+        src.declarativex.compatibility.parse_json_as(Data, b"not a json")
@@ -0,0 +1,111 @@
+import asyncio
+import time
+from typing import Annotated
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    Deadline,
+    DeadlineExceeded,
+    MisconfiguredException,
+    TimeoutException,
+    deadline,
+    http,
+    rate_limiter,
+    remaining_time,
+    retry,
+)
+
+
+def _response(status_code: int = 200):
+    return httpx.Response(
+        status_code,
+        json={},
+        request=httpx.Request("GET", "https://reqres.in/api/users"),
+    )
+
+
+def test_deadline_context():
+    assert remaining_time() is None
+    with deadline(1):
+        assert 0.9 < remaining_time() <= 1
+        with deadline(5):
+            # Nested deadline can't extend the outer one
+            assert remaining_time() <= 1
+        with deadline(at=time.monotonic() + 0.5):
+            assert remaining_time() <= 0.5
+    assert remaining_time() is None
+    with pytest.raises(MisconfiguredException):
+        with deadline():
+            pass
+
+
+def test_deadline_stops_retries(mocker: MockerFixture):
+    @retry(max_retries=10, exceptions=(TimeoutException,), delay=0.3)
+    @http("GET", "/api/users", base_url="https://reqres.in/", timeout=10)
+    def get_users(budget: Annotated[float, Deadline()] = 0.5) -> dict:
+        ...
+
+    def slow_send(*args, **kwargs):
+        time.sleep(2)
+        return _response()
+
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=slow_send
+    )
+    start = time.perf_counter()
+    with pytest.raises(DeadlineExceeded):
+        get_users(budget=0.2)
+    # The caller doesn't wait for the send to finish
+    assert time.perf_counter() - start < 0.3
+    assert send.call_count == 1
+    # The remaining deadline is the timeout of httpx
+    timeout = send.call_args.args[0].extensions["timeout"]
+    assert 0 < timeout["read"] <= 0.2
+
+    send.side_effect = TimeoutException(0.1, _response().request)
+    start = time.perf_counter()
+    with pytest.raises(TimeoutException):
+        get_users()
+    # The second sleep would overrun the deadline, so it is not started
+    assert time.perf_counter() - start < 0.5
+    assert send.call_count == 3
+
+
+@pytest.mark.asyncio
+async def test_deadline_shrinks_attempt_timeout(mocker: MockerFixture):
+    @http("GET", "/api/users", base_url="https://reqres.in/", timeout=10)
+    async def get_users() -> dict:
+        ...
+
+    async def slow_send(*args, **kwargs):
+        await asyncio.sleep(1)
+        return _response()
+
+    mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send", side_effect=slow_send
+    )
+    start = time.perf_counter()
+    with deadline(0.1):
+        with pytest.raises(DeadlineExceeded):
+            await get_users()
+    assert time.perf_counter() - start < 0.5
+
+
+def test_deadline_rate_limiter(mocker: MockerFixture):
+    @rate_limiter(max_calls=1, interval=1)
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", return_value=_response()
+    )
+    get_users()
+    start = time.perf_counter()
+    with deadline(0.5):
+        with pytest.raises(DeadlineExceeded):
+            get_users()
+    assert time.perf_counter() - start < 0.1
@@ -0,0 +1,104 @@
+import dataclasses
+from typing import Dict, Generic, List, Optional, TypeVar
+
+import httpx
+import pytest
+
+from declarativex.decoders import decode_dataclass, get_dataclass_decoder
+from declarativex.models import Response
+from tests.fixtures.schemas.dataclass import PaginatedResponse, User
+
+T = TypeVar("T")
+
+
+@dataclasses.dataclass
+class Envelope(Generic[T]):
+    item: Optional[T]
+    items: List[T]
+    by_id: Dict[str, T]
+    note: str = "none"
+    tags: List[str] = dataclasses.field(default_factory=list)
+
+
+@dataclasses.dataclass
+class Node:
+    name: str
+    children: List["Node"] = dataclasses.field(default_factory=list)
+
+
+USER = {
+    "id": 1,
+    "email": "john@example.com",
+    "first_name": "John",
+    "last_name": "Doe",
+    "avatar": "https://example.com/john.png",
+}
+
+
+def test_decode_generic_dataclass():
+    data = {
+        "page": 1,
+        "per_page": 2,
+        "total": 2,
+        "total_pages": 1,
+        "data": [USER, USER],
+        "support": {"url": "https://example.com"},
+    }
+    result = decode_dataclass(PaginatedResponse[User], data)
+    assert isinstance(result, PaginatedResponse)
+    assert result.total == 2
+    assert result.data == [User(**USER), User(**USER)]
+
+
+def test_decode_nested_fields():
+    data = {
+        "item": None,
+        "items": [USER],
+        "by_id": {"1": USER},
+        "tags": ["a"],
+    }
+    result = decode_dataclass(Envelope[User], data)
+    assert result.item is None
+    assert result.items == [User(**USER)]
+    assert result.by_id == {"1": User(**USER)}
+    assert result.note == "none"
+    assert result.tags == ["a"]
+
+    result = decode_dataclass(Envelope[User], {**data, "item": USER})
+    assert result.item == User(**USER)
+
+
+def test_decode_does_not_change_data():
+    data = {"item": USER, "items": [USER], "by_id": {}}
+    decode_dataclass(Envelope[User], data)
+    assert data == {"item": USER, "items": [USER], "by_id": {}}
+
+
+def test_decoder_generated_once():
+    decoder = get_dataclass_decoder(Envelope[User])
+    assert get_dataclass_decoder(Envelope[User]) is decoder
+    assert get_dataclass_decoder(Envelope[int]) is not decoder
+
+
+def test_decode_missing_required_field():
+    with pytest.raises(TypeError, match="missing required field 'items'"):
+        decode_dataclass(Envelope[User], {"item": None, "by_id": {}})
+
+
+def test_decode_self_referencing_dataclass():
+    data = {"name": "root", "children": [{"name": "leaf"}]}
+    result = decode_dataclass(Node, data)
+    assert result == Node(name="root", children=[Node(name="leaf")])
+
+
+def test_response_as_generic_dataclass():
+    response = Response(
+        response=httpx.Response(
+            200,
+            json={"item": USER, "items": [], "by_id": {}},
+            request=httpx.Request("GET", "https://example.com"),
+        )
+    )
+    result = response.as_type(Envelope[User])
+    assert result.item == User(**USER)
+    assert result.items == []
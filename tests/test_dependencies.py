@@ -1,8 +1,27 @@
-from typing import Annotated
+import copy
+import warnings
+from typing import Annotated, Optional, Union
 
 import pytest
 
-from declarativex import http, FormField, FormData
+from declarativex import (
+    DependencyValidationError,
+    http,
+    FormField,
+    FormData,
+    Header,
+    Query,
+)
+from declarativex.dependencies import CallPlan
+from declarativex.auth import BearerAuth
+from declarativex.models import (
+    ClientConfiguration,
+    EndpointConfiguration,
+    LayeredParams,
+    RawRequest,
+)
+from declarativex.validation import compile_validator
+from declarativex.warnings import DeclarativeWarning
 
 
 @pytest.mark.asyncio
@@ -36,3 +55,136 @@ async def test_form_data():
     response = await endpoint(form=data)
     assert response["form"]["form_field"] == data["form_field"]
     assert response["form"]["another_field"] == data["another_field"]
+
+
+def test_request_defaults_not_changed():
+    defaults = {"accept": "application/json", "x-trace": "1"}
+    endpoint_configuration = EndpointConfiguration(
+        client_configuration=ClientConfiguration(
+            base_url="https://example.com/",
+            default_headers=defaults,
+            default_query_params={"page": 1},
+            auth=BearerAuth("token"),
+        ),
+        method="GET",
+        path="/users",
+    )
+
+    def get_users(
+        page: Annotated[int, Query] = 2,
+        request_id: Annotated[str, Header(name="X-Request-Id")] = "abc",
+    ) -> dict:
+        ...
+
+    plan = endpoint_configuration.compile_plan(get_users)
+    request = plan.modify_request(
+        RawRequest.initialize(endpoint_configuration), {}
+    )
+    assert isinstance(request.headers, LayeredParams)
+    assert request.headers == {
+        "accept": "application/json",
+        "x-trace": "1",
+        "Authorization": "Bearer token",
+        "x-request-id": "abc",
+    }
+    del request.headers["x-trace"]
+    assert "x-trace" not in request.headers
+    assert dict(request.query_params) == {"page": 2}
+
+    httpx_request = request.to_httpx_request()
+    assert httpx_request.headers["x-request-id"] == "abc"
+    assert "x-trace" not in httpx_request.headers
+    assert httpx_request.url.params["page"] == "2"
+
+    # The shared defaults are untouched
+    assert defaults == {"accept": "application/json", "x-trace": "1"}
+    client_configuration = endpoint_configuration.client_configuration
+    assert client_configuration.default_query_params == {"page": 1}
+
+
+def test_raw_request_lazy_parameters():
+    request = RawRequest(method="GET", url_template="https://example.com/")
+    assert request == RawRequest(
+        method="GET", url_template="https://example.com/", json={}
+    )
+    request.json["name"] = "John"
+    assert request.json == {"name": "John"}
+    assert request.to_httpx_request().content == b'{"name": "John"}'
+    with pytest.raises(AttributeError):
+        request.unknown = 1
+
+
+def test_validators_compiled_once():
+    assert compile_validator(Optional[int]) is compile_validator(
+        Union[int, None]
+    )
+    validate = compile_validator(Optional[int])
+    assert validate(1) == 1
+    assert validate(None) is None
+    with pytest.raises(DependencyValidationError):
+        validate("1")
+
+    def endpoint(page: int, fields=Query()) -> dict:
+        ...
+
+    with pytest.warns(DeclarativeWarning) as record:
+        CallPlan.warn_missing_type_hints(endpoint)
+    assert str(record.list[0].message) == (
+        DeclarativeWarning.NO_TYPE_HINT.format(f="fields")
+    )
+    with warnings.catch_warnings():
+        # The missing type hint is not reported on every call
+        warnings.simplefilter("error")
+        plan = CallPlan.compile(
+            endpoint, method="GET", url_template_variables=[]
+        )
+        for page in range(2):
+            request = plan.modify_request(
+                RawRequest("GET", "/"), {"page": page, "fields": "id"}
+            )
+            assert request.query_params == {"page": page, "fields": "id"}
+    with pytest.raises(DependencyValidationError):
+        plan.modify_request(RawRequest("GET", "/"), {"page": "1"})
+
+
+def test_trusted_endpoint_not_validated():
+    def endpoint(page: int, fields=Query()) -> dict:
+        ...
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        plan = EndpointConfiguration(
+            client_configuration=ClientConfiguration.create(),
+            method="GET",
+            path="/",
+            trusted=True,
+        ).compile_plan(endpoint)
+    request = plan.modify_request(
+        RawRequest("GET", "/"), {"page": "1", "fields": "id"}
+    )
+    assert request.query_params == {"page": "1", "fields": "id"}
+
+
+def test_dependencies_not_copied_per_call(mocker):
+    def endpoint(page: int, fields: Annotated[str, Query()]) -> dict:
+        ...
+
+    plan = CallPlan.compile(endpoint, method="GET", url_template_variables=[])
+    copy_dependency = mocker.spy(copy, "copy")
+    for page in range(2):
+        request = plan.modify_request(
+            RawRequest("GET", "/"), {"page": page, "fields": "id"}
+        )
+        assert request.query_params == {"page": page, "fields": "id"}
+    copy_dependency.assert_not_called()
+
+
+def test_prepare_request_plan_cached(mocker):
+    def endpoint(page: int) -> dict:
+        ...
+
+    compile_plan = mocker.spy(CallPlan, "compile")
+    for page in range(2):
+        request = RawRequest("GET", "/").prepare(endpoint, page=page)
+        assert request.query_params == {"page": page}
+    assert compile_plan.call_count == 1
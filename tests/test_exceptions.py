@@ -94,16 +94,18 @@ def test_endpoint_wrong_type_hints():
     )
     assert isinstance(result, list)
 
-    @http("GET", "/posts", base_url="https://jsonplaceholder.typicode.com/")
-    def get_posts(userId=Query()) -> List[dict]:
-        pass
-
     with pytest.warns(DeclarativeWarning) as record:
-        result = get_posts(1)
+
+        @http(
+            "GET", "/posts", base_url="https://jsonplaceholder.typicode.com/"
+        )
+        def get_posts(userId=Query()) -> List[dict]:
+            pass
 
     assert str(record.list[0].message) == (
         DeclarativeWarning.NO_TYPE_HINT.format(f="userId")
     )
+    result = get_posts(1)
     assert isinstance(result, list)
     assert len(result) == 10
 
@@ -128,12 +130,15 @@ def test_endpoint_wrong_type_hints():
 
 
 def test_endpoint_default_empty_value():
-    @http("get", "/posts", base_url="https://jsonplaceholder.typicode.com/")
-    def get_posts(userId) -> List[dict]:
-        pass
-
     with pytest.warns(DeclarativeWarning):
-        assert len(get_posts(...)) == 0
+
+        @http(
+            "get", "/posts", base_url="https://jsonplaceholder.typicode.com/"
+        )
+        def get_posts(userId) -> List[dict]:
+            pass
+
+    assert len(get_posts(...)) == 0
 
 
 @pytest.mark.parametrize("dependency", [JsonField, Json])
@@ -1,8 +1,13 @@
+import json
+
+import httpx
 import pytest
 from pydantic import BaseModel
+from pytest_mock import MockerFixture
 
-from declarativex import BaseClient
+from declarativex import BaseClient, MisconfiguredException
 from declarativex.methods import gql
+from declarativex.models import GraphQLConfiguration
 
 
 class ExampleQuery(BaseModel):
@@ -70,3 +75,83 @@ async def test_get_type():
     response = await space_x.get_type("users")
     assert isinstance(response, dict)
     assert response == {"data": {"__type": {"name": "users"}}}
+
+
+def test_query_parsed_once():
+    configuration = GraphQLConfiguration(
+        query="""
+        query GetType($name: String!, $kind: String) {
+          __type(name: $name) { ...TypeName }
+        }
+        fragment TypeName on __Type { name }
+        """
+    )
+    assert configuration.variables == ["name", "kind"]
+    assert configuration.operation_name == "GetType"
+
+
+def test_query_syntax_error():
+    with pytest.raises(MisconfiguredException, match="Invalid GraphQL query"):
+
+        @gql("query ($name: String!) { __type(name: $name) {")
+        def get_type(name: str) -> dict:
+            ...
+
+
+@pytest.mark.asyncio
+async def test_request_body(mocker: MockerFixture):
+    send = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        return_value=httpx.Response(
+            200,
+            json={"data": {}},
+            request=httpx.Request("POST", SpaceX.base_url),
+        ),
+    )
+    await space_x.get_type("users")
+    request: httpx.Request = send.call_args.args[0]
+    body = json.loads(request.content)
+    assert request.headers["Content-Type"] == "application/json"
+    assert "__type(name: $name)" in body.pop("query")
+    assert body == {"variables": {"name": "users"}}
+
+    send.return_value = httpx.Response(
+        200,
+        json={
+            "data": {"company": {"ceo": "-"}, "roadster": {"apoapsis_au": 1}}
+        },
+        request=httpx.Request("POST", SpaceX.base_url),
+    )
+    await space_x.example_query()
+    body = json.loads(send.call_args.args[0].content)
+    assert body["operationName"] == "ExampleQuery"
+    assert "variables" not in body
+
+
+@pytest.mark.asyncio
+async def test_request_body_json_codec(mocker: MockerFixture):
+    pytest.importorskip("orjson")
+    send = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        return_value=httpx.Response(
+            200,
+            json={"data": {}},
+            request=httpx.Request("POST", SpaceX.base_url),
+        ),
+    )
+
+    @gql(
+        "query ($name: String!) { __type(name: $name) { name } }",
+        base_url=SpaceX.base_url,
+        json_codec="orjson",
+        binary_codec="msgpack",
+    )
+    async def get_type(name: str) -> dict:
+        ...
+
+    await get_type("users")
+    request: httpx.Request = send.call_args.args[0]
+    # The variables are encoded with orjson, even with a binary codec
+    assert request.headers["Content-Type"] == "application/json"
+    assert request.content.endswith(b', "variables": {"name":"users"}}')
+    assert json.loads(request.content)["variables"] == {"name": "users"}
@@ -0,0 +1,123 @@
+import dataclasses
+from typing import List, Optional
+
+import httpx
+import pydantic
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import BaseClient, LazyModel, http
+from declarativex.models import Response
+
+
+class Address(pydantic.BaseModel):
+    city: str
+    zipcode: str = pydantic.Field(min_length=5)
+
+
+class User(pydantic.BaseModel):
+    id: int
+    name: str = pydantic.Field(alias="fullName")
+    address: Address
+    manager: Optional[Address] = None
+    tags: List[str] = []
+
+
+@dataclasses.dataclass
+class Item:
+    id: int
+    title: str = ""
+
+
+USER = {
+    "id": "1",
+    "fullName": "John",
+    "address": {"city": "Kyiv", "zipcode": "01001"},
+    "extra": "ignored",
+}
+
+
+def _response(**kwargs) -> Response:
+    return Response(
+        response=httpx.Response(
+            200,
+            request=httpx.Request("GET", "https://example.com"),
+            **kwargs,
+        ),
+        lazy=True,
+    )
+
+
+def test_lazy_model_validates_fields_on_access():
+    user = _response(json=USER).as_type(User)
+    assert isinstance(user, LazyModel)
+    assert user.id == 1
+    assert user.name == "John"
+    assert user.tags == []
+    assert user.manager is None
+    address = user.address
+    assert isinstance(address, LazyModel)
+    assert address.city == "Kyiv"
+    assert user.address is address
+    with pytest.raises(AttributeError):
+        user.extra
+
+
+def test_lazy_model_errors():
+    user = _response(
+        json={**USER, "id": "one", "address": {"city": "Kyiv"}}
+    ).as_type(User)
+    # Invalid fields are reported only when they are read
+    assert user.name == "John"
+    with pytest.raises(pydantic.ValidationError):
+        user.id
+    with pytest.raises(pydantic.ValidationError):
+        user.address.zipcode
+
+    user = _response(json={"id": 1}).as_type(User)
+    with pytest.raises(pydantic.ValidationError, match="fullName"):
+        user.name
+
+
+def test_lazy_model_full_validation():
+    user = _response(json=USER).as_type(User)
+    instance = user.validate()
+    assert isinstance(instance, User)
+    assert instance.address.zipcode == "01001"
+    assert user.validate() is instance
+    assert user.raw is not None
+
+
+def test_lazy_list_of_dataclasses():
+    items = _response(json=[{"id": "1"}, {"id": 2, "title": "Two"}]).as_type(
+        List[Item]
+    )
+    assert all(isinstance(item, LazyModel) for item in items)
+    assert [item.id for item in items] == [1, 2]
+    assert [item.title for item in items] == ["", "Two"]
+    assert items[1].validate() == Item(id=2, title="Two")
+
+
+def test_lazy_endpoint(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, json=USER, request=request
+        ),
+    )
+
+    class Client(BaseClient):
+        base_url = "https://example.com"
+
+        @http("GET", "/users/{user_id}", lazy=True)
+        def get_user(self, user_id: int) -> User:
+            ...
+
+        @http("GET", "/users/{user_id}")
+        def get_user_eager(self, user_id: int) -> User:
+            ...
+
+    user = Client().get_user(user_id=1)
+    assert isinstance(user, LazyModel)
+    assert user.address.city == "Kyiv"
+    assert isinstance(Client().get_user_eager(user_id=1), User)
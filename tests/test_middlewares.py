@@ -1,10 +1,12 @@
 import logging
 from unittest.mock import MagicMock
 
+import httpx
 import pytest
 from pytest_mock import MockerFixture
 
 from declarativex import Middleware, http, MisconfiguredException
+from declarativex.executors import SyncExecutor
 
 
 class FooMiddleware(Middleware):
@@ -176,3 +178,33 @@ def test_middleware_dont_call_client(mocker: MockerFixture):
     get_users()
     assert get.call_count == 2
     assert add.call_count == 1
+
+
+def test_middleware_chain_built_once(mocker: MockerFixture):
+    calls = []
+
+    class RecordMiddleware(Middleware):
+        def __call__(self, *, request, call_next):
+            calls.append(request.url())
+            return call_next(request)
+
+    @http(
+        "GET",
+        "api/users/{user_id}",
+        base_url="https://reqres.in",
+        middlewares=[RecordMiddleware(), FooMiddleware()],
+    )
+    def get_user(user_id: int) -> httpx.Response:
+        pass
+
+    check = mocker.spy(SyncExecutor, "check_middlewares")
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, request=request
+        ),
+    )
+    for user_id in range(3):
+        assert get_user(user_id).status_code == 200
+    assert check.call_count == 1
+    assert calls == [f"https://reqres.in/api/users/{i}" for i in range(3)]
@@ -0,0 +1,104 @@
+from typing import Annotated, Dict, Generic, List, TypeVar
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import BaseClient, HTTPException, Json, http
+from declarativex.compatibility import is_msgspec_type
+from declarativex.models import Response
+
+msgspec = pytest.importorskip("msgspec")
+
+T = TypeVar("T")
+
+
+class User(msgspec.Struct):
+    id: int
+    name: str
+
+
+class Page(msgspec.Struct, Generic[T]):
+    page: int
+    items: List[T]
+
+
+class Error(msgspec.Struct):
+    detail: str
+
+
+def _response(content: bytes, status_code: int = 200) -> Response:
+    return Response(
+        response=httpx.Response(
+            status_code,
+            content=content,
+            headers={"Content-Type": "application/json"},
+            request=httpx.Request("GET", "https://example.com"),
+        )
+    )
+
+
+def test_is_msgspec_type():
+    assert is_msgspec_type(User)
+    assert is_msgspec_type(Page[User])
+    assert is_msgspec_type(List[User])
+    assert is_msgspec_type(Dict[str, User])
+    assert not is_msgspec_type(dict)
+    assert not is_msgspec_type(List[int])
+
+
+def test_struct_response():
+    assert _response(b'{"id": 1, "name": "John"}').as_type(User) == User(
+        id=1, name="John"
+    )
+
+
+def test_list_and_generic_struct_response():
+    content = b'[{"id": 1, "name": "John"}, {"id": 2, "name": "Jane"}]'
+    assert _response(content).as_type(List[User]) == [
+        User(id=1, name="John"),
+        User(id=2, name="Jane"),
+    ]
+    content = b'{"page": 1, "items": [{"id": 1, "name": "John"}]}'
+    assert _response(content).as_type(Page[User]) == Page(
+        page=1, items=[User(id=1, name="John")]
+    )
+
+
+def test_struct_response_errors():
+    with pytest.raises(msgspec.ValidationError):
+        _response(b'{"id": "1", "name": "John"}').as_type(User)
+    with pytest.raises(Exception, match="Failed to parse response"):
+        _response(b"not json").as_type(User)
+
+
+def test_struct_json_body(mocker: MockerFixture):
+    def _respond(request: httpx.Request, **kwargs) -> httpx.Response:
+        if request.url.path == "/missing":
+            return httpx.Response(
+                404, json={"detail": "Not found"}, request=request
+            )
+        return httpx.Response(200, content=request.content, request=request)
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_respond
+    )
+
+    class Client(BaseClient):
+        base_url = "https://example.com"
+        error_mappings = {404: Error}
+
+        @http("POST", "/users")
+        def create(self, user: Annotated[User, Json()]) -> User:
+            ...
+
+        @http("POST", "/missing")
+        def missing(self, user: Annotated[User, Json()]) -> User:
+            ...
+
+    assert Client().create(user=User(id=1, name="John")) == User(
+        id=1, name="John"
+    )
+    with pytest.raises(HTTPException) as exc_info:
+        Client().missing(user=User(id=1, name="John"))
+    assert exc_info.value.response == Error(detail="Not found")
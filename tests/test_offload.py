@@ -0,0 +1,212 @@
+import asyncio
+import json
+import threading
+import time
+from json import JSONDecodeError
+from typing import List
+
+import httpx
+import pydantic
+import pytest
+from pydantic import TypeAdapter
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    MisconfiguredException,
+    UnprocessableEntityException,
+    http,
+)
+from declarativex.compatibility import parse_json_in_chunks
+from declarativex.models import Response
+
+
+class Item(pydantic.BaseModel):
+    id: int
+
+    @pydantic.field_validator("id")
+    @classmethod
+    def record_thread(cls, value: int) -> int:
+        THREADS.add(threading.current_thread().name)
+        return value
+
+
+THREADS: set = set()
+
+
+class Client(BaseClient):
+    base_url = "https://example.com"
+
+    @http("GET", "/items", offload_threshold=1000)
+    async def get_items(self) -> List[Item]:
+        ...
+
+    @http("GET", "/items")
+    async def get_items_inline(self) -> List[Item]:
+        ...
+
+    @http("GET", "/items", offload_threshold=1000)
+    async def get_items_as_dicts(self) -> List[dict]:
+        ...
+
+    @http("GET", "/items", offload_threshold=1000, json_codec="orjson")
+    async def get_items_orjson(self) -> List[Item]:
+        ...
+
+
+@pytest.fixture
+def items_response(mocker: MockerFixture):
+    def _respond(count: int):
+        mocker.patch(
+            "declarativex.executors.httpx.AsyncClient.send",
+            side_effect=lambda request, **kwargs: httpx.Response(
+                200,
+                json=[{"id": index} for index in range(count)],
+                request=request,
+            ),
+        )
+
+    THREADS.clear()
+    return _respond
+
+
+@pytest.mark.asyncio
+async def test_large_response_decoded_in_thread(
+    items_response, mocker: MockerFixture
+):
+    to_thread = mocker.spy(asyncio, "to_thread")
+    items_response(500)
+    items = await Client().get_items()
+    assert len(items) == 500
+    assert to_thread.call_count == 1
+    assert threading.current_thread().name not in THREADS
+
+
+@pytest.mark.asyncio
+async def test_small_response_decoded_inline(
+    items_response, mocker: MockerFixture
+):
+    to_thread = mocker.spy(asyncio, "to_thread")
+    items_response(5)
+    assert len(await Client().get_items()) == 5
+    items_response(500)
+    assert len(await Client().get_items_inline()) == 500
+    assert to_thread.call_count == 0
+    assert THREADS == {threading.current_thread().name}
+
+
+@pytest.mark.asyncio
+async def test_only_chunked_conversions_offloaded(
+    items_response, mocker: MockerFixture
+):
+    pytest.importorskip("orjson")
+    to_thread = mocker.spy(asyncio, "to_thread")
+    items_response(500)
+    # The conversions that are a single call would hold the GIL
+    # in the thread, so they are not offloaded
+    assert len(await Client().get_items_as_dicts()) == 500
+    assert len(await Client().get_items_orjson()) == 500
+    assert to_thread.call_count == 0
+
+
+@pytest.mark.asyncio
+async def test_event_loop_responsive_during_large_decode(
+    mocker: MockerFixture,
+):
+    content = json.dumps(
+        [{"id": index, "tags": ["a", "b"]} for index in range(200000)]
+    ).encode()
+    mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, content=content, request=request
+        ),
+    )
+
+    async def longest_stall(endpoint) -> float:
+        done = False
+        longest = 0.0
+
+        async def ticker():
+            nonlocal longest
+            last = time.perf_counter()
+            while not done:
+                await asyncio.sleep(0.001)
+                now = time.perf_counter()
+                longest = max(longest, now - last)
+                last = now
+
+        task = asyncio.create_task(ticker())
+        await asyncio.sleep(0.01)
+        assert len(await endpoint()) == 200000
+        done = True
+        await task
+        return longest
+
+    inline = await longest_stall(Client().get_items_inline)
+    offloaded = await longest_stall(Client().get_items)
+    assert offloaded < inline / 4
+
+
+def test_negative_offload_threshold():
+    with pytest.raises(MisconfiguredException, match="offload_threshold"):
+        http("GET", "/", offload_threshold=-1)
+
+
+def test_list_validated_in_chunks(mocker: MockerFixture):
+    validate = mocker.spy(TypeAdapter, "validate_python")
+    response = httpx.Response(
+        200,
+        json=[{"id": index} for index in range(5)],
+        request=httpx.Request("GET", "https://example.com/items"),
+    )
+    items = Response(response=response, chunk_size=2).as_type(List[Item])
+    assert [item.id for item in items] == [0, 1, 2, 3, 4]
+    assert validate.call_count == 3
+
+
+def test_chunked_validation_error_location():
+    response = httpx.Response(
+        200,
+        json=[{"id": 0}, {"id": 1}, {"id": 2}, {"id": "invalid"}],
+        request=httpx.Request("GET", "https://example.com/items"),
+    )
+    with pytest.raises(pydantic.ValidationError) as exc_info:
+        Response(response=response, chunk_size=2).as_type(List[Item])
+    assert exc_info.value.errors()[0]["loc"] == (3, "id")
+
+
+@pytest.mark.parametrize(
+    "content",
+    [
+        '[{"id": 1} {"id": 2}]',
+        '[{"id": 1}] []',
+        '[{"id": 1},]',
+        '[{"id": 1},',
+        '[{"id"',
+    ],
+)
+def test_invalid_json_in_chunks(content: str):
+    with pytest.raises(JSONDecodeError):
+        parse_json_in_chunks(List[Item], content, 2)
+
+
+def test_json_in_chunks_documents():
+    assert parse_json_in_chunks(List[Item], " [ ] ", 2) == []
+    items = parse_json_in_chunks(
+        List[Item], '\n[{"id": 1} ,\t{"id": 2}, {"id": 3}]\n', 2
+    )
+    assert [item.id for item in items] == [1, 2, 3]
+    # Not an array, the type reports it
+    with pytest.raises(pydantic.ValidationError):
+        parse_json_in_chunks(List[Item], '{"id": 1}', 2)
+
+
+def test_invalid_json_response_in_chunks():
+    response = httpx.Response(
+        200,
+        content=b'[{"id": 1}, {"id": 2}',
+        request=httpx.Request("GET", "https://example.com/items"),
+    )
+    with pytest.raises(UnprocessableEntityException):
+        Response(response=response, chunk_size=2).as_type(List[Item])
@@ -0,0 +1,202 @@
+import copy
+import dataclasses
+from unittest import mock
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    CircuitOpenException,
+    Middleware,
+    MisconfiguredException,
+    PreparedRequest,
+    Query,
+    circuit_breaker,
+    http,
+    prepare,
+    retry,
+)
+from declarativex.models import RawRequest
+
+
+@dataclasses.dataclass
+class Todo:
+    id: int
+    title: str
+
+
+def _respond(request: httpx.Request, **kwargs) -> httpx.Response:
+    return httpx.Response(
+        200,
+        json={"id": 1, "title": str(request.url)},
+        request=request,
+    )
+
+
+class HeaderMiddleware(Middleware):
+    def __call__(self, *, request: RawRequest, call_next):
+        request.headers["X-Attempt"] = str(len(request.headers))
+        return call_next(request)
+
+
+class Client(BaseClient):
+    base_url = "https://example.com/"
+    default_query_params = {"format": "json"}
+
+    @retry(max_retries=1)
+    @http("GET", "/todos/{todo_id}")
+    def get_todo(self, todo_id: int, fields: str = Query()) -> Todo:
+        ...
+
+    @http("GET", "/todos/{todo_id}")
+    async def get_todo_async(self, todo_id: int) -> Todo:
+        ...
+
+
+class MiddlewareClient(BaseClient):
+    base_url = "https://example.com/"
+    middlewares = [HeaderMiddleware()]
+
+    @http("GET", "/todos/{todo_id}")
+    def get_todo(self, todo_id: int) -> httpx.Response:
+        ...
+
+
+def test_prepared_request_sent_many_times(mocker: MockerFixture):
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_respond
+    )
+    client = Client()
+    prepared = prepare(client.get_todo, 1, fields="title")
+    assert isinstance(prepared, PreparedRequest)
+    to_httpx_request = mocker.spy(RawRequest, "to_httpx_request")
+
+    todos = [prepared.send() for _ in range(3)]
+
+    assert to_httpx_request.call_count == 0
+    assert send.call_count == 3
+    assert todos[0] == todos[2]
+    assert todos[0].title == (
+        "https://example.com/todos/1?format=json&fields=title"
+    )
+
+
+def test_prepared_request_with_middlewares(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_respond
+    )
+    prepared = prepare(MiddlewareClient().get_todo, todo_id=2)
+
+    responses = [prepared.send() for _ in range(2)]
+
+    # Middlewares get a copy, the prepared request is not changed
+    assert [r.request.headers["X-Attempt"] for r in responses] == ["0", "0"]
+    assert "X-Attempt" not in prepared.request.headers
+
+
+def test_prepare_misconfigured():
+    def not_declared():
+        ...
+
+    with pytest.raises(MisconfiguredException):
+        prepare(not_declared)
+
+
+@pytest.mark.asyncio
+async def test_prepared_request_async(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send", side_effect=_respond
+    )
+    prepared = prepare(Client().get_todo_async, todo_id=3)
+    with pytest.raises(MisconfiguredException):
+        prepared.send()
+    todo = await prepared.asend()
+    assert todo == await prepared.asend()
+    assert todo.title == "https://example.com/todos/3?format=json"
+
+
+def test_prepared_request_retried(mocker: MockerFixture):
+    responses = iter([httpx.ConnectError("Failed")])
+
+    def flaky_send(request: httpx.Request, **kwargs) -> httpx.Response:
+        error = next(responses, None)
+        if error is not None:
+            raise error
+        return _respond(request)
+
+    class RetryClient(BaseClient):
+        base_url = "https://example.com/"
+
+        @retry(max_retries=1, exceptions=(httpx.ConnectError,))
+        @http("GET", "/todos/{todo_id}")
+        def get_todo(self, todo_id: int) -> Todo:
+            ...
+
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=flaky_send
+    )
+    prepared = RetryClient().get_todo.prepare(1)
+    assert isinstance(prepared, PreparedRequest)
+    # The prepared request is sent through the retry decorator
+    assert prepared.send().title == "https://example.com/todos/1"
+    assert send.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_prepared_request_through_circuit_breaker(
+    mocker: MockerFixture,
+):
+    breaker = circuit_breaker(minimum_calls=1, recovery_timeout=60)
+
+    @breaker
+    class BreakerClient(BaseClient):
+        base_url = "https://example.com/"
+
+        @http("GET", "/todos/{todo_id}")
+        async def get_todo(self, todo_id: int) -> Todo:
+            ...
+
+    send = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        side_effect=httpx.ConnectError("Failed"),
+    )
+    prepared = BreakerClient().get_todo.prepare(todo_id=1)
+    with pytest.raises(httpx.ConnectError):
+        await prepared.asend()
+    with pytest.raises(CircuitOpenException):
+        await prepared.asend()
+    assert send.call_count == 1
+
+
+def test_bound_endpoint(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_respond
+    )
+    client = Client()
+    assert client.get_todo.__name__ == "get_todo"
+    assert Client.get_todo(client, 1, fields="id").title == (
+        "https://example.com/todos/1?format=json&fields=id"
+    )
+    prepared = prepare(Client.get_todo, client, 2, fields="id")
+    assert prepared.send().title == (
+        "https://example.com/todos/2?format=json&fields=id"
+    )
+
+
+def test_endpoints_bound_on_access(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=_respond
+    )
+    client = Client(base_url="https://one.example.com/")
+    assert "get_todo" not in vars(client)
+    # The copy calls its endpoints with its own attributes
+    other = copy.copy(client)
+    other.base_url = "https://two.example.com/"
+    assert other.get_todo.prepare(1, fields="id").send().title == (
+        "https://two.example.com/todos/1?format=json&fields=id"
+    )
+    # The class attribute isn't shadowed by the instances
+    with mock.patch.object(Client, "get_todo", return_value="patched"):
+        assert client.get_todo(1) == "patched"
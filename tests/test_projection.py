@@ -0,0 +1,147 @@
+import dataclasses
+from typing import Generic, List, TypeVar
+
+import httpx
+import pydantic
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    LazyModel,
+    MisconfiguredException,
+    UnprocessableEntityException,
+    http,
+)
+from declarativex.models import Response
+from declarativex.projection import parse_response_path
+
+T = TypeVar("T")
+
+
+class User(pydantic.BaseModel):
+    id: int
+    name: str
+
+
+@dataclasses.dataclass
+class Member:
+    id: int
+    name: str
+
+
+@dataclasses.dataclass
+class Page(Generic[T]):
+    page: int
+    users: List[T]
+
+
+ENVELOPE = {
+    "data": {
+        "items": [{"id": 1, "name": "John"}, {"id": "2", "name": "Jane"}],
+        "page": {"page": 1, "users": [{"id": 3, "name": "Bob"}]},
+    },
+    "meta": {"total": 2, "invalid": [None, {"id": "x"}]},
+}
+
+
+def _response(path: str, **kwargs) -> Response:
+    return Response(
+        response=httpx.Response(
+            200,
+            json=ENVELOPE,
+            request=httpx.Request("GET", "https://example.com"),
+        ),
+        response_path=parse_response_path(path),
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "path,expected",
+    [
+        ("data.items", ("data", "items")),
+        ("data", ("data",)),
+        ("/data/items", ("data", "items")),
+        ("/a~1b/c~0d", ("a/b", "c~d")),
+    ],
+)
+def test_parse_response_path(path, expected):
+    assert parse_response_path(path) == expected
+
+
+@pytest.mark.parametrize("path", ["", "data..items", "/data/", "."])
+def test_invalid_response_path(path):
+    with pytest.raises(MisconfiguredException, match="response_path"):
+        http("GET", "/", response_path=path)
+
+
+def test_project_models():
+    assert _response("data.items").as_type(List[User]) == [
+        User(id=1, name="John"),
+        User(id=2, name="Jane"),
+    ]
+    assert _response("/meta/total").as_type(int) == 2
+    assert _response("data.items").as_type(List[dict]) == (
+        ENVELOPE["data"]["items"]
+    )
+
+
+def test_project_invalid_sub_tree():
+    # The errors of the sub-tree are reported by the type
+    with pytest.raises(pydantic.ValidationError):
+        _response("meta.invalid").as_type(List[User])
+
+
+def test_project_generic_dataclass_and_lazy():
+    page = _response("data.page").as_type(Page[Member])
+    assert page.users == [Member(id=3, name="Bob")]
+    users = _response("data.items", lazy=True).as_type(List[User])
+    assert all(isinstance(user, LazyModel) for user in users)
+    assert users[1].id == 2
+
+
+@pytest.mark.parametrize("type_hint", [List[User], dict, Page[Member]])
+@pytest.mark.parametrize("path", ["data.missing", "meta.total.value"])
+def test_project_missing_path(type_hint, path):
+    key = path.split(".")[-1]
+    with pytest.raises(UnprocessableEntityException) as exc_info:
+        _response(path).as_type(type_hint)
+    assert f"Missing key {key!r} of response_path {path!r}" in str(
+        exc_info.value
+    )
+
+
+def test_project_msgspec():
+    msgspec = pytest.importorskip("msgspec")
+
+    class Item(msgspec.Struct):
+        id: int
+        name: str
+
+    assert _response("/data/page/users").as_type(List[Item]) == [
+        Item(id=3, name="Bob")
+    ]
+    with pytest.raises(msgspec.ValidationError):
+        # msgspec doesn't coerce strings to integers
+        _response("data.items").as_type(List[Item])
+    with pytest.raises(UnprocessableEntityException, match="'data.users'"):
+        _response("data.users").as_type(List[Item])
+
+
+def test_endpoint_response_path(mocker: MockerFixture):
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200, json=ENVELOPE, request=request
+        ),
+    )
+
+    class Client(BaseClient):
+        base_url = "https://example.com"
+
+        @http("GET", "/users", response_path="data.items")
+        def get_users(self) -> List[User]:
+            ...
+
+    assert Client().get_users()[0] == User(id=1, name="John")
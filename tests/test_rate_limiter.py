@@ -2,15 +2,19 @@ import asyncio
 import sys
 import time
 
+import httpx
 import pytest
+from pytest_mock import MockerFixture
 
 from declarativex import (
     rate_limiter,
     BaseClient,
     http,
+    HTTPException,
     RateLimitExceeded,
     MisconfiguredException,
 )
+from declarativex.rate_limiter import Bucket
 from declarativex.warnings import DeclarativeWarning
 
 
@@ -145,3 +149,117 @@ def test_unsupported_func_decorated():
         "rate_limiter decorator is ignored because "
         "not applied to endpoint declaration."
     )
+
+
+def _rate_limited_response(status_code=200, **headers):
+    return httpx.Response(
+        status_code,
+        json={},
+        headers=headers,
+        request=httpx.Request("GET", "https://reqres.in/api/users"),
+    )
+
+
+def test_adaptive_rate_limiter_pauses_after_429(mocker: MockerFixture):
+    @rate_limiter(max_calls=10, interval=1, adaptive=True)
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=[
+            _rate_limited_response(429, **{"Retry-After": "0.5"}),
+            _rate_limited_response(200),
+        ],
+    )
+    with pytest.raises(HTTPException):
+        get_users()
+
+    start = time.perf_counter()
+    assert get_users() == {}
+    assert 0.4 < time.perf_counter() - start < 1
+
+
+def test_adaptive_rate_limiter_rejects_while_paused(mocker: MockerFixture):
+    @rate_limiter(max_calls=10, interval=1, reject=True, adaptive=True)
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        return_value=_rate_limited_response(
+            200, **{"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "5"}
+        ),
+    )
+    assert get_users() == {}
+    with pytest.raises(RateLimitExceeded):
+        get_users()
+
+    get_users.refill()
+    assert get_users() == {}
+
+
+@pytest.mark.asyncio
+async def test_adaptive_rate_limiter_slows_down(mocker: MockerFixture):
+    @rate_limiter(max_calls=100, interval=1, adaptive=True)
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    async def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        return_value=_rate_limited_response(
+            200, **{"X-RateLimit-Remaining": "2", "X-RateLimit-Reset": "1"}
+        ),
+    )
+    start = time.perf_counter()
+    # Two calls are left after the first one, the fourth call waits
+    # for a token refilled at the rate of 2 calls per second
+    for _ in range(4):
+        await get_users()
+    assert 0.4 < time.perf_counter() - start < 1
+
+
+def test_adaptive_rate_limiter_counts_call_once(mocker: MockerFixture):
+    limiter = rate_limiter(max_calls=10, interval=1, adaptive=True)
+
+    @limiter
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        return_value=_rate_limited_response(
+            200, **{"X-RateLimit-Remaining": "5"}
+        ),
+    )
+    get_users()
+    # The remaining calls of the upstream already count this call
+    assert limiter._bucket.token_bucket == 5
+
+
+def test_bucket_adapt_without_headers():
+    bucket = Bucket(max_calls=5, interval=1)
+    bucket.adapt(_rate_limited_response(200))
+    assert bucket.token_bucket == 5
+    assert bucket.token_fill_rate == 5
+    assert bucket.pause_left() == 0.0
+
+
+def test_bucket_pause_capped():
+    bucket = Bucket(max_calls=5, interval=1, max_pause=2)
+    bucket.adapt(_rate_limited_response(429, **{"Retry-After": "3600"}))
+    assert 1.5 < bucket.pause_left() <= 2
+    bucket.refill()
+    bucket.adapt(
+        _rate_limited_response(
+            200, **{"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": "inf"}
+        )
+    )
+    # The malformed reset is ignored
+    assert bucket.pause_left() == 0.0
+    with pytest.raises(MisconfiguredException, match="max_pause"):
+        rate_limiter(max_calls=1, interval=1, max_pause=0)
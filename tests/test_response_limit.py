@@ -0,0 +1,118 @@
+import json
+from typing import List
+
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import (
+    BaseClient,
+    MisconfiguredException,
+    ResponseTooLarge,
+    http,
+)
+
+BODY = json.dumps([{"id": index} for index in range(100)]).encode()
+
+
+class Client(BaseClient):
+    base_url = "https://example.com"
+    max_response_bytes = 100
+
+    @http("GET", "/items")
+    def get_items(self) -> List[dict]:
+        ...
+
+    @http("GET", "/items", max_response_bytes=len(BODY))
+    def get_all_items(self) -> List[dict]:
+        ...
+
+    @http("GET", "/items")
+    async def aget_items(self) -> List[dict]:
+        ...
+
+
+class Chunks:
+    """The body of the response in chunks, counting the chunks read."""
+
+    def __init__(self, body: bytes, size: int = 64):
+        self.chunks = [
+            body[start:start + size] for start in range(0, len(body), size)
+        ]
+        self.read = 0
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.read += 1
+            yield chunk
+
+    async def __aiter__(self):
+        for chunk in self:
+            yield chunk
+
+
+@pytest.fixture
+def chunks(mocker: MockerFixture) -> Chunks:
+    body = Chunks(BODY)
+
+    def send(request, **kwargs):
+        assert kwargs["stream"] is True
+        return httpx.Response(200, content=iter(body), request=request)
+
+    async def asend(request, **kwargs):
+        assert kwargs["stream"] is True
+        return httpx.Response(200, content=body.__aiter__(), request=request)
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send", side_effect=send
+    )
+    mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send", side_effect=asend
+    )
+    return body
+
+
+def test_response_within_limit(chunks: Chunks):
+    assert len(Client().get_all_items()) == 100
+    assert chunks.read == len(chunks.chunks)
+
+
+def test_reading_aborted_when_limit_exceeded(chunks: Chunks):
+    with pytest.raises(ResponseTooLarge) as exc_info:
+        Client().get_items()
+    assert exc_info.value.limit == 100
+    assert exc_info.value.size == 128
+    assert chunks.read == 2
+
+
+@pytest.mark.asyncio
+async def test_async_reading_aborted_when_limit_exceeded(chunks: Chunks):
+    with pytest.raises(ResponseTooLarge, match="100 bytes"):
+        await Client().aget_items()
+    assert chunks.read == 2
+
+
+def test_content_length_checked_before_reading(mocker: MockerFixture):
+    body = Chunks(BODY)
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: httpx.Response(
+            200,
+            headers={"Content-Length": str(len(BODY))},
+            content=iter(body),
+            request=request,
+        ),
+    )
+    with pytest.raises(ResponseTooLarge) as exc_info:
+        Client().get_items()
+    assert exc_info.value.size == len(BODY)
+    assert body.read == 0
+
+
+def test_client_limit(chunks: Chunks):
+    assert len(Client(max_response_bytes=len(BODY)).get_items()) == 100
+
+
+def test_negative_max_response_bytes():
+    with pytest.raises(MisconfiguredException, match="max_response_bytes"):
+        http("GET", "/", max_response_bytes=-1)
@@ -8,7 +8,18 @@ import httpx
 import pytest
 from pytest_mock import MockerFixture
 
-from declarativex import BaseClient, http, retry, TimeoutException, Query
+from declarativex import (
+    BaseClient,
+    http,
+    retry,
+    HTTPException,
+    Jitter,
+    MisconfiguredException,
+    Query,
+    RetryBudget,
+    RetryPolicy,
+    TimeoutException,
+)
 
 
 @retry(max_retries=3, delay=0.1, exceptions=(TimeoutException,))
@@ -76,3 +87,183 @@ def test_sync_retry(mocker: MockerFixture):
     assert 3 == len(
         [call[0][0] for call in sleep.call_args_list if call[0][0] == 0.1]
     )
+
+
+def _response(status_code: int, method: str = "GET", **headers):
+    return httpx.Response(
+        status_code,
+        json={},
+        headers=headers,
+        request=httpx.Request(method, "https://reqres.in/api/users"),
+    )
+
+
+def test_retry_on_status_codes_with_retry_after(mocker: MockerFixture):
+    @retry(policy=RetryPolicy(max_retries=2, status_codes={503}, delay=0.01))
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    call = mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=[
+            _response(503, **{"Retry-After": "0.2"}),
+            _response(503),
+            _response(200),
+        ],
+    )
+    sleep = mocker.patch("time.sleep")
+    assert get_users() == {}
+    assert call.call_count == 3
+    assert [c[0][0] for c in sleep.call_args_list] == [0.2, 0.01]
+
+
+def test_retry_after_exceeding_max_delay(mocker: MockerFixture):
+    @retry(
+        policy=RetryPolicy(max_retries=2, status_codes={429}, max_delay=1)
+    )
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    call = mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=[_response(429, **{"Retry-After": "120"}), _response(200)],
+    )
+    sleep = mocker.patch("time.sleep")
+    assert get_users() == {}
+    assert call.call_count == 2
+    # The delay is capped at max_delay
+    sleep.assert_called_once_with(1)
+
+
+@pytest.mark.parametrize("value", ["inf", "nan", "-inf"])
+def test_non_finite_retry_after_ignored(mocker: MockerFixture, value: str):
+    @retry(policy=RetryPolicy(max_retries=1, status_codes={503}, delay=0.01))
+    @http("GET", "/api/users", base_url="https://reqres.in/")
+    def get_users() -> dict:
+        ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=[_response(503, **{"Retry-After": value}), _response(200)],
+    )
+    sleep = mocker.patch("time.sleep")
+    assert get_users() == {}
+    sleep.assert_called_once_with(0.01)
+
+
+@pytest.mark.asyncio
+async def test_retry_idempotent_methods_only(mocker: MockerFixture):
+    policy = RetryPolicy(max_retries=3, status_codes={502, 503, 504})
+
+    @retry(policy=policy)
+    @http("POST", "/api/users", base_url="https://reqres.in/")
+    async def create_user() -> dict:
+        ...
+
+    @retry(policy=policy)
+    @http("PUT", "/api/users", base_url="https://reqres.in/")
+    async def update_user() -> dict:
+        ...
+
+    call = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        return_value=_response(502, method="POST"),
+    )
+    with pytest.raises(HTTPException):
+        await create_user()
+    assert call.call_count == 1
+
+    call = mocker.patch(
+        "declarativex.executors.httpx.AsyncClient.send",
+        side_effect=[_response(504, method="PUT"), _response(200, "PUT")],
+    )
+    assert await update_user() == {}
+    assert call.call_count == 2
+
+
+@pytest.mark.parametrize("jitter", list(Jitter))
+def test_retry_policy_backoff(jitter: Jitter):
+    policy = RetryPolicy(
+        delay=1, backoff_factor=2, max_delay=5, jitter=jitter
+    )
+    previous = policy.delay
+    for attempt in range(1, 10):
+        value = policy.backoff(attempt, previous)
+        assert 0 <= value <= 5
+        if jitter is Jitter.none:
+            assert value == min(2 ** (attempt - 1), 5)
+        previous = value
+
+
+def test_decorrelated_jitter_without_delay():
+    policy = RetryPolicy(jitter=Jitter.decorrelated)
+    previous = policy.delay
+    for attempt in range(1, 5):
+        value = policy.backoff(attempt, previous)
+        assert 0.1 <= value <= max(previous * 3, 0.1)
+        previous = value
+
+
+def test_retry_misconfiguration():
+    with pytest.raises(MisconfiguredException):
+        retry()
+    with pytest.raises(MisconfiguredException):
+        retry(3, (TimeoutException,), policy=RetryPolicy())
+    with pytest.raises(MisconfiguredException):
+        RetryPolicy(max_retries=-1)
+
+
+def test_retry_budget_denies_retries(mocker: MockerFixture):
+    budget = RetryBudget(ratio=0.5)
+
+    @retry(
+        policy=RetryPolicy(max_retries=3, status_codes={503}), budget=budget
+    )
+    class BudgetClient(BaseClient):
+        base_url = "https://reqres.in/"
+
+        @http("GET", "/api/users")
+        def get_users(self) -> dict:
+            ...
+
+        @http("GET", "/api/users/1")
+        def get_user(self) -> dict:
+            ...
+
+    budget_client = BudgetClient()
+    mocker.patch("time.sleep")
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        return_value=_response(200),
+    )
+    budget_client.get_users()
+    budget_client.get_user()
+    assert budget.successful_calls == 2
+
+    call = mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        return_value=_response(503),
+    )
+    with pytest.raises(HTTPException):
+        budget_client.get_users()
+    # Only one retry fits into the budget of two successful calls
+    assert call.call_count == 2
+    assert budget.retries == 1
+    assert budget.denied_retries == 1
+
+    with pytest.raises(HTTPException):
+        budget_client.get_user()
+    assert call.call_count == 3
+    assert budget.denied_retries == 2
+
+
+def test_retry_budget_reserve_and_expiration(mocker: MockerFixture):
+    budget = RetryBudget(ratio=0, ttl=0.1, min_retries_per_second=10)
+    assert budget.try_withdraw()
+    assert not budget.try_withdraw()
+    time.sleep(0.15)
+    assert budget.try_withdraw()
+    with pytest.raises(MisconfiguredException):
+        RetryBudget(ttl=0)
@@ -9,8 +9,9 @@ import pytest
 from httpx import Response, Proxy, URL
 from pytest_mock import MockerFixture
 
-from declarativex import http, BaseClient
-from declarativex.dependencies import Files
+from declarativex import http, BaseClient, retry
+from declarativex.auth import BearerAuth
+from declarativex.dependencies import CallPlan, Files
 from declarativex.exceptions import (
     DependencyValidationError,
     HTTPException,
@@ -389,3 +390,79 @@ def test_multiple_instances():
 
     with pytest.raises(httpx.RequestError):
         client2.sample_get()
+
+
+def test_configuration_per_instance(mocker: MockerFixture):
+    declaration = http("GET", "/get", default_headers={"x-declared": "1"})
+
+    class EchoClient(BaseClient):
+        @declaration
+        def sample_get(self) -> httpx.Response:
+            ...
+
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: Response(200, request=request),
+    )
+    clients = {
+        origin: EchoClient(
+            base_url=f"https://{origin}.example.com",
+            default_headers={"x-request-origin": origin},
+        )
+        for origin in ("one", "two")
+    }
+    for origin in ("one", "two", "one"):
+        request = clients[origin].sample_get().request
+        assert request.url.host == f"{origin}.example.com"
+        assert request.headers["x-request-origin"] == origin
+        assert request.headers["x-declared"] == "1"
+
+    # The declaration is never changed by the calls
+    endpoint_configuration = declaration.endpoint_configuration
+    assert endpoint_configuration.client_configuration.default_headers == {
+        "x-declared": "1"
+    }
+    assert endpoint_configuration.for_client(clients["one"]) is (
+        endpoint_configuration.for_client(clients["one"])
+    )
+
+    # Changes of the client attributes invalidate the configuration
+    clients["one"].default_headers["x-request-origin"] = "changed"
+    request = clients["one"].sample_get().request
+    assert request.headers["x-request-origin"] == "changed"
+    clients["two"].base_url = "https://three.example.com"
+    assert clients["two"].sample_get().request.url.host == "three.example.com"
+
+    # Objects without value equality, like auth, are compared by identity
+    clients["one"].auth = BearerAuth("token")
+    resolved = endpoint_configuration.for_client(clients["one"])
+    assert endpoint_configuration.for_client(clients["one"]) is resolved
+    clients["one"].auth = BearerAuth("token")
+    assert endpoint_configuration.for_client(clients["one"]) is not resolved
+
+
+def test_endpoints_compiled_on_first_call(mocker: MockerFixture):
+    compile_plan = mocker.spy(CallPlan, "compile")
+
+    @retry(max_retries=1)
+    class LazyClient(BaseClient):
+        base_url = "https://example.com"
+
+        @http("GET", "/users/{user_id}")
+        def get_user(self, user_id: int) -> httpx.Response:
+            ...
+
+        @http("GET", "/users")
+        def get_users(self) -> httpx.Response:
+            ...
+
+    assert compile_plan.call_count == 0
+    mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        side_effect=lambda request, **kwargs: Response(200, request=request),
+    )
+    client = LazyClient()
+    for user_id in (1, 2):
+        response = client.get_user(user_id)
+        assert response.request.url.path == f"/users/{user_id}"
+    assert compile_plan.call_count == 1
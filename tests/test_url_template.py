@@ -0,0 +1,85 @@
+import httpx
+import pytest
+from pytest_mock import MockerFixture
+
+from declarativex import http, models
+from declarativex.models import ClientConfiguration, EndpointConfiguration
+from declarativex.url_template import URLTemplate, compile_url_template
+
+
+def test_render_encodes_values():
+    template = URLTemplate("https://example.com/users/{user_id}/{slug}")
+    assert template.variables == ["user_id", "slug"]
+    assert template.render({"user_id": 1, "slug": "a/b c"}) == (
+        "https://example.com/users/1/a%2Fb%20c"
+    )
+    assert template.render({"user_id": "ü", "slug": "a:b@c"}) == (
+        "https://example.com/users/%C3%BC/a:b@c"
+    )
+    with pytest.raises(KeyError):
+        template.render({"user_id": 1})
+
+
+def test_render_query_and_format_spec():
+    template = URLTemplate("/search/{page:03d}?q={query}&x={{y}}")
+    assert template.render({"page": 7, "query": "a&b=c/d"}) == (
+        "/search/007?q=a%26b%3Dc/d&x={y}"
+    )
+
+
+def test_static_url_parsed_once():
+    template = URLTemplate("https://example.com/users")
+    url = template.to_httpx_url({})
+    assert url == httpx.URL("https://example.com/users")
+    assert template.to_httpx_url({}) is url
+
+
+def test_compile_url_template_cached():
+    template = compile_url_template("https://example.com/api/", "users/{id}")
+    assert template.template == "https://example.com/api/users/{id}"
+    assert compile_url_template("https://example.com/api/", "users/{id}") is (
+        template
+    )
+
+
+def test_path_params_encoded_in_request(mocker: MockerFixture):
+    @http("GET", "/users/{name}", base_url="https://example.com")
+    def get_user(name: str) -> dict:
+        ...
+
+    send = mocker.patch(
+        "declarativex.executors.httpx.Client.send",
+        return_value=httpx.Response(
+            200,
+            json={},
+            request=httpx.Request("GET", "https://example.com"),
+        ),
+    )
+    get_user("../admin?x=1")
+    request: httpx.Request = send.call_args.args[0]
+    assert request.url.raw_path == b"/users/..%2Fadmin%3Fx=1"
+
+
+def test_static_url_unescapes_braces():
+    template = URLTemplate("https://example.com/{{id}}")
+    assert template.variables == []
+    assert template.render({}) == "https://example.com/{id}"
+    assert template.to_httpx_url({}) == httpx.URL("https://example.com/{id}")
+    assert template.to_httpx_url({}, "a=1") == httpx.URL(
+        "https://example.com/{id}?a=1"
+    )
+
+
+def test_endpoint_compiles_template_once(mocker: MockerFixture):
+    configuration = EndpointConfiguration(
+        client_configuration=ClientConfiguration(
+            base_url="https://example.com"
+        ),
+        method="GET",
+        path="/users/{user_id}",
+    )
+    compiled = configuration.compiled_url_template
+    spy = mocker.spy(models, "compile_url_template")
+    assert configuration.compiled_url_template is compiled
+    assert configuration.url_template == "https://example.com/users/{user_id}"
+    spy.assert_not_called()